@@ -5,15 +5,14 @@ CARDS ANALYZER V3.0 - DEEP ANALYSIS PROTOCOL
 BLUEPRINT IMPLEMENTATION:
 - Retorna LISTA de múltiplas predições (~6 predições)
 - Analisa submercados: Total Cards (Over/Under 3.5, 4.5, 5.5)
+- Probabilidades lidas da simulação Monte Carlo do jogo (match_simulator)
+- Linhas declaradas em market_registry e avaliadas em lote
 - Cada predição tem confiança calculada via confidence_calculator
 - Implementa Script-Based Probability Modifier
 """
 
-from config import MIN_CONFIANCA_CARTOES
-from analysts.confidence_calculator import (
-    calculate_statistical_probability_cards_over,
-    calculate_final_confidence
-)
+from analysts.match_simulator import simulacao_do_pacote
+from analysts.market_registry import REGISTRO_MERCADOS, avaliar_linhas
 
 
 def apply_script_modifier_to_probability_cards(base_prob_pct, bet_type, tactical_script):
@@ -102,84 +101,25 @@ def analisar_mercado_cartoes(analysis_packet, odds):
     print(f"     Fora: {cartoes_fora:.1f} total ({cartoes_amarelos_fora:.1f}A + {cartoes_vermelhos_fora:.1f}V)")
     print(f"     Script Tático: {script_name}")
 
-    # STEP 2: CALCULAR MÉDIAS ESPERADAS
-    media_exp_total = (cartoes_casa + cartoes_fora) / 2
-    media_casa = cartoes_casa
-    media_fora = cartoes_fora
+    # STEP 2: SIMULAÇÃO DO JOGO (mesmas amostras de cantos e finalizações)
+    simulacao = simulacao_do_pacote(analysis_packet)
+    media_casa = simulacao.taxas['cartoes_casa']
+    media_fora = simulacao.taxas['cartoes_fora']
+    media_exp_total = media_casa + media_fora
 
     print(f"  📊 Médias esperadas: Total={media_exp_total:.1f}, Casa={media_casa:.1f}, Fora={media_fora:.1f}")
 
-    all_predictions = []
-
     if not odds:
         print(f"  ⚠️ CARTÕES: Sem odds disponíveis")
         return None
 
-    # ========== 1. TOTAL CARDS FULL TIME ==========
-    
-    linhas_total = [3.5, 4.5, 5.5]
-    
-    for linha in linhas_total:
-        # Over
-        odd_key_over = f"cartoes_over_{linha}"
-        if odd_key_over in odds:
-            prob_pct = calculate_statistical_probability_cards_over(
-                weighted_cards_avg=media_exp_total,
-                line=linha
-            )
-            
-            prob_pct = apply_script_modifier_to_probability_cards(
-                prob_pct, f"Over {linha} Cartões", script_name
-            )
-            
-            bet_type = f"Over {linha} Cartões"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_pct,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CARTOES:
-                all_predictions.append({
-                    "mercado": "Cartões",
-                    "tipo": f"Over {linha}",
-                    "confianca": conf_final,
-                    "odd": odds[odd_key_over],
-                    "time": "Total",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_pct
-                })
-        
-        # Under
-        odd_key_under = f"cartoes_under_{linha}"
-        if odd_key_under in odds:
-            prob_over = calculate_statistical_probability_cards_over(
-                weighted_cards_avg=media_exp_total,
-                line=linha
-            )
-            prob_under = 100.0 - prob_over
-            
-            prob_under = apply_script_modifier_to_probability_cards(
-                prob_under, f"Under {linha} Cartões", script_name
-            )
-            
-            bet_type = f"Under {linha} Cartões"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_under,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CARTOES:
-                all_predictions.append({
-                    "mercado": "Cartões",
-                    "tipo": f"Under {linha}",
-                    "confianca": conf_final,
-                    "odd": odds[odd_key_under],
-                    "time": "Total",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_under
-                })
+    # Todas as linhas do registro avaliadas em lote sobre as mesmas amostras simuladas
+    all_predictions = avaliar_linhas(
+        REGISTRO_MERCADOS["Cartões"], odds,
+        lambda fonte, linhas: simulacao.prob_over_under(fonte, linhas)[0],
+        script=script_name,
+        modificador_script=apply_script_modifier_to_probability_cards
+    )
 
     print(f"  ✅ CARTÕES V3.0: {len(all_predictions)} predições geradas (deep analysis)")
     
@@ -11,10 +11,70 @@ ARQUITETURA EM 4 PASSOS:
 4. Retornar Confiança Final calibrada
 
 Este modelo garante que a confiança está sempre ancorada na realidade estatística.
+
+Probabilidades Poisson em lote: poisson_over_probabilities / poisson_over_under_grid /
+poisson_over_table calculam todas as linhas de um jogo (ou do slate inteiro) numa chamada.
+
+Confiança em lote: as regras dos passos 2 e 3 são compiladas no import em tabelas
+(faixa de probabilidade, classe do bet_type × script) e calculate_confidence_batch
+vira um gather de arrays, com resultado idêntico a calculate_final_confidence.
 """
 
-import math
-from typing import Dict, List, Tuple, Optional
+import threading
+from functools import lru_cache
+from typing import Dict, List, Tuple, Optional, Sequence
+
+import numpy as np
+from scipy.stats import poisson
+
+
+# ========== MOTOR VETORIZADO (NumPy/SciPy) ==========
+
+def poisson_over_probabilities(lambdas, lines) -> np.ndarray:
+    """
+    P(X > linha) em % para X ~ Poisson(lambda), em UMA chamada vetorizada.
+    
+    `lambdas` e `lines` seguem as regras de broadcasting do NumPy:
+    - mesmo formato -> pares (lambda_i, linha_i)
+    - lambdas[:, None] com lines[None, :] -> grade jogo × linha
+    
+    Returns:
+        np.ndarray: Probabilidades em % (0-100)
+    """
+    lam = np.asarray(lambdas, dtype=float)
+    k = np.floor(np.asarray(lines, dtype=float))
+    # sf(k) = P(X > k) = 1 - CDF(k): mesma conta do loop com math.factorial, sem loop
+    return np.clip(poisson.sf(k, lam) * 100, 0, 100)
+
+
+def poisson_over_under_grid(lambdas, lines) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Grade completa (lambda × linha) de probabilidades Over e Under em %.
+    
+    Returns:
+        tuple: (over, under), ambos com formato (len(lambdas), len(lines))
+    """
+    lam = np.atleast_1d(np.asarray(lambdas, dtype=float))
+    lin = np.atleast_1d(np.asarray(lines, dtype=float))
+    over = poisson_over_probabilities(lam[:, None], lin[None, :])
+    return over, 100.0 - over
+
+
+def poisson_over_table(lambdas: Dict[str, float], lines: Sequence[float]) -> Dict[str, Dict[float, float]]:
+    """
+    Tabela de consulta para os analyzers: {nome_da_média: {linha: P(Over) em %}}.
+    Uma única chamada vetorizada por jogo em vez de um loop Poisson por linha/mercado.
+    
+    Exemplo:
+        probs = poisson_over_table({'ft': 10.2, 'ht': 4.9}, [4.5, 9.5])
+        probs['ft'][9.5]  # P(Over 9.5) em %
+    """
+    nomes = list(lambdas.keys())
+    over, _ = poisson_over_under_grid([lambdas[n] for n in nomes], lines)
+    return {
+        nome: {linha: float(over[i, j]) for j, linha in enumerate(lines)}
+        for i, nome in enumerate(nomes)
+    }
 
 
 def calculate_statistical_probability_goals_over(
@@ -39,13 +99,7 @@ def calculate_statistical_probability_goals_over(
     
     # Caso contrário, usar distribuição de Poisson
     # P(X > line) = 1 - P(X <= line)
-    prob_under = 0.0
-    for k in range(int(line) + 1):
-        prob_under += (math.exp(-weighted_goals_avg) * (weighted_goals_avg ** k)) / math.factorial(k)
-    
-    prob_over = (1 - prob_under) * 100  # Converter para %
-    
-    return min(max(prob_over, 0), 100)  # Garantir 0-100%
+    return float(poisson_over_probabilities(weighted_goals_avg, line))
 
 
 def calculate_statistical_probability_corners_over(
@@ -60,12 +114,7 @@ def calculate_statistical_probability_corners_over(
         return historical_frequency
     
     # Usar Poisson (escanteios seguem distribuição similar a gols)
-    prob_under = 0.0
-    for k in range(int(line) + 1):
-        prob_under += (math.exp(-weighted_corners_avg) * (weighted_corners_avg ** k)) / math.factorial(k)
-    
-    prob_over = (1 - prob_under) * 100
-    return min(max(prob_over, 0), 100)
+    return float(poisson_over_probabilities(weighted_corners_avg, line))
 
 
 def calculate_statistical_probability_btts(
@@ -95,12 +144,7 @@ def calculate_statistical_probability_cards_over(
     STEP 1: Calcula probabilidade estatística de Over X.5 cartões.
     """
     # Usar Poisson para cartões (distribuição similar a gols/cantos)
-    prob_under = 0.0
-    for k in range(int(line) + 1):
-        prob_under += (math.exp(-weighted_cards_avg) * (weighted_cards_avg ** k)) / math.factorial(k)
-    
-    prob_over = (1 - prob_under) * 100
-    return min(max(prob_over, 0), 100)
+    return float(poisson_over_probabilities(weighted_cards_avg, line))
 
 
 def calculate_statistical_probability_shots_over(
@@ -194,6 +238,33 @@ def convert_probability_to_base_confidence(probability_pct: float) -> float:
         return max(probability_pct / 10, 1.0)  # 1.0-4.0
 
 
+# Mapa de coerência aposta × script (compartilhado com as tabelas compiladas abaixo)
+_COHERENCE_MAP = {
+    "Over 2.5": {
+        "coherent": ["SCRIPT_OPEN_HIGH_SCORING_GAME", "SCRIPT_DOMINIO_CASA", "SCRIPT_DOMINIO_VISITANTE", 
+                    "SCRIPT_TIME_EM_CHAMAS_CASA", "SCRIPT_TIME_EM_CHAMAS_FORA"],
+        "bonus": 1.5  # Aumentado de 1.0 para garantir impacto forte
+    },
+    "Under 2.5": {
+        "coherent": ["SCRIPT_CAGEY_TACTICAL_AFFAIR", "SCRIPT_RELEGATION_BATTLE", "SCRIPT_JOGO_DE_COMPADRES",
+                    "SCRIPT_TIGHT_LOW_SCORING", "SCRIPT_BALANCED_TACTICAL_BATTLE"],
+        "bonus": 1.5  # Aumentado de 1.0
+    },
+    "Over 1.5": {
+        "coherent": ["SCRIPT_OPEN_HIGH_SCORING_GAME", "SCRIPT_TIME_EM_CHAMAS_CASA", "SCRIPT_TIME_EM_CHAMAS_FORA"],
+        "bonus": 1.2  # Aumentado de 0.8
+    },
+    "BTTS Sim": {
+        "coherent": ["SCRIPT_BALANCED_RIVALRY_CLASH", "SCRIPT_OPEN_HIGH_SCORING_GAME"],
+        "bonus": 1.5  # Aumentado de 1.0
+    },
+    "BTTS Não": {
+        "coherent": ["SCRIPT_GIANT_VS_MINNOW", "SCRIPT_DOMINIO_CASA", "SCRIPT_DOMINIO_VISITANTE"],
+        "bonus": 1.5  # Aumentado de 1.0
+    }
+}
+
+
 def apply_tactical_script_modifier(
     base_confidence: float,
     bet_type: str,
@@ -217,30 +288,7 @@ def apply_tactical_script_modifier(
     # O contexto tático deve ter POWERFUL IMPACT na confiança
     # Coherence Bonus aumentado para garantir que o script DOMINA sobre stats brutas
     
-    coherence_map = {
-        "Over 2.5": {
-            "coherent": ["SCRIPT_OPEN_HIGH_SCORING_GAME", "SCRIPT_DOMINIO_CASA", "SCRIPT_DOMINIO_VISITANTE", 
-                        "SCRIPT_TIME_EM_CHAMAS_CASA", "SCRIPT_TIME_EM_CHAMAS_FORA"],
-            "bonus": 1.5  # Aumentado de 1.0 para garantir impacto forte
-        },
-        "Under 2.5": {
-            "coherent": ["SCRIPT_CAGEY_TACTICAL_AFFAIR", "SCRIPT_RELEGATION_BATTLE", "SCRIPT_JOGO_DE_COMPADRES",
-                        "SCRIPT_TIGHT_LOW_SCORING", "SCRIPT_BALANCED_TACTICAL_BATTLE"],
-            "bonus": 1.5  # Aumentado de 1.0
-        },
-        "Over 1.5": {
-            "coherent": ["SCRIPT_OPEN_HIGH_SCORING_GAME", "SCRIPT_TIME_EM_CHAMAS_CASA", "SCRIPT_TIME_EM_CHAMAS_FORA"],
-            "bonus": 1.2  # Aumentado de 0.8
-        },
-        "BTTS Sim": {
-            "coherent": ["SCRIPT_BALANCED_RIVALRY_CLASH", "SCRIPT_OPEN_HIGH_SCORING_GAME"],
-            "bonus": 1.5  # Aumentado de 1.0
-        },
-        "BTTS Não": {
-            "coherent": ["SCRIPT_GIANT_VS_MINNOW", "SCRIPT_DOMINIO_CASA", "SCRIPT_DOMINIO_VISITANTE"],
-            "bonus": 1.5  # Aumentado de 1.0
-        }
-    }
+    coherence_map = _COHERENCE_MAP
     
     # Encontrar mapeamento
     bet_key = None
@@ -267,6 +315,159 @@ def apply_tactical_script_modifier(
     return 0.0
 
 
+# ========== TABELAS COMPILADAS (confiança como gather de arrays) ==========
+# Compiladas no import a partir das MESMAS regras acima, para sair idêntico ao cálculo escalar:
+# - Faixas de probabilidade: conf_base = offset + (prob - origem) / divisor, com piso na última faixa
+# - Modificador de script: tabela (classe do bet_type × script), uma coluna por script
+
+_FAIXAS_PROBABILIDADE = np.array([35.0, 45.0, 55.0, 65.0, 75.0, 85.0])
+_BASE_OFFSET = np.array([0.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0])
+_BASE_ORIGEM = np.array([0.0, 35.0, 45.0, 55.0, 65.0, 75.0, 85.0])
+_BASE_DIVISOR = np.array([10.0, 10.0, 10.0, 10.0, 10.0, 10.0, 15.0])
+_BASE_PISO = np.array([1.0, -np.inf, -np.inf, -np.inf, -np.inf, -np.inf, -np.inf])
+
+SCRIPTS_CONHECIDOS = (
+    "SCRIPT_BALANCED_RIVALRY_CLASH", "SCRIPT_BALANCED_TACTICAL_BATTLE", "SCRIPT_CAGEY_TACTICAL_AFFAIR",
+    "SCRIPT_CHAOTIC_OPEN_GAME", "SCRIPT_DOMINIO_CASA", "SCRIPT_DOMINIO_VISITANTE", "SCRIPT_GIANT_VS_MINNOW",
+    "SCRIPT_HOME_DOMINANT_ATTACK_PRESSURE", "SCRIPT_HOST_DOMINATION", "SCRIPT_JOGO_DE_COMPADRES",
+    "SCRIPT_LOW_SCORING_CONTROLLED", "SCRIPT_MATA_MATA_IDA", "SCRIPT_MATA_MATA_VOLTA",
+    "SCRIPT_OPEN_HIGH_SCORING_GAME", "SCRIPT_RELEGATION_BATTLE", "SCRIPT_TIGHT_LOW_SCORING",
+    "SCRIPT_TIME_EM_CHAMAS_CASA", "SCRIPT_TIME_EM_CHAMAS_FORA", "SCRIPT_UNSTABLE_FAVORITE"
+)
+
+
+def _classe_bet_type(bet_type: str) -> Tuple[Optional[str], bool, bool]:
+    """O que apply_tactical_script_modifier enxerga do bet_type: (chave de coerência, tem 'over', tem 'under')"""
+    texto = bet_type.lower()
+    chave = next((k for k in _COHERENCE_MAP if k.lower() in texto), None)
+    return chave, "over" in texto, "under" in texto
+
+
+def _representante_classe(chave: Optional[str], over: bool, under: bool) -> str:
+    """Texto mínimo que cai na classe (usado só para compilar a tabela)"""
+    texto = chave or ""
+    if over and "over" not in texto.lower():
+        texto += " over"
+    if under and "under" not in texto.lower():
+        texto += " under"
+    return texto
+
+
+_CLASSES_BET_TYPE = []
+for _chave in (None, *_COHERENCE_MAP):
+    for _over in (False, True):
+        for _under in (False, True):
+            if _classe_bet_type(_representante_classe(_chave, _over, _under)) == (_chave, _over, _under):
+                _CLASSES_BET_TYPE.append((_chave, _over, _under))
+_ID_CLASSE = {classe: i for i, classe in enumerate(_CLASSES_BET_TYPE)}
+_REPRESENTANTES = [_representante_classe(*classe) for classe in _CLASSES_BET_TYPE]
+
+# Coluna 0 = sem script (modificador 0.0)
+_ID_SCRIPT: Dict[Optional[str], int] = {None: 0, "": 0}
+_TABELA_MODIFICADOR = np.zeros((len(_CLASSES_BET_TYPE), 1))
+
+
+def _compilar_coluna_script(script: str) -> np.ndarray:
+    return np.array([apply_tactical_script_modifier(0.0, rep, script) for rep in _REPRESENTANTES])
+
+
+_TABELA_LOCK = threading.Lock()  # Análises rodam em threads/tasks paralelas: uma compilação por vez
+
+
+def id_script(script: Optional[str]) -> int:
+    """Coluna do script na tabela de modificadores (scripts novos são compilados na primeira vez)"""
+    global _TABELA_MODIFICADOR
+    indice = _ID_SCRIPT.get(script)
+    if indice is None:
+        with _TABELA_LOCK:
+            indice = _ID_SCRIPT.get(script)
+            if indice is None:
+                # Tabela antes do id: quem lê o id já encontra a coluna
+                _TABELA_MODIFICADOR = np.column_stack([_TABELA_MODIFICADOR, _compilar_coluna_script(script)])
+                indice = _ID_SCRIPT[script] = _TABELA_MODIFICADOR.shape[1] - 1
+    return indice
+
+
+for _script in SCRIPTS_CONHECIDOS:
+    id_script(_script)
+
+
+@lru_cache(maxsize=2048)
+def id_bet_type(bet_type: str) -> int:
+    """Linha do bet_type na tabela de modificadores"""
+    return _ID_CLASSE[_classe_bet_type(bet_type)]
+
+
+def base_confidence_batch(probabilities) -> np.ndarray:
+    """convert_probability_to_base_confidence para um array inteiro (gather nas faixas)"""
+    probs = np.asarray(probabilities, dtype=float)
+    faixa = np.searchsorted(_FAIXAS_PROBABILIDADE, probs, side='right')
+    base = _BASE_OFFSET[faixa] + (probs - _BASE_ORIGEM[faixa]) / _BASE_DIVISOR[faixa]
+    return np.maximum(base, _BASE_PISO[faixa])
+
+
+def calculate_confidence_batch(probabilities, bet_type_ids, script_ids) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Confiança de muitos palpites (um jogo ou o slate inteiro) como gather nas tabelas compiladas.
+    
+    Args:
+        probabilities: Probabilidades estatísticas (0-100%)
+        bet_type_ids: id_bet_type de cada palpite
+        script_ids: id_script de cada palpite (ou um único id para todos)
+    
+    Returns:
+        tuple: (confianca_final, confianca_base, modificador_script) - arrays idênticos ao cálculo escalar
+    """
+    base = base_confidence_batch(probabilities)
+    script_ids = np.asarray(script_ids, dtype=np.intp)
+    mod = _TABELA_MODIFICADOR[np.asarray(bet_type_ids, dtype=np.intp), script_ids]
+    final = np.minimum(np.maximum(base + mod, 1.0), 10.0)
+    return final, base, mod
+
+
+def avaliar_candidatos(candidatos, tactical_script: Optional[str] = None) -> Tuple[np.ndarray, List[Dict]]:
+    """
+    Confiança de todos os candidatos de um mercado numa única chamada a calculate_confidence_batch.
+    
+    Args:
+        candidatos: [(palpite, probabilidade %, bet_type, confiança mínima)] - palpite sem a confiança
+        tactical_script: Script tático do jogo
+    
+    Returns:
+        tuple: (confiança de cada candidato, palpites aprovados com confianca/bet_type/probabilidade_estatistica).
+            Sem breakdown: confidence_breakdown() o monta sob demanda a partir de bet_type e probabilidade.
+    """
+    if not candidatos:
+        return np.zeros(0), []
+    probs = np.array([prob for _, prob, _, _ in candidatos], dtype=float)
+    confiancas, _, _ = calculate_confidence_batch(
+        probs, [id_bet_type(bet_type) for _, _, bet_type, _ in candidatos], id_script(tactical_script)
+    )
+    aprovados = [
+        {**palpite, "confianca": float(conf), "bet_type": bet_type, "probabilidade_estatistica": float(prob)}
+        for (palpite, prob, bet_type, minimo), conf in zip(candidatos, confiancas)
+        if conf >= minimo
+    ]
+    return confiancas, aprovados
+
+
+def confidence_breakdown(
+    statistical_probability_pct: float,
+    bet_type: str,
+    tactical_script: Optional[str] = None
+) -> Dict[str, float]:
+    """Breakdown da confiança, montado sob demanda (ex: relatório do /debug_confianca)"""
+    base_conf = convert_probability_to_base_confidence(statistical_probability_pct)
+    coluna = id_script(tactical_script)
+    mod_script = float(_TABELA_MODIFICADOR[id_bet_type(bet_type), coluna])
+    return {
+        "probabilidade_base": statistical_probability_pct,
+        "confianca_base": base_conf,
+        "modificador_script": mod_script,
+        "confianca_final": max(1.0, min(10.0, base_conf + mod_script))
+    }
+
+
 # PURE ANALYST PROTOCOL: Value and odd modifiers removed
 # Analysis is now independent of market odds
 
@@ -287,23 +488,8 @@ def calculate_final_confidence(
     Returns:
         tuple: (confianca_final, breakdown_dict)
     """
-    # STEP 2: Base confidence
-    base_conf = convert_probability_to_base_confidence(statistical_probability_pct)
-    
-    # STEP 3: Tactical script modifier only
-    mod_script = apply_tactical_script_modifier(base_conf, bet_type, tactical_script)
-    
-    # STEP 4: Final (simplified - no value/odd modifiers)
-    final_conf = base_conf + mod_script
-    
-    # Cap entre 1.0 e 10.0
-    final_conf = max(1.0, min(10.0, final_conf))
-    
-    breakdown = {
-        "probabilidade_base": statistical_probability_pct,
-        "confianca_base": base_conf,
-        "modificador_script": mod_script,
-        "confianca_final": final_conf
-    }
+    # STEP 2 + 3: Base confidence e modificador de script (tabela compilada)
+    breakdown = confidence_breakdown(statistical_probability_pct, bet_type, tactical_script)
     
-    return final_conf, breakdown
+    # STEP 4: Final (simplified - no value/odd modifiers), cap entre 1.0 e 10.0
+    return breakdown["confianca_final"], breakdown
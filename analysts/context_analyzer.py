@@ -1,124 +1,7 @@
 # analysts/context_analyzer.py
 
-from config import QUALITY_SCORES, LEAGUE_WEIGHTING_FACTOR, MERCADOS_VETADOS_POR_SCRIPT
-
-
-def calculate_dynamic_qsc(team_stats, team_id, classificacao=None, team_name=None, league_id=None, rodada_atual=0):
-    """
-    LAYER 1 - PHOENIX V2.0: Calcula Quality Score Composto e Dinâmico (QSC).
-    
-    O QSC é uma média ponderada de 4 componentes:
-    1. Base QS (Reputation) - 25% peso - do dicionário QUALITY_SCORES
-    2. Position QS (Table) - 30% peso - posição na tabela
-    3. Goal Difference QS - 25% peso - saldo de gols
-    4. Recent Form QS - 20% peso - últimos 5 jogos
-    
-    NOVIDADES PHOENIX V2.0:
-    - League Weighting Factor: Multiplica QSC final pelo peso da liga
-    - Season Start Adjustment: Primeiras 5 rodadas usam blend 50/50 entre table-based e reputation
-    
-    Args:
-        team_stats: Estatísticas gerais do time
-        team_id: ID do time
-        classificacao: Tabela de classificação da liga
-        team_name: Nome do time (para buscar na classificação)
-        league_id: ID da liga (para League Weighting Factor)
-        rodada_atual: Rodada atual da liga (para Season Start Adjustment)
-    
-    Returns:
-        int: QSC Dynamic (0-100)
-    """
-    DEFAULT_BASE_QS = 70
-    DEFAULT_LEAGUE_WEIGHT = 0.70
-    
-    # 1. BASE QS (REPUTATION) - 25% peso
-    base_qs = QUALITY_SCORES.get(team_id, DEFAULT_BASE_QS)
-    
-    # 2. POSITION QS (TABLE) - 30% peso
-    position_qs = 50  # Neutro
-    if classificacao and team_name:
-        for team_info in classificacao:
-            if team_info['team']['name'] == team_name:
-                rank = team_info['rank']
-                total_teams = len(classificacao)
-                # 1º lugar = 100, Último = 50
-                position_qs = 100 - ((rank - 1) / (total_teams - 1)) * 50 if total_teams > 1 else 75
-                break
-    
-    # 3. GOAL DIFFERENCE QS - 25% peso
-    goal_diff_qs = 50  # Neutro
-    goals = team_stats.get('goals', {})
-    goals_for = goals.get('for', {}).get('total', {}).get('total', 0)
-    goals_against = goals.get('against', {}).get('total', {}).get('total', 0)
-    goal_diff = goals_for - goals_against
-    
-    # Saldo >= +20 = 100, Saldo <= -20 = 0
-    if goal_diff >= 20:
-        goal_diff_qs = 100
-    elif goal_diff <= -20:
-        goal_diff_qs = 0
-    else:
-        goal_diff_qs = 50 + (goal_diff / 20) * 50
-    
-    # 4. RECENT FORM QS - 20% peso
-    form_qs = 50  # Neutro
-    form_string = team_stats.get('form', '')
-    if form_string:
-        recent_form = form_string[-5:]  # Últimos 5 jogos
-        wins = recent_form.count('W')
-        draws = recent_form.count('D')
-        losses = recent_form.count('L')
-        
-        # 5W = 100, 5L = 0
-        if wins == 5:
-            form_qs = 100
-        elif wins == 4:
-            form_qs = 85
-        elif wins == 3:
-            form_qs = 70
-        elif wins == 2:
-            form_qs = 60
-        elif wins == 1:
-            form_qs = 52
-        elif losses == 5:
-            form_qs = 0
-        elif losses == 4:
-            form_qs = 15
-        elif losses == 3:
-            form_qs = 30
-        else:
-            form_qs = 50
-    
-    # --- SEASON START ADJUSTMENT (PRIMEIRAS 5 RODADAS) ---
-    # Nas primeiras 5 rodadas, a tabela não é confiável
-    # Usar blend 50/50 entre Position QS e Base QS (reputation)
-    if rodada_atual > 0 and rodada_atual <= 5:
-        position_qs_original = position_qs
-        position_qs = (position_qs * 0.5) + (base_qs * 0.5)
-        print(f"    🔄 SEASON START ADJUSTMENT (Rodada {rodada_atual}): Position QS ajustado de {int(position_qs_original)} para {int(position_qs)}")
-    
-    # MÉDIA PONDERADA
-    qsc = (
-        base_qs * 0.25 +
-        position_qs * 0.30 +
-        goal_diff_qs * 0.25 +
-        form_qs * 0.20
-    )
-    
-    # --- LEAGUE WEIGHTING FACTOR ---
-    # Multiplicar QSC pelo peso da liga
-    league_weight = LEAGUE_WEIGHTING_FACTOR.get(league_id, DEFAULT_LEAGUE_WEIGHT) if league_id else DEFAULT_LEAGUE_WEIGHT
-    qsc_before_league_weight = qsc
-    qsc = qsc * league_weight
-    
-    qsc_final = int(round(qsc))
-    
-    print(f"    🧠 QSC DINÂMICO ({team_name}): {qsc_final}/100")
-    print(f"       Base QS: {base_qs} | Position QS: {int(position_qs)} | Goal Diff QS: {int(goal_diff_qs)} | Form QS: {int(form_qs)}")
-    if league_id:
-        print(f"       ⚖️ League Weight: {league_weight:.2f} (QSC antes: {int(qsc_before_league_weight)}, depois: {qsc_final})")
-    
-    return qsc_final
+from config import MERCADOS_VETADOS_POR_SCRIPT
+from standings_index import indexar_classificacao
 
 
 def analisar_compatibilidade_ofensiva_defensiva(stats_casa, stats_fora):
@@ -179,10 +62,11 @@ def analisar_importancia_jogo(classificacao, pos_casa, pos_fora, rodada_atual, t
     """
     Avalia a importância e motivação do jogo baseado em contexto da temporada.
     """
+    classificacao = indexar_classificacao(classificacao)
     if not classificacao or pos_casa == "N/A" or pos_fora == "N/A":
         return None
 
-    total_times = len(classificacao)
+    total_times = classificacao.total_times
     progresso_temporada = rodada_atual / total_rodadas
 
     # Reta final da temporada (últimas 25% das rodadas)
@@ -308,14 +192,14 @@ def gerar_analise_contextual_completa(stats_casa, stats_fora, classificacao, pos
 # ========================================
 # As seguintes funções foram DELETADAS durante a refatoração V3.0:
 #
-# 1. get_quality_scores() -> Deprecada, use calculate_dynamic_qsc()
+# 1. get_quality_scores() -> Deprecada, use team_scoring.scores_do_time()['qsc']
 # 2. definir_perfil_partida() -> Removida, lógica de perfil movida para master_analyzer
 # 3. filtrar_mercados_por_contexto() -> Removida, filtragem agora é responsabilidade do dossier_formatter
 # 4. ajustar_confianca_por_script() -> Integrado em confidence_calculator.apply_tactical_script_modifier()
 # 5. verificar_veto_mercado() -> Integrado em confidence_calculator.calculate_final_confidence()
+# 6. calculate_dynamic_qsc() -> Calculado em lote por analysts/team_scoring.py (scores_do_time / TabelaScores)
 #
 # ARQUIVO SIMPLIFICADO: context_analyzer.py agora contém APENAS funções de análise contextual:
-# - calculate_dynamic_qsc()
 # - analisar_compatibilidade_ofensiva_defensiva()
 # - analisar_importancia_jogo()
 # - analisar_estilo_jogo()
@@ -5,16 +5,14 @@ CORNERS ANALYZER V3.0 - DEEP ANALYSIS PROTOCOL
 BLUEPRINT IMPLEMENTATION:
 - Retorna LISTA de múltiplas predições (~12 predições)
 - Analisa submercados: Total Corners (FT), HT Corners, Team Corners
+- Probabilidades lidas da simulação Monte Carlo do jogo (match_simulator)
+- Linhas declaradas em market_registry e avaliadas em lote
 - Cada predição tem confiança calculada via confidence_calculator
 - Implementa Script-Based Probability Modifier
 """
 
-from config import MIN_CONFIANCA_CANTOS, MIN_CONFIANCA_CANTOS_UNDER
-from analysts.context_analyzer import analisar_compatibilidade_ofensiva_defensiva
-from analysts.confidence_calculator import (
-    calculate_statistical_probability_corners_over,
-    calculate_final_confidence
-)
+from analysts.match_simulator import fator_cantos_contextual, simulacao_do_pacote
+from analysts.market_registry import REGISTRO_MERCADOS, avaliar_linhas
 
 
 def apply_script_modifier_to_probability_corners(base_prob_pct, bet_type, tactical_script):
@@ -134,309 +132,30 @@ def analisar_mercado_cantos(analysis_packet, odds):
         return None
 
     # STEP 2: ANÁLISE CONTEXTUAL
-    insights = analisar_compatibilidade_ofensiva_defensiva(stats_casa, stats_fora)
-    fator_cantos = 1.0
-    contexto_insights = []
+    _, contexto_insights = fator_cantos_contextual(stats_casa, stats_fora)
 
-    for insight in insights:
-        if insight['tipo'] == 'cantos_casa_favoravel':
-            fator_cantos *= insight['fator_multiplicador']
-            contexto_insights.append(insight['descricao'])
-        elif insight['tipo'] == 'festival_gols':
-            fator_cantos *= 1.2
-            contexto_insights.append("⚡ Jogo ofensivo tende a gerar MAIS cantos!")
-
-    # STEP 3: CALCULAR MÉDIAS ESPERADAS
+    # STEP 3: SIMULAÇÃO DO JOGO (mesmas amostras de cartões e finalizações)
+    simulacao = simulacao_do_pacote(analysis_packet)
     media_exp_ft = (cantos_casa_feitos + cantos_fora_sofridos + 
                     cantos_fora_feitos + cantos_casa_sofridos) / 2
-    media_exp_ft_ajustada = media_exp_ft * fator_cantos
-    media_exp_ht = media_exp_ft_ajustada * 0.48  # HT = ~48% dos cantos
-    media_casa = cantos_casa_feitos * (fator_cantos if fator_cantos > 1.0 else 1.0)
-    media_fora = cantos_fora_feitos
+    media_exp_ft_ajustada = simulacao.taxas['cantos_casa'] + simulacao.taxas['cantos_fora']
+    media_exp_ht = simulacao.media('cantos_ht')
+    media_casa = simulacao.taxas['cantos_casa']
+    media_fora = simulacao.taxas['cantos_fora']
 
     print(f"  📊 Médias: FT={media_exp_ft_ajustada:.1f}, HT={media_exp_ht:.1f}, Casa={media_casa:.1f}, Fora={media_fora:.1f}")
 
-    all_predictions = []
-
     if not odds:
         print(f"  ⚠️ CANTOS: Sem odds disponíveis")
         return None
 
-    # ========== 1. TOTAL CORNERS FULL TIME ==========
-    
-    linhas_ft_over = [8.5, 9.5, 10.5, 11.5]
-    for linha in linhas_ft_over:
-        odd_key = f"cantos_ft_over_{linha}"
-        if odd_key in odds:
-            prob_pct = calculate_statistical_probability_corners_over(
-                weighted_corners_avg=media_exp_ft_ajustada,
-                line=linha,
-                historical_frequency=None
-            )
-            
-            prob_pct = apply_script_modifier_to_probability_corners(
-                prob_pct, f"Over {linha} Cantos", script_name
-            )
-            
-            bet_type = f"Over {linha} Cantos"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_pct,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CANTOS:
-                all_predictions.append({
-                    "mercado": "Cantos",
-                    "tipo": bet_type,
-                    "confianca": conf_final,
-                    "odd": odds[odd_key],
-                    "periodo": "FT",
-                    "time": "Total",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_pct
-                })
-    
-    linhas_ft_under = [8.5, 9.5, 10.5, 11.5]
-    for linha in linhas_ft_under:
-        odd_key = f"cantos_ft_under_{linha}"
-        if odd_key in odds:
-            prob_over = calculate_statistical_probability_corners_over(
-                weighted_corners_avg=media_exp_ft_ajustada,
-                line=linha,
-                historical_frequency=None
-            )
-            prob_under = 100.0 - prob_over
-            
-            prob_under = apply_script_modifier_to_probability_corners(
-                prob_under, f"Under {linha} Cantos", script_name
-            )
-            
-            bet_type = f"Under {linha} Cantos"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_under,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CANTOS_UNDER:
-                all_predictions.append({
-                    "mercado": "Cantos",
-                    "tipo": bet_type,
-                    "confianca": conf_final,
-                    "odd": odds[odd_key],
-                    "periodo": "FT",
-                    "time": "Total",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_under
-                })
-    
-    # ========== 2. FIRST HALF CORNERS ==========
-    
-    linhas_ht = [4.5, 5.5]
-    for linha in linhas_ht:
-        # Over HT
-        odd_key_over = f"cantos_ht_over_{linha}"
-        if odd_key_over in odds:
-            prob_pct = calculate_statistical_probability_corners_over(
-                weighted_corners_avg=media_exp_ht,
-                line=linha,
-                historical_frequency=None
-            )
-            
-            prob_pct = apply_script_modifier_to_probability_corners(
-                prob_pct, f"Over {linha} Cantos HT", script_name
-            )
-            
-            bet_type = f"Over {linha} HT"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_pct,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CANTOS:
-                all_predictions.append({
-                    "mercado": "Cantos",
-                    "tipo": bet_type,
-                    "confianca": conf_final,
-                    "odd": odds[odd_key_over],
-                    "periodo": "HT",
-                    "time": "Total",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_pct
-                })
-        
-        # Under HT
-        odd_key_under = f"cantos_ht_under_{linha}"
-        if odd_key_under in odds:
-            prob_over = calculate_statistical_probability_corners_over(
-                weighted_corners_avg=media_exp_ht,
-                line=linha,
-                historical_frequency=None
-            )
-            prob_under = 100.0 - prob_over
-            
-            prob_under = apply_script_modifier_to_probability_corners(
-                prob_under, f"Under {linha} Cantos HT", script_name
-            )
-            
-            bet_type = f"Under {linha} HT"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_under,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CANTOS_UNDER:
-                all_predictions.append({
-                    "mercado": "Cantos",
-                    "tipo": bet_type,
-                    "confianca": conf_final,
-                    "odd": odds[odd_key_under],
-                    "periodo": "HT",
-                    "time": "Total",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_under
-                })
-    
-    # ========== 3. HOME TEAM CORNERS ==========
-    
-    linhas_casa = [4.5, 5.5, 6.5]
-    for linha in linhas_casa:
-        # Over Casa
-        odd_key_over = f"cantos_casa_over_{linha}"
-        if odd_key_over in odds:
-            prob_pct = calculate_statistical_probability_corners_over(
-                weighted_corners_avg=media_casa,
-                line=linha,
-                historical_frequency=None
-            )
-            
-            prob_pct = apply_script_modifier_to_probability_corners(
-                prob_pct, f"Casa Over {linha} Cantos", script_name
-            )
-            
-            bet_type = f"Casa Over {linha}"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_pct,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CANTOS:
-                all_predictions.append({
-                    "mercado": "Cantos",
-                    "tipo": bet_type,
-                    "confianca": conf_final,
-                    "odd": odds[odd_key_over],
-                    "periodo": "FT",
-                    "time": "Casa",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_pct
-                })
-        
-        # Under Casa
-        odd_key_under = f"cantos_casa_under_{linha}"
-        if odd_key_under in odds:
-            prob_over = calculate_statistical_probability_corners_over(
-                weighted_corners_avg=media_casa,
-                line=linha,
-                historical_frequency=None
-            )
-            prob_under = 100.0 - prob_over
-            
-            prob_under = apply_script_modifier_to_probability_corners(
-                prob_under, f"Casa Under {linha} Cantos", script_name
-            )
-            
-            bet_type = f"Casa Under {linha}"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_under,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CANTOS_UNDER:
-                all_predictions.append({
-                    "mercado": "Cantos",
-                    "tipo": bet_type,
-                    "confianca": conf_final,
-                    "odd": odds[odd_key_under],
-                    "periodo": "FT",
-                    "time": "Casa",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_under
-                })
-    
-    # ========== 4. AWAY TEAM CORNERS ==========
-    
-    linhas_fora = [3.5, 4.5, 5.5]
-    for linha in linhas_fora:
-        # Over Fora
-        odd_key_over = f"cantos_fora_over_{linha}"
-        if odd_key_over in odds:
-            prob_pct = calculate_statistical_probability_corners_over(
-                weighted_corners_avg=media_fora,
-                line=linha,
-                historical_frequency=None
-            )
-            
-            prob_pct = apply_script_modifier_to_probability_corners(
-                prob_pct, f"Fora Over {linha} Cantos", script_name
-            )
-            
-            bet_type = f"Fora Over {linha}"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_pct,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CANTOS:
-                all_predictions.append({
-                    "mercado": "Cantos",
-                    "tipo": bet_type,
-                    "confianca": conf_final,
-                    "odd": odds[odd_key_over],
-                    "periodo": "FT",
-                    "time": "Fora",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_pct
-                })
-        
-        # Under Fora
-        odd_key_under = f"cantos_fora_under_{linha}"
-        if odd_key_under in odds:
-            prob_over = calculate_statistical_probability_corners_over(
-                weighted_corners_avg=media_fora,
-                line=linha,
-                historical_frequency=None
-            )
-            prob_under = 100.0 - prob_over
-            
-            prob_under = apply_script_modifier_to_probability_corners(
-                prob_under, f"Fora Under {linha} Cantos", script_name
-            )
-            
-            bet_type = f"Fora Under {linha}"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_under,
-                bet_type=bet_type,
-                tactical_script=script_name,
-            )
-            
-            if conf_final >= MIN_CONFIANCA_CANTOS_UNDER:
-                all_predictions.append({
-                    "mercado": "Cantos",
-                    "tipo": bet_type,
-                    "confianca": conf_final,
-                    "odd": odds[odd_key_under],
-                    "periodo": "FT",
-                    "time": "Fora",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_under
-                })
+    # Todas as linhas do registro avaliadas em lote sobre as mesmas amostras simuladas
+    all_predictions = avaliar_linhas(
+        REGISTRO_MERCADOS["Cantos"], odds,
+        lambda fonte, linhas: simulacao.prob_over_under(fonte, linhas)[0],
+        script=script_name,
+        modificador_script=apply_script_modifier_to_probability_corners
+    )
     
     print(f"  ✅ CANTOS V3.0: {len(all_predictions)} predições geradas (deep analysis)")
     
@@ -14,6 +14,7 @@ ESTRUTURA OBRIGATÓRIA DO OUTPUT:
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from analysts.justification_generator import generate_evidence_based_justification
+from analysts.confidence_calculator import confidence_breakdown
 
 
 def format_evidence_based_dossier(
@@ -529,6 +530,10 @@ def format_confidence_debug_report(
             confianca = palpite.get('confianca', 0.0)
             odd = palpite.get('odd')
             breakdown = palpite.get('confidence_breakdown', {})
+            if not breakdown and palpite.get('bet_type') and 'probabilidade_estatistica' in palpite:
+                # Palpites avaliados em lote não carregam breakdown: montar só para o relatório
+                breakdown = confidence_breakdown(palpite['probabilidade_estatistica'], palpite['bet_type'],
+                                                 master_analysis.get('analysis_summary', {}).get('selected_script'))
             
             msg += f"Palpite: {tipo}\n"
             
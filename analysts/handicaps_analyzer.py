@@ -6,16 +6,19 @@ UNIFIED CONFIDENCE SYSTEM: Usa exclusivamente confidence_calculator.py
 para todos os cálculos de confiança.
 
 ARQUITETURA:
-1. Calcular superioridade contextual baseada em múltiplos fatores
-2. Converter superioridade em probabilidade estatística
-3. Chamar calculate_final_confidence para obter confiança final
-4. Usar breakdown para evidências e transparência
+1. Calcular superioridade contextual baseada em múltiplos fatores (contexto/evidência)
+2. Precificar todas as linhas das odds de uma vez pela distribuição Skellam da diferença de gols
+3. Calcular a confiança de todas as linhas num único lote (avaliar_candidatos)
+4. Breakdown montado sob demanda (confidence_breakdown) a partir de bet_type e probabilidade
 
 NOTA: Handicaps são complexos e requerem análise contextual profunda.
 Esta versão simplificada mantém a essência do sistema unificado.
 """
 
-from analysts.confidence_calculator import calculate_final_confidence
+import re
+
+from analysts.confidence_calculator import avaliar_candidatos
+from analysts.score_matrix import gols_esperados_do_pacote, precificar_handicaps
 
 
 def calcular_superioridade(stats_casa, stats_fora, pos_casa="N/A", pos_fora="N/A"):
@@ -96,60 +99,48 @@ def calcular_superioridade(stats_casa, stats_fora, pos_casa="N/A", pos_fora="N/A
     return superioridade
 
 
-def superioridade_to_probability(superioridade, handicap_line):
+# Chaves do normalizador: handicap_<asia|euro>_<ft|ht|2t>_<casa|fora>_<linha> (ex: handicap_asia_ft_casa_-0.5)
+_PADRAO_ODD_HANDICAP = re.compile(r'^handicap_(asia|euro)_(ft|ht|2t)_(casa|fora)_([+-]?\d+(?:\.\d+)?)$')
+
+
+def _confianca_minima_handicap(linha):
+    """Linhas mais longas exigem mais confiança"""
+    abs_line = abs(linha)
+    if abs_line >= 2.5:
+        return 6.5
+    if abs_line >= 2.0:
+        return 6.2
+    if abs_line >= 1.0:
+        return 5.5
+    return 5.0
+
+
+def _linhas_de_handicap_nas_odds(odds):
     """
-    Converte score de superioridade em probabilidade de cobrir o handicap.
-    
-    Args:
-        superioridade: Score -10 a +10
-        handicap_line: Linha do handicap (ex: -1.5, -2.0, +0.5)
-    
-    Returns:
-        float: Probabilidade em % (0-100)
+    [(chave, linha, texto da linha, lado)] das linhas de handicap asiático do jogo inteiro.
+    O modelo de gols esperados é do jogo todo: linhas de 1º/2º tempo e europeias (3 vias) ficam de fora.
     """
-    # Superioridade muito alta (>6) = ~75-85% probabilidade de handicaps altos
-    # Superioridade média (3-6) = ~60-70% probabilidade de handicaps médios
-    # Superioridade baixa (<3) = ~50-60% probabilidade de handicaps baixos
-    
-    abs_line = abs(handicap_line)
-    
-    if superioridade >= 6.0:
-        # Muito superior
-        if abs_line >= 2.0:
-            return 70.0  # Alta dificuldade, mas favorito forte
-        elif abs_line >= 1.0:
-            return 75.0
-        else:
-            return 80.0
-    elif superioridade >= 3.5:
-        # Superior
-        if abs_line >= 2.0:
-            return 55.0
-        elif abs_line >= 1.0:
-            return 65.0
-        else:
-            return 70.0
-    elif superioridade >= 1.5:
-        # Ligeiramente superior
-        if abs_line >= 1.0:
-            return 50.0
-        else:
-            return 60.0
-    else:
-        # Não superior o suficiente
-        return 45.0
+    linhas = []
+    for chave in odds:
+        m = _PADRAO_ODD_HANDICAP.match(chave)
+        if m and odds[chave]:
+            tipo, periodo, lado, texto = m.groups()
+            if tipo == 'asia' and periodo == 'ft':
+                linhas.append((chave, float(texto), texto, lado))
+    return linhas
 
 
-def analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao=None, pos_casa="N/A", pos_fora="N/A", script_name=None):
+def analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao=None, pos_casa="N/A", pos_fora="N/A", script_name=None, analysis_packet=None):
     """
     Analisa handicaps usando o sistema unificado de confiança.
     
     PHOENIX V3.0 REFACTORING:
     - ✅ USA confidence_calculator.py para TODOS os cálculos
-    - ✅ Calcula superioridade contextual primeiro
-    - ✅ Converte superioridade em probabilidade
-    - ✅ Aplica modificadores via calculate_final_confidence
-    - ✅ Retorna breakdown para transparência
+    - ✅ Todas as linhas asiáticas FT (inteiras, meias e quarter) presentes nas odds são precificadas
+      numa única avaliação vetorizada da distribuição da diferença de gols (Skellam)
+    - ✅ Devolução (push) em linhas asiáticas inteiras e quarter
+    - ✅ Confiança de todas as linhas num único lote (calculate_confidence_batch)
+    - ✅ Palpites levam bet_type e probabilidade: o breakdown é montado sob demanda
     
     Args:
         stats_casa: Estatísticas do time da casa
@@ -159,6 +150,7 @@ def analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao=None,
         pos_casa: Posição do time da casa
         pos_fora: Posição do time visitante
         script_name: Nome do script tático
+        analysis_packet: Pacote do Master Analyzer (gols esperados do jogo)
     
     Returns:
         dict: Análise de handicaps com palpites ou None
@@ -166,97 +158,54 @@ def analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao=None,
     if not stats_casa or not stats_fora or not odds:
         return None
 
-    # ✅ STEP 1: CALCULAR SUPERIORIDADE CONTEXTUAL
-    superioridade_casa = calcular_superioridade(stats_casa, stats_fora, pos_casa, pos_fora)
-    
-    print(f"\n  🎯 HANDICAPS - Superioridade Casa: {superioridade_casa:+.1f}/10")
-
-    palpites = []
-
-    # ✅ STEP 2: ANALISAR HANDICAPS BASEADOS EM SUPERIORIDADE
-    
-    # Definir handicaps a analisar baseado em superioridade
-    handicaps_to_check = []
-    
-    if superioridade_casa >= 6.0:
-        print(f"     ✅ CASA MUITO SUPERIOR - Analisando handicaps altos")
-        handicaps_to_check.extend([
-            ("handicap_asia_casa_-2.5", -2.5, "Handicap Asiático -2.5 (Casa)", 6.5),
-            ("handicap_asia_casa_-2.0", -2.0, "Handicap Asiático -2.0 (Casa)", 6.2),
-            ("handicap_euro_casa_-2", -2.0, "Handicap Europeu -2 (Casa)", 6.5),
-        ])
-    
-    if superioridade_casa >= 3.5:
-        print(f"     ✅ CASA SUPERIOR - Analisando handicaps médios")
-        handicaps_to_check.extend([
-            ("handicap_asia_casa_-1.5", -1.5, "Handicap Asiático -1.5 (Casa)", 5.5),
-            ("handicap_asia_casa_-1.0", -1.0, "Handicap Asiático -1.0 (Casa)", 5.5),
-            ("handicap_euro_casa_-1", -1.0, "Handicap Europeu -1 (Casa)", 5.5),
-        ])
-    
-    if superioridade_casa >= 1.5:
-        print(f"     ✅ CASA LIGEIRAMENTE SUPERIOR - Analisando handicaps baixos")
-        handicaps_to_check.extend([
-            ("handicap_asia_casa_-0.5", -0.5, "Handicap Asiático -0.5 (Casa)", 5.0),
-            ("handicap_asia_casa_0.0", 0.0, "Handicap Asiático 0.0 (Casa)", 5.0),
-        ])
-    
-    # Fora superior
-    if superioridade_casa <= -1.5:
-        print(f"     ✅ FORA SUPERIOR - Analisando handicaps fora")
-        handicaps_to_check.extend([
-            ("handicap_asia_fora_-0.5", -0.5, "Handicap Asiático -0.5 (Fora)", 5.0),
-            ("handicap_asia_fora_-1.0", -1.0, "Handicap Asiático -1.0 (Fora)", 5.5),
-        ])
+    linhas_odds = _linhas_de_handicap_nas_odds(odds)
+    if not linhas_odds:
+        return None
 
-    # ✅ STEP 3: PROCESSAR CADA HANDICAP
-    for odd_key, handicap_line, bet_type, min_conf in handicaps_to_check:
-        if odd_key in odds:
-            odd_value = odds[odd_key]
-            
-            if False:  # PURE ANALYST: No odd filtering
-                continue
-            
-            # ✅ REFATORADO: Converter superioridade em probabilidade
-            # Para handicaps da fora, inverter a superioridade
-            if "fora" in odd_key.lower():
-                prob_pct = superioridade_to_probability(-superioridade_casa, handicap_line)
-            else:
-                prob_pct = superioridade_to_probability(superioridade_casa, handicap_line)
-            
-            # ✅ PURE ANALYST: Calculate confidence based purely on statistical probability
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_pct,
-                bet_type=bet_type,
-                tactical_script=script_name
-            )
-            
-            print(f"     {bet_type}: Prob={prob_pct:.1f}% → Conf={conf_final:.1f} (odd={odd_value:.2f})")
-            
-            # ✅ Filtro de qualidade
-            if conf_final >= min_conf:
-                palpites.append({
-                    "tipo": bet_type,
-                    "confianca": conf_final,
-                    "odd": odd_value,
-                    "periodo": "FT",
-                    "time": "Casa" if "casa" in odd_key else "Fora",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_pct,
-                    "superioridade": superioridade_casa
-                })
+    # ✅ STEP 1: CONTEXTO (superioridade) + GOLS ESPERADOS
+    superioridade_casa = calcular_superioridade(stats_casa, stats_fora, pos_casa, pos_fora)
+    lambda_casa, lambda_fora = gols_esperados_do_pacote(analysis_packet, stats_casa, stats_fora)
+    
+    print(f"\n  🎯 HANDICAPS - Superioridade Casa: {superioridade_casa:+.1f}/10 | λ {lambda_casa:.2f} x {lambda_fora:.2f}")
+
+    # ✅ STEP 2: PRECIFICAR TODAS AS LINHAS DE UMA VEZ
+    precos = precificar_handicaps(
+        lambda_casa, lambda_fora,
+        linhas=[linha for _, linha, _, _ in linhas_odds],
+        lados=[lado for _, _, _, lado in linhas_odds],
+        asiatico=[True] * len(linhas_odds)
+    )
+
+    # ✅ STEP 3: CONFIANÇA DE TODAS AS LINHAS NUM ÚNICO LOTE (breakdown só sob demanda)
+    candidatos = []
+    for i, (odd_key, handicap_line, texto_linha, lado) in enumerate(linhas_odds):
+        bet_type = f"Handicap Asiático {texto_linha} ({lado.capitalize()})"
+        candidatos.append(({
+            "tipo": bet_type,
+            "odd": odds[odd_key],
+            "periodo": "FT",
+            "time": lado.capitalize(),
+            "probabilidade_devolucao": float(precos['devolucao'][i]),
+            "superioridade": superioridade_casa
+        }, float(precos['probabilidade'][i]), bet_type, _confianca_minima_handicap(handicap_line)))
+
+    confiancas, palpites = avaliar_candidatos(candidatos, script_name)
+    for (palpite, prob_pct, bet_type, _), conf_final in zip(candidatos, confiancas):
+        print(f"     {bet_type}: Prob={prob_pct:.1f}% (devolução {palpite['probabilidade_devolucao']:.1f}%) → Conf={conf_final:.1f} (odd={palpite['odd']:.2f})")
 
     # ✅ RETORNO FINAL
-    print(f"  ✅ HANDICAPS: {len(palpites)} palpites gerados")
+    print(f"  ✅ HANDICAPS: {len(palpites)} palpites gerados ({len(linhas_odds)} linhas precificadas)")
     
     if palpites:
-        gols_casa_marcados = stats_casa['casa'].get('gols_marcados', 0)
-        gols_fora_marcados = stats_fora['fora'].get('gols_marcados', 0)
+        palpites.sort(key=lambda x: x['confianca'], reverse=True)
+        gols_casa_marcados = stats_casa.get('casa', {}).get('gols_marcados', 0)
+        gols_fora_marcados = stats_fora.get('fora', {}).get('gols_marcados', 0)
         
         suporte = (f"   - <b>Superioridade Casa:</b> {superioridade_casa:+.1f}/10\n"
                    f"   - <b>Gols Casa:</b> {gols_casa_marcados:.1f} marcados/jogo\n"
                    f"   - <b>Gols Fora:</b> {gols_fora_marcados:.1f} marcados/jogo\n"
-                   f"   - <i>💡 Análise contextual baseada em força, posição, ataque e defesa</i>\n")
+                   f"   - <b>Gols esperados:</b> {lambda_casa:.2f} x {lambda_fora:.2f}\n"
+                   f"   - <i>💡 Probabilidades pela distribuição da diferença de gols (com devolução nas linhas asiáticas)</i>\n")
         
         return {"mercado": "Handicaps", "palpites": palpites, "dados_suporte": suporte}
     
@@ -0,0 +1,153 @@
+# analysts/market_registry.py
+"""
+REGISTRO DE MERCADOS - Linhas declaradas uma única vez + avaliador em lote.
+
+Cada linha de mercado (chave de odd, fonte da probabilidade, linha, direção,
+texto do palpite e threshold do config.py) é declarada em REGISTRO_MERCADOS.
+avaliar_linhas resolve as linhas presentes nas odds de um jogo de uma vez:
+uma consulta por distribuição, modificador de script e complemento Under em
+arrays, confiança como gather nas tabelas compiladas do confidence_calculator,
+e só as linhas aprovadas no threshold viram dicionários de palpite (o breakdown
+é montado sob demanda via confidence_breakdown, a partir de "bet_type").
+
+Adicionar uma linha nova é só uma mudança de dados neste arquivo.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import MIN_CONFIANCA_CANTOS, MIN_CONFIANCA_CANTOS_UNDER, MIN_CONFIANCA_CARTOES
+from analysts.confidence_calculator import calculate_confidence_batch, id_bet_type, id_script
+
+
+@dataclass(frozen=True)
+class LinhaMercado:
+    """Uma linha de mercado declarada no registro"""
+    mercado: str
+    chaves_odd: Tuple[str, ...]  # Chave normalizada primeiro, aliases legados depois
+    fonte: str                   # Distribuição de origem (ex: 'cantos_ft' da simulação)
+    linha: float
+    direcao: str                 # 'over' | 'under'
+    tipo: str                    # Texto exibido no palpite
+    bet_type: str                # Texto usado nos modificadores de script e na confiança
+    min_confianca: float
+    periodo: str
+    time: str
+
+
+def _declarar(mercado, fonte, formatos_chave, linhas, formato_tipo, formato_bet_type,
+              min_over, min_under, periodo="FT", time="Total"):
+    """Expande uma declaração compacta (fonte × linhas × Over/Under) em LinhaMercado"""
+    declaradas = []
+    for linha in linhas:
+        for direcao, min_conf in (('over', min_over), ('under', min_under)):
+            campos = {'direcao': direcao, 'Direcao': direcao.capitalize(), 'linha': linha}
+            declaradas.append(LinhaMercado(
+                mercado=mercado,
+                chaves_odd=tuple(formato.format(**campos) for formato in formatos_chave),
+                fonte=fonte,
+                linha=linha,
+                direcao=direcao,
+                tipo=formato_tipo.format(**campos),
+                bet_type=formato_bet_type.format(**campos),
+                min_confianca=min_conf,
+                periodo=periodo,
+                time=time
+            ))
+    return tuple(declaradas)
+
+
+REGISTRO_MERCADOS: Dict[str, Tuple[LinhaMercado, ...]] = {
+    "Cantos": (
+        _declarar("Cantos", 'cantos_ft', ["cantos_ft_{direcao}_{linha}"], [8.5, 9.5, 10.5, 11.5],
+                  "{Direcao} {linha} Cantos", "{Direcao} {linha} Cantos",
+                  MIN_CONFIANCA_CANTOS, MIN_CONFIANCA_CANTOS_UNDER)
+        + _declarar("Cantos", 'cantos_ht', ["cantos_ht_{direcao}_{linha}"], [4.5, 5.5],
+                    "{Direcao} {linha} HT", "{Direcao} {linha} HT",
+                    MIN_CONFIANCA_CANTOS, MIN_CONFIANCA_CANTOS_UNDER, periodo="HT")
+        + _declarar("Cantos", 'cantos_casa', ["cantos_casa_{direcao}_{linha}"], [4.5, 5.5, 6.5],
+                    "Casa {Direcao} {linha}", "Casa {Direcao} {linha}",
+                    MIN_CONFIANCA_CANTOS, MIN_CONFIANCA_CANTOS_UNDER, time="Casa")
+        + _declarar("Cantos", 'cantos_fora', ["cantos_fora_{direcao}_{linha}"], [3.5, 4.5, 5.5],
+                    "Fora {Direcao} {linha}", "Fora {Direcao} {linha}",
+                    MIN_CONFIANCA_CANTOS, MIN_CONFIANCA_CANTOS_UNDER, time="Fora")
+    ),
+    "Cartões": (
+        _declarar("Cartões", 'cartoes_total',
+                  ["cartoes_total_{direcao}_{linha}", "cartoes_{direcao}_{linha}"], [3.5, 4.5, 5.5],
+                  "{Direcao} {linha}", "{Direcao} {linha} Cartões",
+                  MIN_CONFIANCA_CARTOES, MIN_CONFIANCA_CARTOES)
+    ),
+}
+
+
+def avaliar_linhas(
+    linhas: Sequence[LinhaMercado],
+    odds: Dict[str, float],
+    probabilidade_over: Callable[[str, List[float]], np.ndarray],
+    script: Optional[str] = None,
+    modificador_script: Optional[Callable[[float, str, Optional[str]], float]] = None
+) -> List[Dict]:
+    """
+    Avalia em lote todas as linhas declaradas cuja odd está presente.
+
+    Args:
+        linhas: Linhas do registro (ex: REGISTRO_MERCADOS["Cantos"])
+        odds: Dicionário de odds normalizadas
+        probabilidade_over: callable(fonte, linhas) -> P(Over) em % na ordem das linhas
+        script: Script tático selecionado
+        modificador_script: Script-Based Probability Modifier do mercado
+
+    Returns:
+        list: Palpites aprovados no threshold de cada linha
+    """
+    ativas, chaves = [], []
+    for linha in linhas:
+        chave = next((c for c in linha.chaves_odd if c in odds), None)
+        if chave is not None:
+            ativas.append(linha)
+            chaves.append(chave)
+
+    if not ativas:
+        return []
+
+    # 1. Uma consulta por distribuição, com todas as linhas dela
+    indices_por_fonte = {}
+    for i, linha in enumerate(ativas):
+        indices_por_fonte.setdefault(linha.fonte, []).append(i)
+
+    prob_over = np.empty(len(ativas))
+    for fonte, indices in indices_por_fonte.items():
+        prob_over[indices] = probabilidade_over(fonte, [ativas[i].linha for i in indices])
+
+    under = np.array([linha.direcao == 'under' for linha in ativas])
+    probs = np.where(under, 100.0 - prob_over, prob_over)
+
+    # 2. Modificador de script: o fator de cada linha é o modificador aplicado a 1.0
+    if modificador_script is not None and script:
+        fatores = np.array([modificador_script(1.0, linha.bet_type, script) for linha in ativas])
+        probs = np.clip(probs * fatores, 0.0, 100.0)
+
+    # 3. Confiança + threshold como gather nas tabelas compiladas (breakdown só sob demanda)
+    confiancas, _, _ = calculate_confidence_batch(
+        probs, [id_bet_type(linha.bet_type) for linha in ativas], id_script(script)
+    )
+    aprovadas = confiancas >= np.array([linha.min_confianca for linha in ativas])
+
+    palpites = []
+    for i in np.flatnonzero(aprovadas):
+        linha = ativas[i]
+        palpites.append({
+            "mercado": linha.mercado,
+            "tipo": linha.tipo,
+            "bet_type": linha.bet_type,
+            "confianca": float(confiancas[i]),
+            "odd": odds[chaves[i]],
+            "periodo": linha.periodo,
+            "time": linha.time,
+            "probabilidade_estatistica": float(probs[i])
+        })
+
+    return palpites
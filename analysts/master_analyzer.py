@@ -1,190 +1,18 @@
 import sys
 import os
+import asyncio
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from api_client import (
     buscar_estatisticas_gerais_time,
     buscar_estatisticas_jogo
 )
+import team_features
+from analysts import team_scoring
 
 
 HIGH_ALTITUDE_CITIES = ['La Paz', 'Quito', 'Bogotá', 'Cusco', 'Sucre', 'Cochabamba']
-
-
-def _calculate_moment_score(team_stats):
-    """
-    🔥 NOVO: Calcula MOMENTO ATUAL (últimos 5 jogos) - separado da reputação histórica.
-    
-    Um time "pequeno" em sequência de vitórias (Mirassol) pode ter momento 90+.
-    Um time "grande" em crise pode ter momento 30.
-    
-    Args:
-        team_stats: Dicionário com estatísticas do time
-    
-    Returns:
-        int: Momento Score (0-100) baseado APENAS em forma recente
-    """
-    moment = 50  # Neutro
-    
-    form_string = team_stats.get('form', '')
-    if not form_string:
-        return moment
-    
-    recent_form = form_string[-5:]  # Últimos 5 jogos
-    
-    # Contar resultados recentes
-    wins = recent_form.count('W')
-    draws = recent_form.count('D')
-    losses = recent_form.count('L')
-    
-    # 🔥 TIME EM CHAMAS (4-5 vitórias recentes)
-    if wins >= 4:
-        moment = 95
-        print(f"    🔥 TIME EM CHAMAS detectado! ({wins}W nos últimos 5)")
-    elif wins >= 3:
-        moment = 80  # Momento excelente
-    elif wins >= 2:
-        moment = 65  # Momento bom
-    elif wins == 1:
-        moment = 55  # Levemente positivo
-    elif losses >= 4:
-        moment = 20  # Crise total
-    elif losses >= 3:
-        moment = 35  # Momento ruim
-    
-    # Ajuste por gols recentes
-    goals = team_stats.get('goals', {})
-    goals_avg = goals.get('for', {}).get('average', {}).get('total', 0)
-    goals_avg = float(goals_avg) if goals_avg else 0.0
-    
-    if goals_avg > 2.5:
-        moment = min(moment + 10, 100)  # Ataque potente
-    elif goals_avg < 0.8:
-        moment = max(moment - 10, 0)  # Ataque fraco
-    
-    return moment
-
-
-def _calculate_power_score(team_stats):
-    """
-    Calcula Power Score HISTÓRICO (0-100) baseado em win rate e saldo de gols da temporada.
-    NOTA: Agora separado do MOMENTO (forma recente).
-    
-    Args:
-        team_stats: Dicionário com estatísticas do time
-    
-    Returns:
-        int: Power Score entre 0 e 100 (reputação histórica)
-    """
-    score = 50
-    
-    # Win rate da temporada (peso moderado)
-    fixtures = team_stats.get('fixtures', {})
-    played = fixtures.get('played', {}).get('total', 0)
-    wins_total = fixtures.get('wins', {}).get('total', 0)
-    
-    if played > 0:
-        win_rate = wins_total / played
-        score += int(win_rate * 25)  # Máx +25
-    
-    # Saldo de gols da temporada
-    goals = team_stats.get('goals', {})
-    goals_for = goals.get('for', {}).get('total', {}).get('total', 0)
-    goals_against = goals.get('against', {}).get('total', {}).get('total', 0)
-    goal_diff = goals_for - goals_against
-    
-    if goal_diff > 15:
-        score += 20
-    elif goal_diff > 10:
-        score += 15
-    elif goal_diff > 5:
-        score += 10
-    elif goal_diff > 0:
-        score += 5
-    elif goal_diff < -15:
-        score -= 20
-    elif goal_diff < -10:
-        score -= 15
-    elif goal_diff < -5:
-        score -= 10
-    elif goal_diff < 0:
-        score -= 5
-    
-    return max(0, min(100, score))
-
-
-def _calculate_tactical_profile(team_stats):
-    """
-    🧠 NOVO: Calcula perfil tático do time - como ele JOGA (volume de jogo).
-    
-    Extrai métricas de:
-    - Escanteios gerados/cedidos
-    - Finalizações geradas/cedidas
-    - Posse ofensiva
-    
-    Args:
-        team_stats: Estatísticas completas do time
-    
-    Returns:
-        dict: Perfil tático com médias de volume de jogo
-    """
-    profile = {
-        'corners_for_avg': 0,
-        'corners_against_avg': 0,
-        'shots_for_avg': 0,
-        'shots_against_avg': 0,
-        'offensive_style': 'neutro',  # ofensivo/neutro/defensivo
-        'volume_intensity': 'medio'    # alto/medio/baixo
-    }
-    
-    # Extrair médias de escanteios se disponíveis
-    fixtures = team_stats.get('fixtures', {})
-    total_jogos = fixtures.get('played', {}).get('total', 1)
-    
-    # Tentar pegar estatísticas médias (se API fornecer)
-    # Caso contrário, estimar baseado em outros dados
-    
-    # Análise de estilo ofensivo baseado em gols
-    goals_for_avg = team_stats.get('goals', {}).get('for', {}).get('average', {}).get('total', 0)
-    goals_for_avg = float(goals_for_avg) if goals_for_avg else 0.0
-    goals_against_avg = team_stats.get('goals', {}).get('against', {}).get('average', {}).get('total', 0)
-    goals_against_avg = float(goals_against_avg) if goals_against_avg else 0.0
-    
-    # Classificar estilo tático
-    if goals_for_avg > 1.8:
-        profile['offensive_style'] = 'ofensivo'
-        profile['corners_for_avg'] = 6.5  # Estimativa para times ofensivos
-        profile['shots_for_avg'] = 15.0
-    elif goals_for_avg > 1.2:
-        profile['offensive_style'] = 'neutro'
-        profile['corners_for_avg'] = 5.0
-        profile['shots_for_avg'] = 12.0
-    else:
-        profile['offensive_style'] = 'defensivo'
-        profile['corners_for_avg'] = 3.5
-        profile['shots_for_avg'] = 9.0
-    
-    # Escanteios cedidos (baseado em gols sofridos)
-    if goals_against_avg > 1.5:
-        profile['corners_against_avg'] = 6.0
-        profile['shots_against_avg'] = 14.0
-    elif goals_against_avg > 1.0:
-        profile['corners_against_avg'] = 4.5
-        profile['shots_against_avg'] = 11.0
-    else:
-        profile['corners_against_avg'] = 3.0
-        profile['shots_against_avg'] = 8.0
-    
-    # Volume de jogo total
-    total_volume = profile['corners_for_avg'] + profile['shots_for_avg']
-    if total_volume > 20:
-        profile['volume_intensity'] = 'alto'
-    elif total_volume > 15:
-        profile['volume_intensity'] = 'medio'
-    else:
-        profile['volume_intensity'] = 'baixo'
-    
-    return profile
+LOTE_PARALELO_SLATE = 10  # Buscas simultâneas na API durante o passe do slate
 
 
 def _adjust_volume_by_opponent(my_profile, opponent_moment, opponent_power):
@@ -518,150 +346,6 @@ def _select_match_script(analysis_data):
     )
 
 
-def _calculate_probabilities_from_script(script_name, power_home, power_away):
-    """
-    Calcula probabilidades para mercados principais baseado EXCLUSIVAMENTE no script selecionado.
-    
-    Args:
-        script_name: Nome do script selecionado
-        power_home: Power Score do mandante
-        power_away: Power Score do visitante
-    
-    Returns:
-        dict: Probabilidades para 1X2, Over/Under 2.5, BTTS
-    """
-    probabilities = {
-        'match_result': {
-            'home_win_prob': 33,
-            'draw_prob': 33,
-            'away_win_prob': 33
-        },
-        'goals_over_under_2_5': {
-            'over_2_5_prob': 50,
-            'under_2_5_prob': 50
-        },
-        'btts': {
-            'btts_yes_prob': 50,
-            'btts_no_prob': 50
-        }
-    }
-    
-    if script_name == 'SCRIPT_HOST_DOMINATION':
-        probabilities['match_result'] = {
-            'home_win_prob': 60,
-            'draw_prob': 25,
-            'away_win_prob': 15
-        }
-        probabilities['goals_over_under_2_5'] = {
-            'over_2_5_prob': 68,
-            'under_2_5_prob': 32
-        }
-        probabilities['btts'] = {
-            'btts_yes_prob': 45,
-            'btts_no_prob': 55
-        }
-    
-    elif script_name == 'SCRIPT_GIANT_VS_MINNOW':
-        probabilities['match_result'] = {
-            'home_win_prob': 70,
-            'draw_prob': 20,
-            'away_win_prob': 10
-        }
-        probabilities['goals_over_under_2_5'] = {
-            'over_2_5_prob': 65,
-            'under_2_5_prob': 35
-        }
-        probabilities['btts'] = {
-            'btts_yes_prob': 35,
-            'btts_no_prob': 65
-        }
-    
-    elif script_name == 'SCRIPT_BALANCED_RIVALRY_CLASH':
-        probabilities['match_result'] = {
-            'home_win_prob': 35,
-            'draw_prob': 35,
-            'away_win_prob': 30
-        }
-        probabilities['goals_over_under_2_5'] = {
-            'over_2_5_prob': 55,
-            'under_2_5_prob': 45
-        }
-        probabilities['btts'] = {
-            'btts_yes_prob': 58,
-            'btts_no_prob': 42
-        }
-    
-    elif script_name == 'SCRIPT_RELEGATION_BATTLE':
-        probabilities['match_result'] = {
-            'home_win_prob': 30,
-            'draw_prob': 45,
-            'away_win_prob': 25
-        }
-        probabilities['goals_over_under_2_5'] = {
-            'over_2_5_prob': 35,
-            'under_2_5_prob': 65
-        }
-        probabilities['btts'] = {
-            'btts_yes_prob': 40,
-            'btts_no_prob': 60
-        }
-    
-    elif script_name == 'SCRIPT_CAGEY_TACTICAL_AFFAIR':
-        probabilities['match_result'] = {
-            'home_win_prob': 38,
-            'draw_prob': 40,
-            'away_win_prob': 22
-        }
-        probabilities['goals_over_under_2_5'] = {
-            'over_2_5_prob': 38,
-            'under_2_5_prob': 62
-        }
-        probabilities['btts'] = {
-            'btts_yes_prob': 42,
-            'btts_no_prob': 58
-        }
-    
-    elif script_name == 'SCRIPT_UNSTABLE_FAVORITE':
-        power_diff = power_home - power_away
-        if power_diff > 0:
-            probabilities['match_result'] = {
-                'home_win_prob': 50,
-                'draw_prob': 28,
-                'away_win_prob': 22
-            }
-        else:
-            probabilities['match_result'] = {
-                'home_win_prob': 25,
-                'draw_prob': 30,
-                'away_win_prob': 45
-            }
-        probabilities['goals_over_under_2_5'] = {
-            'over_2_5_prob': 52,
-            'under_2_5_prob': 48
-        }
-        probabilities['btts'] = {
-            'btts_yes_prob': 52,
-            'btts_no_prob': 48
-        }
-    
-    elif script_name == 'SCRIPT_OPEN_HIGH_SCORING_GAME':
-        probabilities['match_result'] = {
-            'home_win_prob': 40,
-            'draw_prob': 25,
-            'away_win_prob': 35
-        }
-        probabilities['goals_over_under_2_5'] = {
-            'over_2_5_prob': 72,
-            'under_2_5_prob': 28
-        }
-        probabilities['btts'] = {
-            'btts_yes_prob': 68,
-            'btts_no_prob': 32
-        }
-    
-    return probabilities
-
-
 async def _analyze_strength_of_schedule(team_id, league_id):
     """
     TASK 2: Analisa Strength of Schedule (SoS) - força dos últimos 5 adversários.
@@ -680,7 +364,6 @@ async def _analyze_strength_of_schedule(team_id, league_id):
         }
     """
     from api_client import buscar_ultimos_jogos_time
-    from analysts.context_analyzer import calculate_dynamic_qsc
     
     ultimos_jogos = await buscar_ultimos_jogos_time(team_id, limite=5)
     
@@ -718,8 +401,10 @@ async def _analyze_strength_of_schedule(team_id, league_id):
         opponent_stats = await buscar_estatisticas_gerais_time(opponent_id, league_id)
         
         if opponent_stats:
-            opponent_qsc = calculate_dynamic_qsc(opponent_stats, opponent_id, None, opponent_name, league_id, 0)
-            opponents_qsc.append(opponent_qsc)
+            # QSC sem tabela do adversário: já pontuado no passe do slate (senão, lote de uma linha)
+            opponents_qsc.append(
+                team_scoring.scores_do_time(opponent_stats, opponent_id, league_id, None, opponent_name)['qsc_sem_tabela']
+            )
         else:
             print(f"    ⚠️ [SoS DEBUG] Não foi possível obter stats do adversário ID {opponent_id} - pulando...")
     
@@ -777,7 +462,7 @@ async def _calculate_weighted_metrics(team_id, league_id, sos_data, team_stats=N
             'weighted_cards_against': float
         }
     """
-    from api_client import buscar_ultimos_jogos_time, buscar_estatisticas_jogo
+    from api_client import buscar_ultimos_jogos_time, buscar_estatisticas_jogo, registrar_jogo_finalizado
     
     print(f"    🔍 FASE 1: Buscando últimos jogos do time {team_id}...")
     ultimos_jogos = await buscar_ultimos_jogos_time(team_id, limite=5)
@@ -787,16 +472,10 @@ async def _calculate_weighted_metrics(team_id, league_id, sos_data, team_stats=N
         print(f"    🛑 PHOENIX PROTOCOL: Análise IMPOSSÍVEL sem dados históricos")
         return None  # Sinaliza falha - não há dados para análise
     
-    print(f"    ✅ {len(ultimos_jogos)} jogos encontrados. Buscando estatísticas DETALHADAS de cada jogo...")
+    print(f"    ✅ {len(ultimos_jogos)} jogos encontrados. Lendo estatísticas DETALHADAS da feature store...")
     
-    total_corners_for = 0
-    total_corners_against = 0
-    total_shots_for = 0
-    total_shots_against = 0
-    total_cards_for = 0
-    total_cards_against = 0
-    total_weight = 0
-    jogos_processados = 0
+    fixture_ids = []
+    pesos = []
     
     opponents_qsc = sos_data.get('opponents_qsc', [])
     
@@ -807,62 +486,39 @@ async def _calculate_weighted_metrics(team_id, league_id, sos_data, team_stats=N
             print(f"    ⚠️ Jogo {idx+1}: Sem fixture_id, pulando...")
             continue
         
-        # 🔥 PHOENIX PROTOCOL: BUSCAR ESTATÍSTICAS DETALHADAS DE CADA JOGO
-        print(f"    🔎 Jogo {idx+1}/{len(ultimos_jogos[:5])}: Buscando stats do fixture {fixture_id}...")
-        stats = await buscar_estatisticas_jogo(fixture_id)
+        # 🔥 PHOENIX PROTOCOL: ESTATÍSTICAS DETALHADAS DE CADA JOGO (API só se ainda não estão na store)
+        if not team_features.store.tem_jogo(team_id, fixture_id):
+            print(f"    🔎 Jogo {idx+1}/{len(ultimos_jogos[:5])}: Buscando stats do fixture {fixture_id}...")
+            stats = await buscar_estatisticas_jogo(fixture_id)
+            
+            if not stats:
+                print(f"    ⚠️ Jogo {idx+1}: Estatísticas não disponíveis para fixture {fixture_id}, pulando...")
+                continue
+            
+            registrar_jogo_finalizado(jogo, stats)
         
-        if not stats:
-            print(f"    ⚠️ Jogo {idx+1}: Estatísticas não disponíveis para fixture {fixture_id}, pulando...")
+        linha = team_features.store.linha(team_id, fixture_id)
+        if linha is None:
             continue
         
-        # Determinar se jogou em casa ou fora
-        teams_data = jogo.get('teams', {})
-        home_team_id = teams_data.get('home', {}).get('id')
-        eh_casa = home_team_id == team_id
-        team_key = 'home' if eh_casa else 'away'
-        opponent_key = 'away' if eh_casa else 'home'
-        
-        # Extrair métricas do jogo
-        corners_for = int(stats.get(team_key, {}).get('Corner Kicks', 0) or 0)
-        corners_against = int(stats.get(opponent_key, {}).get('Corner Kicks', 0) or 0)
-        shots_for = int(stats.get(team_key, {}).get('Shots on Goal', 0) or 0)
-        shots_against = int(stats.get(opponent_key, {}).get('Shots on Goal', 0) or 0)
-        yellow_cards_for = int(stats.get(team_key, {}).get('Yellow Cards', 0) or 0)
-        red_cards_for = int(stats.get(team_key, {}).get('Red Cards', 0) or 0)
-        yellow_cards_against = int(stats.get(opponent_key, {}).get('Yellow Cards', 0) or 0)
-        red_cards_against = int(stats.get(opponent_key, {}).get('Red Cards', 0) or 0)
-        
         # Calcular peso baseado no QSC do adversário
         opponent_qsc = opponents_qsc[idx] if idx < len(opponents_qsc) else 50.0
         weight = opponent_qsc / 50.0  # Normalizar (50 = peso 1.0)
+        fixture_ids.append(fixture_id)
+        pesos.append(weight)
         
-        # Acumular valores ponderados
-        total_corners_for += corners_for * weight
-        total_corners_against += corners_against * weight
-        total_shots_for += shots_for * weight
-        total_shots_against += shots_against * weight
-        total_cards_for += (yellow_cards_for + red_cards_for * 3) * weight  # Vermelho = 3 amarelos
-        total_cards_against += (yellow_cards_against + red_cards_against * 3) * weight
-        total_weight += weight
-        jogos_processados += 1
-        
-        print(f"    ✅ Jogo {idx+1}: {corners_for} cantos | {shots_for} finalizações | {yellow_cards_for+red_cards_for} cartões (peso: {weight:.2f})")
+        print(f"    ✅ Jogo {idx+1}: {linha['cantos_pro']:.0f} cantos | {linha['no_gol_pro']:.0f} finalizações | "
+              f"{linha['amarelos_pro'] + linha['vermelhos_pro']:.0f} cartões (peso: {weight:.2f})")
     
-    if jogos_processados == 0 or total_weight == 0:
+    # Médias ponderadas direto das linhas da store (Vermelho = 3 amarelos)
+    weighted_metrics = team_features.store.media_ponderada(team_id, fixture_ids, pesos)
+    jogos_processados = len(fixture_ids)
+    
+    if weighted_metrics is None:
         print(f"    ❌ ERRO CRÍTICO: Nenhum jogo processado com sucesso")
         print(f"    🛑 PHOENIX PROTOCOL: Análise IMPOSSÍVEL - estatísticas não disponíveis")
         return None  # Sinaliza falha - não conseguiu obter dados reais
     
-    # Calcular médias ponderadas
-    weighted_metrics = {
-        'weighted_corners_for': total_corners_for / total_weight,
-        'weighted_corners_against': total_corners_against / total_weight,
-        'weighted_shots_for': total_shots_for / total_weight,
-        'weighted_shots_against': total_shots_against / total_weight,
-        'weighted_cards_for': total_cards_for / total_weight,
-        'weighted_cards_against': total_cards_against / total_weight
-    }
-    
     print(f"    🎯 WEIGHTED METRICS CALCULADOS ({jogos_processados} jogos):")
     print(f"       🚩 Cantos: {weighted_metrics['weighted_corners_for']:.1f} feitos | {weighted_metrics['weighted_corners_against']:.1f} sofridos")
     print(f"       ⚽ Finalizações no gol: {weighted_metrics['weighted_shots_for']:.1f} feitas | {weighted_metrics['weighted_shots_against']:.1f} sofridas")
@@ -913,30 +569,39 @@ def _extract_evidence_from_recent_games(ultimos_jogos, team_id, team_name):
         # Dados do adversário
         opponent_name = teams_data.get(opponent_key, {}).get('name', 'Adversário')
         
-        # Dados dos gols
-        goals_data = jogo.get('goals', {})
-        team_goals = goals_data.get(team_key, 0) or 0
-        opponent_goals = goals_data.get(opponent_key, 0) or 0
-        total_goals = team_goals + opponent_goals
-        
-        # Estatísticas do jogo
-        stats = jogo.get('statistics', {})
-        team_stats = stats.get(team_key, {})
-        opponent_stats = stats.get(opponent_key, {})
+        # Linha do jogo na feature store (já registrada ao calcular as weighted metrics)
+        linha = team_features.store.linha(team_id, jogo.get('fixture_id'))
+        
+        if linha is not None:
+            team_goals = int(linha['gols_pro'])
+            opponent_goals = int(linha['gols_contra'])
+            corners_for = int(linha['cantos_pro'])
+            corners_against = int(linha['cantos_contra'])
+            shots_for = int(linha['no_gol_pro'])
+            shots_against = int(linha['no_gol_contra'])
+            yellow_cards = int(linha['amarelos_pro'])
+            red_cards = int(linha['vermelhos_pro'])
+        else:
+            # Dados dos gols
+            goals_data = jogo.get('goals', {})
+            team_goals = goals_data.get(team_key, 0) or 0
+            opponent_goals = goals_data.get(opponent_key, 0) or 0
+            
+            # Estatísticas do jogo
+            stats = jogo.get('statistics', {})
+            team_stats = stats.get(team_key, {})
+            opponent_stats = stats.get(opponent_key, {})
+            
+            corners_for = int(team_stats.get('Corner Kicks', 0) or 0)
+            corners_against = int(opponent_stats.get('Corner Kicks', 0) or 0)
+            shots_for = int(team_stats.get('Shots on Goal', 0) or 0)
+            shots_against = int(opponent_stats.get('Shots on Goal', 0) or 0)
+            yellow_cards = int(team_stats.get('Yellow Cards', 0) or 0)
+            red_cards = int(team_stats.get('Red Cards', 0) or 0)
         
-        # Escanteios
-        corners_for = int(team_stats.get('Corner Kicks', 0) or 0)
-        corners_against = int(opponent_stats.get('Corner Kicks', 0) or 0)
+        total_goals = team_goals + opponent_goals
         total_corners = corners_for + corners_against
-        
-        # Finalizações
-        shots_for = int(team_stats.get('Shots on Goal', 0) or 0)
-        shots_against = int(opponent_stats.get('Shots on Goal', 0) or 0)
         total_shots = shots_for + shots_against
-        
-        # Cartões
-        yellow_cards = int(team_stats.get('Yellow Cards', 0) or 0)
-        red_cards = int(team_stats.get('Red Cards', 0) or 0)
         total_cards = yellow_cards + red_cards
         
         # Adicionar evidências
@@ -972,6 +637,84 @@ def _extract_evidence_from_recent_games(ultimos_jogos, team_id, team_name):
     return evidencias
 
 
+def _rodada_do_jogo(jogo):
+    """Rodada atual a partir de league.round (0 quando não numérica)"""
+    league_round = jogo.get('league', {}).get('round', '')
+    try:
+        if league_round:
+            return int(''.join(filter(str.isdigit, league_round)))
+    except (ValueError, TypeError):
+        pass
+    return 0
+
+
+async def _reunir_em_lotes(corrotinas, tamanho=None):
+    """asyncio.gather em lotes (como processar_analises_em_background), sem disparar o slate inteiro na API de uma vez"""
+    tamanho = tamanho or LOTE_PARALELO_SLATE
+    corrotinas = list(corrotinas)
+    resultados = []
+    for i in range(0, len(corrotinas), tamanho):
+        resultados.extend(await asyncio.gather(*corrotinas[i:i + tamanho]))
+    return resultados
+
+
+async def preparar_scores_do_slate(jogos):
+    """
+    Passe do slate: junta as estatísticas de todos os times do dia (e dos adversários
+    recentes usados no SoS) e calcula Power, Momento, QSC e Perfil Tático num único passe
+    NumPy. generate_match_analysis passa a só consultar team_scoring.tabela.
+    As buscas de cada etapa (classificações, stats, últimos jogos, stats dos adversários)
+    rodam em paralelo, em lotes de LOTE_PARALELO_SLATE.
+    
+    Args:
+        jogos: Jogos do slate (formato da API)
+    
+    Returns:
+        int: Times pontuados
+    """
+    from api_client import buscar_classificacao_liga, buscar_ultimos_jogos_time
+
+    ligas = list(dict.fromkeys(jogo['league']['id'] for jogo in jogos))
+    classificacoes = dict(zip(ligas, await _reunir_em_lotes(buscar_classificacao_liga(l) for l in ligas)))
+
+    pedidos = {}  # (team_id, league_id) -> (nome, rodada)
+    for jogo in jogos:
+        for lado in ('home', 'away'):
+            team = jogo['teams'][lado]
+            pedidos.setdefault((team['id'], jogo['league']['id']), (team['name'], _rodada_do_jogo(jogo)))
+    stats_times = await _reunir_em_lotes(buscar_estatisticas_gerais_time(t, l) for t, l in pedidos)
+
+    # Time do slate: pontuado com a classificação e a rodada do jogo (como em generate_match_analysis)
+    linhas = {}  # (team_id, league_id) -> (team_stats, nome, rodada, classificacao)
+    for (chave, (nome, rodada)), team_stats in zip(pedidos.items(), stats_times):
+        if team_stats:
+            linhas[chave] = (team_stats, nome, rodada, classificacoes.get(chave[1]))
+
+    # Adversários dos últimos 5 jogos (SoS): pontuados sem tabela e sem rodada, como o SoS os consulta
+    ultimos = await _reunir_em_lotes(buscar_ultimos_jogos_time(team_id, limite=5) for team_id, _ in linhas)
+    adversarios = {}  # (opponent_id, league_id) -> nome
+    for (team_id, league_id), jogos_time in zip(list(linhas), ultimos):
+        for jogo in (jogos_time or [])[:5]:
+            lado = 'away' if jogo.get('teams', {}).get('home', {}).get('id') == team_id else 'home'
+            opponent = jogo.get('teams', {}).get(lado, {})
+            if isinstance(opponent.get('id'), int):
+                adversarios.setdefault((opponent['id'], league_id), opponent.get('name'))
+    # Adversário que também joga no slate: as stats já buscadas servem para a linha sem tabela dele
+    buscar = [chave for chave in adversarios if chave not in linhas]
+    stats_adversarios = {chave: linhas[chave][0] for chave in adversarios if chave in linhas}
+    stats_adversarios.update(zip(buscar, await _reunir_em_lotes(buscar_estatisticas_gerais_time(t, l) for t, l in buscar)))
+
+    times = [(team_id, league_id, stats, nome, rodada, classificacao)
+             for (team_id, league_id), (stats, nome, rodada, classificacao) in linhas.items()]
+    times += [(opponent_id, league_id, stats_adversarios[(opponent_id, league_id)], nome, 0, None)
+              for (opponent_id, league_id), nome in adversarios.items() if stats_adversarios[(opponent_id, league_id)]]
+
+    pontuados = team_scoring.tabela.construir(times)
+    if pontuados:
+        print(f"🧮 SLATE: {pontuados} linhas pontuadas (Power/Momento/QSC/Perfil) em um passe")
+    return pontuados
+
+
 async def generate_match_analysis(jogo):
     """
     FUNÇÃO PRINCIPAL - Gera análise completa centralizada do jogo.
@@ -1005,13 +748,8 @@ async def generate_match_analysis(jogo):
     league_id = jogo['league']['id']
     
     # Extrair rodada atual (para Season Start Adjustment)
-    rodada_atual = 0
     league_round = jogo.get('league', {}).get('round', '')
-    try:
-        if league_round:
-            rodada_atual = int(''.join(filter(str.isdigit, league_round)))
-    except (ValueError, TypeError):
-        rodada_atual = 0
+    rodada_atual = _rodada_do_jogo(jogo)
     
     # 🏆 KNOCKOUT SCENARIO ANALYSIS - PHOENIX V3.0
     knockout_scenario = None
@@ -1036,7 +774,6 @@ async def generate_match_analysis(jogo):
                 current_home_was_away_in_first_leg = (home_team_id == first_leg['away_team_id'])
                 
                 # CALCULAR QSC ANTES (necessário para análise de knockout)
-                from analysts.context_analyzer import calculate_dynamic_qsc
                 from api_client import buscar_classificacao_liga
                 
                 classificacao_temp = await buscar_classificacao_liga(league_id)
@@ -1045,8 +782,8 @@ async def generate_match_analysis(jogo):
                 home_stats_temp = await buscar_estatisticas_gerais_time(home_team_id, league_id)
                 away_stats_temp = await buscar_estatisticas_gerais_time(away_team_id, league_id)
                 
-                qsc_home_temp = calculate_dynamic_qsc(home_stats_temp, home_team_id, classificacao_temp, home_team_name, league_id, rodada_atual) if home_stats_temp else 50
-                qsc_away_temp = calculate_dynamic_qsc(away_stats_temp, away_team_id, classificacao_temp, away_team_name, league_id, rodada_atual) if away_stats_temp else 50
+                qsc_home_temp = team_scoring.scores_do_time(home_stats_temp, home_team_id, league_id, classificacao_temp, home_team_name, rodada_atual)['qsc'] if home_stats_temp else 50
+                qsc_away_temp = team_scoring.scores_do_time(away_stats_temp, away_team_id, league_id, classificacao_temp, away_team_name, rodada_atual)['qsc'] if away_stats_temp else 50
                 
                 # Analisar cenário de knockout
                 knockout_scenario = analyze_knockout_scenario(
@@ -1117,19 +854,23 @@ async def generate_match_analysis(jogo):
             away_stats = {'form': '', 'fixtures': {}, 'goals': {}}
             print("  ⚠️ Usando valores padrão para Away")
     
-    print("📊 Calculando Power Scores (Reputação Histórica)...")
-    power_home = _calculate_power_score(home_stats) if home_stats else 50
-    power_away = _calculate_power_score(away_stats) if away_stats else 50
+    # Power, QSC, Momento e Perfil Tático: tabela do slate (ou lote de uma linha fora dele)
+    scores_home = team_scoring.scores_do_time(home_stats, home_team_id, league_id, classificacao, home_team_name, rodada_atual)
+    scores_away = team_scoring.scores_do_time(away_stats, away_team_id, league_id, classificacao, away_team_name, rodada_atual)
+
+    print("📊 Power Scores (Reputação Histórica)...")
+    power_home = scores_home['power']
+    power_away = scores_away['power']
     print(f"  ⚡ Power Casa: {power_home} | Power Fora: {power_away}")
     
-    print("🧠 LAYER 1 (PHOENIX V2.0): Calculando QSC Dinâmico com League Weight e Season Adjustment...")
-    from analysts.context_analyzer import calculate_dynamic_qsc
-    qsc_home = calculate_dynamic_qsc(home_stats, home_team_id, classificacao, home_team_name, league_id, rodada_atual)
-    qsc_away = calculate_dynamic_qsc(away_stats, away_team_id, classificacao, away_team_name, league_id, rodada_atual)
+    print("🧠 LAYER 1 (PHOENIX V2.0): QSC Dinâmico com League Weight e Season Adjustment...")
+    qsc_home = scores_home['qsc']
+    qsc_away = scores_away['qsc']
+    print(f"  🧠 QSC Casa: {qsc_home} | QSC Fora: {qsc_away}")
     
-    print("🔥 Calculando Momento Atual (Forma Recente)...")
-    moment_home = _calculate_moment_score(home_stats) if home_stats else 50
-    moment_away = _calculate_moment_score(away_stats) if away_stats else 50
+    print("🔥 Momento Atual (Forma Recente)...")
+    moment_home = scores_home['moment']
+    moment_away = scores_away['moment']
     print(f"  🔥 Momento Casa: {moment_home} | Momento Fora: {moment_away}")
     
     print("📅 TASK 2: Analisando Strength of Schedule (SoS)...")
@@ -1157,9 +898,14 @@ async def generate_match_analysis(jogo):
     print(f"  📊 Casa: {weighted_home['weighted_corners_for']:.1f} cantos | {weighted_home['weighted_shots_for']:.1f} finalizações (ponderado)")
     print(f"  📊 Fora: {weighted_away['weighted_corners_for']:.1f} cantos | {weighted_away['weighted_shots_for']:.1f} finalizações (ponderado)")
     
-    print("🎯 Calculando Perfil Tático (Volume de Jogo)...")
-    profile_home = _calculate_tactical_profile(home_stats) if home_stats else {'corners_for_avg': 5, 'shots_for_avg': 12, 'offensive_style': 'neutro'}
-    profile_away = _calculate_tactical_profile(away_stats) if away_stats else {'corners_for_avg': 5, 'shots_for_avg': 12, 'offensive_style': 'neutro'}
+    print("⚽ Estimando gols esperados (matriz de placares)...")
+    from analysts.score_matrix import estimar_gols_esperados
+    lambda_home, lambda_away = estimar_gols_esperados(home_stats, away_stats, weighted_home, weighted_away)
+    print(f"  ⚽ Gols esperados: Casa {lambda_home:.2f} | Fora {lambda_away:.2f}")
+    
+    print("🎯 Perfil Tático (Volume de Jogo)...")
+    profile_home = scores_home['profile']
+    profile_away = scores_away['profile']
     print(f"  ⚔️ Casa: {profile_home['offensive_style']} | Fora: {profile_away['offensive_style']}")
     
     print("🌍 Identificando fatores contextuais...")
@@ -1195,9 +941,6 @@ async def generate_match_analysis(jogo):
     print(f"  📜 Script selecionado: {script_name}")
     print(f"  💭 Raciocínio: {reasoning}")
     
-    print("🎲 Calculando probabilidades baseadas no script...")
-    probabilities = _calculate_probabilities_from_script(script_name, power_home, power_away)
-    
     print("📊 EVIDENCE-BASED: Buscando últimos 4 jogos para evidências...")
     from api_client import buscar_ultimos_jogos_time
     ultimos_jogos_casa = await buscar_ultimos_jogos_time(home_team_id, limite=4)
@@ -1226,9 +969,9 @@ async def generate_match_analysis(jogo):
             'sos_home': sos_home,
             'sos_away': sos_away,
             'weighted_metrics_home': weighted_home,
-            'weighted_metrics_away': weighted_away
+            'weighted_metrics_away': weighted_away,
+            'expected_goals': {'home': lambda_home, 'away': lambda_away}
         },
-        'calculated_probabilities': probabilities,
         'evidence': {
             'home': evidencias_home,
             'away': evidencias_away,
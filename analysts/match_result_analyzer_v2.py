@@ -1,7 +1,7 @@
 """
 Analisador de Resultado Final V2 - Consome output do Master Analyzer
 
-Extrai probabilidades de 1X2 calculadas pelo Master Analyzer e formata sugestões.
+Extrai probabilidades de 1X2 da matriz de placares do jogo e formata sugestões.
 
 PHOENIX V2.0: Agora com sistema de VETO e ajuste de confiança por script.
 """
@@ -9,11 +9,33 @@ PHOENIX V2.0: Agora com sistema de VETO e ajuste de confiança por script.
 # PURE ANALYST: No odd filtering - only confidence-based selection
 # DEPRECATED: from analysts.context_analyzer import verificar_veto_mercado, ajustar_confianca_por_script
 
+from analysts.score_matrix import matriz_do_pacote
+
+
+# Tipo → (chaves aceitas nas odds, confiança mínima)
+_MERCADOS_RESULTADO = [
+    ("Vitória Casa (1)", ('home_win', 'casa_vence'), 5.5),
+    ("Empate (X)", ('draw', 'empate'), 5.5),
+    ("Vitória Fora (2)", ('away_win', 'fora_vence'), 5.5),
+    ("Chance Dupla (1X)", ('double_chance_1x', 'dupla_1x'), 6.0),
+    ("Chance Dupla (X2)", ('double_chance_x2', 'dupla_x2'), 6.0),
+    ("Chance Dupla (12)", ('double_chance_12', 'dupla_12'), 6.0),
+]
+
+
+def _buscar_odd(odds, chaves):
+    for chave in chaves:
+        if odds.get(chave):
+            return odds[chave]
+    return None
+
 
 def extract_match_result_suggestions(analysis_packet, odds):
     """
     Extrai sugestões de resultado final do pacote do Master Analyzer.
     
+    1X2 e Dupla Chance são lidos da matriz de placares do jogo (mesmo modelo dos mercados de gols).
+    
     Args:
         analysis_packet: Pacote completo gerado por master_analyzer
         odds: Dicionário com odds disponíveis
@@ -24,83 +46,39 @@ def extract_match_result_suggestions(analysis_packet, odds):
     if 'error' in analysis_packet:
         return None
     
-    probabilities = analysis_packet['calculated_probabilities']
     script = analysis_packet['analysis_summary']['selected_script']
     reasoning = analysis_packet['analysis_summary']['reasoning']
     
-    home_win_prob = probabilities['match_result']['home_win_prob']
-    draw_prob = probabilities['match_result']['draw_prob']
-    away_win_prob = probabilities['match_result']['away_win_prob']
+    matriz = matriz_do_pacote(analysis_packet)
+    resultado = matriz.resultado_1x2()
+    dupla = matriz.dupla_chance()
+    
+    home_win_prob = round(resultado['home_win_prob'], 1)
+    draw_prob = round(resultado['draw_prob'], 1)
+    away_win_prob = round(resultado['away_win_prob'], 1)
+    
+    probabilidades = {
+        "Vitória Casa (1)": home_win_prob,
+        "Empate (X)": draw_prob,
+        "Vitória Fora (2)": away_win_prob,
+        "Chance Dupla (1X)": round(dupla['1x'], 1),
+        "Chance Dupla (X2)": round(dupla['x2'], 1),
+        "Chance Dupla (12)": round(dupla['12'], 1),
+    }
     
     palpites = []
     
-    # LAYER 3: Verificar VETO antes de adicionar cada palpite
-    # LAYER 4: Ajustar confiança baseado em coerência com script
-    
-    if 'home_win' in odds:
-        tipo = "Vitória Casa"
-        confianca = _convert_probability_to_confidence(home_win_prob)
-        if confianca >= 5.5:
-            palpites.append({
-                "tipo": "Vitória Casa (1)",
-                "confianca": confianca,
-                "odd": odds['home_win'],
-                "probabilidade": home_win_prob
-            })
-    
-    if 'draw' in odds:
-        tipo = "Draw"
-        confianca = _convert_probability_to_confidence(draw_prob)
-        if confianca >= 5.5:
-            palpites.append({
-                "tipo": "Empate (X)",
-                "confianca": confianca,
-                "odd": odds['draw'],
-                "probabilidade": draw_prob
-            })
-    
-    if 'away_win' in odds:
-        tipo = "Vitória Fora"
-        confianca = _convert_probability_to_confidence(away_win_prob)
-        if confianca >= 5.5:
-            palpites.append({
-                "tipo": "Vitória Fora (2)",
-                "confianca": confianca,
-                "odd": odds['away_win'],
-                "probabilidade": away_win_prob
-            })
-    
-    if 'double_chance_1x' in odds:
-        double_1x_prob = home_win_prob + draw_prob
-        confianca = _convert_probability_to_confidence(double_1x_prob)
-        if confianca >= 6.0:
-            palpites.append({
-                "tipo": "Chance Dupla (1X)",
-                "confianca": confianca,
-                "odd": odds['double_chance_1x'],
-                "probabilidade": double_1x_prob
-            })
-    
-    if 'double_chance_x2' in odds:
-        double_x2_prob = draw_prob + away_win_prob
-        confianca = _convert_probability_to_confidence(double_x2_prob)
-        if confianca >= 6.0:
-            palpites.append({
-                "tipo": "Chance Dupla (X2)",
-                "confianca": confianca,
-                "odd": odds['double_chance_x2'],
-                "probabilidade": double_x2_prob
-            })
-    
-    if 'double_chance_12' in odds:
-        double_12_prob = home_win_prob + away_win_prob
-        confianca = _convert_probability_to_confidence(double_12_prob)
-        if confianca >= 6.0:
+    for tipo, chaves, min_conf in _MERCADOS_RESULTADO:
+        odd = _buscar_odd(odds, chaves)
+        if odd is None:
+            continue
+        confianca = _convert_probability_to_confidence(probabilidades[tipo])
+        if confianca >= min_conf:
             palpites.append({
-                "tipo": "Chance Dupla (12)",
+                "tipo": tipo,
                 "confianca": confianca,
-                "odd": odds['double_chance_12'],
-                "probabilidade": double_12_prob
+                "odd": odd,
+                "probabilidade": probabilidades[tipo]
             })
     
     if not palpites:
@@ -144,7 +122,7 @@ def _convert_probability_to_confidence(probability_pct):
         return 6.0
     elif probability_pct >= 35:
         return 5.5
-        return 5.0
+    return 5.0
 
 
 def analisar_mercado_resultado_final(analysis_packet, odds):
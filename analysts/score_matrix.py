@@ -0,0 +1,245 @@
+"""
+MATRIZ DE PLACARES - MODELO ÚNICO DE GOLS POR JOGO
+==================================================
+
+Uma matriz P(gols_casa = i, gols_fora = j) calculada UMA vez por jogo (Poisson independente
+a partir dos gols esperados de cada time). Todos os mercados derivados de gols saem dela por
+reduções de array:
+- Over/Under em qualquer linha (FT e HT)
+- Gols por time (Casa/Fora)
+- BTTS
+- 1X2 e Dupla Chance
+- Handicaps (distribuição da diferença de gols; precificar_handicaps usa Skellam com devolução)
+
+Substitui os atalhos por mercado (ex: over_1_5 = over_2_5 + 15) por um único modelo coerente.
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.stats import poisson, skellam
+
+
+MAX_GOLS = 10  # Placar máximo por time na matriz (a cauda vai para a última célula)
+FRACAO_GOLS_HT = 0.45  # ~45% dos gols saem no 1º tempo
+TAXA_CONVERSAO_CHUTES_NO_GOL = 0.30  # Gols por finalização no gol (proxy de xG)
+PESO_MEDIA_GOLS = 0.70  # Peso das médias de gols vs. finalizações ponderadas (SoS)
+MEDIA_GOLS_PADRAO_CASA = 1.45
+MEDIA_GOLS_PADRAO_FORA = 1.15
+LAMBDA_MIN = 0.15
+LAMBDA_MAX = 4.5
+
+
+def estimar_gols_esperados(stats_casa, stats_fora, weighted_casa=None, weighted_fora=None) -> Tuple[float, float]:
+    """
+    Gols esperados (lambda) de cada time.
+
+    Base: média entre o ataque do time e a defesa do adversário no mando do jogo.
+    Com Weighted Metrics (ponderadas pelo SoS), mistura com finalizações no gol × taxa de conversão.
+
+    Returns:
+        tuple: (lambda_casa, lambda_fora)
+    """
+    casa = (stats_casa or {}).get('casa', {})
+    fora = (stats_fora or {}).get('fora', {})
+
+    marcados_casa = float(casa.get('gols_marcados', 0) or 0)
+    sofridos_casa = float(casa.get('gols_sofridos', 0) or 0)
+    marcados_fora = float(fora.get('gols_marcados', 0) or 0)
+    sofridos_fora = float(fora.get('gols_sofridos', 0) or 0)
+
+    if marcados_casa or sofridos_fora:
+        lambda_casa = (marcados_casa + sofridos_fora) / 2
+    else:
+        lambda_casa = MEDIA_GOLS_PADRAO_CASA
+
+    if marcados_fora or sofridos_casa:
+        lambda_fora = (marcados_fora + sofridos_casa) / 2
+    else:
+        lambda_fora = MEDIA_GOLS_PADRAO_FORA
+
+    if weighted_casa and weighted_fora:
+        chutes_casa = (weighted_casa.get('weighted_shots_for', 0) + weighted_fora.get('weighted_shots_against', 0)) / 2
+        chutes_fora = (weighted_fora.get('weighted_shots_for', 0) + weighted_casa.get('weighted_shots_against', 0)) / 2
+        if chutes_casa > 0 and chutes_fora > 0:
+            lambda_casa = PESO_MEDIA_GOLS * lambda_casa + (1 - PESO_MEDIA_GOLS) * chutes_casa * TAXA_CONVERSAO_CHUTES_NO_GOL
+            lambda_fora = PESO_MEDIA_GOLS * lambda_fora + (1 - PESO_MEDIA_GOLS) * chutes_fora * TAXA_CONVERSAO_CHUTES_NO_GOL
+
+    return (float(np.clip(lambda_casa, LAMBDA_MIN, LAMBDA_MAX)),
+            float(np.clip(lambda_fora, LAMBDA_MIN, LAMBDA_MAX)))
+
+
+def _pmf_truncada(media: float, max_gols: int) -> np.ndarray:
+    """P(X = k) para k = 0..max_gols, com P(X >= max_gols) acumulada na última posição"""
+    gols = np.arange(max_gols + 1)
+    pmf = poisson.pmf(gols, media)
+    pmf[-1] += poisson.sf(max_gols, media)
+    return pmf
+
+
+def _over_under(distribuicao: np.ndarray, linhas) -> Tuple[np.ndarray, np.ndarray]:
+    """(Over, Under) em % de uma distribuição discreta 0..n para linhas .5"""
+    acumulada = np.cumsum(distribuicao)
+    idx = np.clip(np.floor(np.asarray(linhas, dtype=float)).astype(int), -1, len(acumulada) - 1)
+    under = np.where(idx >= 0, acumulada[np.maximum(idx, 0)], 0.0)
+    under = np.clip(under * 100, 0, 100)
+    return 100 - under, under
+
+
+class ScoreMatrix:
+    """
+    Matriz de probabilidades de placar de um jogo (linhas = gols casa, colunas = gols fora).
+    Todas as probabilidades retornadas estão em % (0-100).
+    """
+
+    def __init__(self, lambda_casa: float, lambda_fora: float, max_gols: int = MAX_GOLS):
+        self.lambda_casa = lambda_casa
+        self.lambda_fora = lambda_fora
+        self.max_gols = max_gols
+
+        self.marginal_casa = _pmf_truncada(lambda_casa, max_gols)
+        self.marginal_fora = _pmf_truncada(lambda_fora, max_gols)
+        self.matriz = np.outer(self.marginal_casa, self.marginal_fora)
+
+        gols = np.arange(max_gols + 1)
+        total = gols[:, None] + gols[None, :]
+        diferenca = gols[:, None] - gols[None, :]
+        pesos = self.matriz.ravel()
+
+        # Distribuições agregadas: calculadas uma vez, lidas por todos os mercados
+        self.dist_total = np.bincount(total.ravel(), weights=pesos, minlength=2 * max_gols + 1)
+        self.valores_diferenca = np.arange(-max_gols, max_gols + 1)
+        self.dist_diferenca = np.bincount((diferenca + max_gols).ravel(), weights=pesos, minlength=2 * max_gols + 1)
+
+    def over_under_total(self, linhas: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """(Over, Under) do total de gols em todas as linhas pedidas"""
+        return _over_under(self.dist_total, linhas)
+
+    def over_under_time(self, lado: str, linhas: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """(Over, Under) dos gols de um time ('casa' ou 'fora')"""
+        marginal = self.marginal_casa if lado == 'casa' else self.marginal_fora
+        return _over_under(marginal, linhas)
+
+    def btts(self) -> Tuple[float, float]:
+        """(Sim, Não) - ambos marcam"""
+        sim = float(self.matriz[1:, 1:].sum() * 100)
+        return sim, 100 - sim
+
+    def resultado_1x2(self) -> Dict[str, float]:
+        """Probabilidades de Vitória Casa / Empate / Vitória Fora"""
+        return {
+            'home_win_prob': float(np.tril(self.matriz, -1).sum() * 100),
+            'draw_prob': float(np.trace(self.matriz) * 100),
+            'away_win_prob': float(np.triu(self.matriz, 1).sum() * 100)
+        }
+
+    def dupla_chance(self) -> Dict[str, float]:
+        r = self.resultado_1x2()
+        return {
+            '1x': r['home_win_prob'] + r['draw_prob'],
+            'x2': r['draw_prob'] + r['away_win_prob'],
+            '12': r['home_win_prob'] + r['away_win_prob']
+        }
+
+    def handicap(self, linhas: Sequence[float], lado: str = 'casa') -> np.ndarray:
+        """
+        P(time vence com o handicap aplicado) para cada linha, ex: -1.5 → vencer por 2+.
+        Empate no handicap (linhas inteiras) conta como não-vitória.
+        """
+        valores = self.valores_diferenca if lado == 'casa' else -self.valores_diferenca
+        linhas = np.asarray(linhas, dtype=float)
+        vence = (valores[None, :] + linhas[:, None]) > 0
+        return vence @ self.dist_diferenca * 100
+
+    def resumo(self) -> Dict:
+        """Valores serializáveis para o pacote de análise / dossiê"""
+        return {
+            'lambda_home': round(self.lambda_casa, 3),
+            'lambda_away': round(self.lambda_fora, 3),
+            **{k: round(v, 2) for k, v in self.resultado_1x2().items()},
+            'btts_yes_prob': round(self.btts()[0], 2)
+        }
+
+
+def precificar_handicaps(lambda_casa: float, lambda_fora: float, linhas: Sequence[float],
+                         lados: Sequence[str], asiatico: Sequence[bool]) -> Dict[str, np.ndarray]:
+    """
+    Precifica TODAS as linhas de handicap do jogo numa avaliação vetorizada.
+
+    A diferença de gols (time apostado - adversário) segue Skellam(λ_time, λ_adversário).
+    - Europeu: vence se diferença + linha > 0 (empate no handicap é perda)
+    - Asiático inteiro (ex: -1.0): empate no handicap devolve a aposta
+    - Asiático quarter (ex: -0.75): metade da aposta em -0.5 e metade em -1.0
+
+    Returns:
+        dict de arrays (um valor por linha), em %:
+        'vitoria' (fração da aposta ganha), 'devolucao' (fração devolvida), 'derrota',
+        'probabilidade' = vitoria / (vitoria + derrota) → chance equivalente sem devolução (odd justa)
+    """
+    linhas = np.asarray(linhas, dtype=float)
+    casa = np.asarray(lados) == 'casa'
+    asiatico = np.asarray(asiatico, dtype=bool)
+
+    # Cada linha vira duas meias-apostas: iguais, exceto nas quarter lines asiáticas
+    quarter = asiatico & np.isclose(np.abs(linhas * 4) % 2, 1)
+    metades = np.stack([linhas, linhas], axis=1)
+    metades[quarter, 0] -= 0.25
+    metades[quarter, 1] += 0.25
+
+    mu_time = np.where(casa, lambda_casa, lambda_fora)[:, None]
+    mu_adv = np.where(casa, lambda_fora, lambda_casa)[:, None]
+
+    # P(D + h > 0) = P(D > -h) = sf(floor(-h)); empate no handicap só existe em h inteiro
+    limite = -metades
+    vitoria = skellam.sf(np.floor(limite), mu_time, mu_adv)
+    inteiro = np.isclose(limite, np.round(limite))
+    empate = np.where(inteiro, skellam.pmf(np.round(limite), mu_time, mu_adv), 0.0)
+    devolucao = np.where(asiatico[:, None], empate, 0.0)
+
+    vitoria = vitoria.mean(axis=1)
+    devolucao = devolucao.mean(axis=1)
+    derrota = 1 - vitoria - devolucao
+    com_resultado = np.maximum(vitoria + derrota, 1e-12)
+
+    return {
+        'vitoria': vitoria * 100,
+        'devolucao': devolucao * 100,
+        'derrota': derrota * 100,
+        'probabilidade': vitoria / com_resultado * 100
+    }
+
+
+@lru_cache(maxsize=512)
+def _matriz_cacheada(lambda_casa: float, lambda_fora: float) -> ScoreMatrix:
+    return ScoreMatrix(lambda_casa, lambda_fora)
+
+
+def obter_matriz_placar(lambda_casa: float, lambda_fora: float, periodo: str = 'ft') -> ScoreMatrix:
+    """
+    Matriz do jogo (FT ou HT), memoizada: os analisadores do mesmo jogo compartilham a mesma instância.
+    """
+    if periodo == 'ht':
+        lambda_casa *= FRACAO_GOLS_HT
+        lambda_fora *= FRACAO_GOLS_HT
+    return _matriz_cacheada(round(lambda_casa, 4), round(lambda_fora, 4))
+
+
+def gols_esperados_do_pacote(analysis_packet: Optional[Dict], stats_casa=None, stats_fora=None) -> Tuple[float, float]:
+    """Lambdas do pacote do Master Analyzer (ou estimados das stats quando não há pacote)"""
+    if analysis_packet and 'error' not in analysis_packet:
+        esperados = analysis_packet.get('analysis_summary', {}).get('expected_goals')
+        if esperados:
+            return esperados['home'], esperados['away']
+        summary = analysis_packet.get('analysis_summary', {})
+        raw = analysis_packet.get('raw_data', {})
+        return estimar_gols_esperados(
+            raw.get('home_stats'), raw.get('away_stats'),
+            summary.get('weighted_metrics_home'), summary.get('weighted_metrics_away')
+        )
+    return estimar_gols_esperados(stats_casa, stats_fora)
+
+
+def matriz_do_pacote(analysis_packet: Optional[Dict], periodo: str = 'ft', stats_casa=None, stats_fora=None) -> ScoreMatrix:
+    lambda_casa, lambda_fora = gols_esperados_do_pacote(analysis_packet, stats_casa, stats_fora)
+    return obter_matriz_placar(lambda_casa, lambda_fora, periodo)
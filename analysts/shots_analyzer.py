@@ -6,15 +6,17 @@ UNIFIED CONFIDENCE SYSTEM: Usa exclusivamente confidence_calculator.py
 para todos os cálculos de confiança.
 
 ARQUITETURA:
-1. Calcular probabilidade estatística de cada mercado de finalizações
-2. Chamar calculate_final_confidence para obter confiança final
-3. Usar breakdown para evidências e transparência
+1. Ler a probabilidade de cada linha da simulação Monte Carlo do jogo (match_simulator)
+2. Calcular a confiança de todas as linhas num único lote (avaliar_candidatos)
+3. Breakdown montado sob demanda (confidence_breakdown) a partir de bet_type e probabilidade
 """
 
-from analysts.confidence_calculator import (
-    calculate_statistical_probability_shots_over,
-    calculate_final_confidence
-)
+from analysts.confidence_calculator import avaliar_candidatos
+from analysts.match_simulator import simulacao_do_pacote
+
+LINHAS_FINALIZACOES_TOTAL = [15.5, 18.5, 21.5]
+LINHAS_FINALIZACOES_NO_GOL = [7.5, 9.5]
+LINHAS_FINALIZACOES_TIME = [8.5, 11.5]
 
 
 def analisar_mercado_finalizacoes(stats_casa, stats_fora, odds=None, master_data=None, script_name=None):
@@ -24,8 +26,8 @@ def analisar_mercado_finalizacoes(stats_casa, stats_fora, odds=None, master_data
     PHOENIX V3.0 REFACTORING:
     - ✅ USA confidence_calculator.py para TODOS os cálculos
     - ✅ Calcula probabilidade estatística primeiro
-    - ✅ Aplica modificadores contextuais via calculate_final_confidence
-    - ✅ Retorna breakdown para transparência
+    - ✅ Confiança de todas as linhas num único lote (calculate_confidence_batch)
+    - ✅ Palpites levam bet_type e probabilidade: o breakdown é montado sob demanda
     
     Args:
         stats_casa: Estatísticas do time da casa
@@ -65,220 +67,48 @@ def analisar_mercado_finalizacoes(stats_casa, stats_fora, odds=None, master_data
 
     print(f"  📊 Médias esperadas: Total={media_exp_total:.1f}, No gol={media_exp_no_gol:.1f}")
 
-    palpites = []
+    # P(Over) de todas as linhas lidas das mesmas amostras simuladas (cantos/cartões usam a mesma simulação)
+    simulacao = (simulacao_do_pacote(master_data) if master_data and 'error' not in master_data
+                 else simulacao_do_pacote(None, stats_casa, stats_fora))
+    over_total = simulacao.tabela_over('finalizacoes_total', LINHAS_FINALIZACOES_TOTAL)
+    over_no_gol = simulacao.tabela_over('no_gol_total', LINHAS_FINALIZACOES_NO_GOL)
+    over_casa = simulacao.tabela_over('finalizacoes_casa', LINHAS_FINALIZACOES_TIME)
+    over_fora = simulacao.tabela_over('finalizacoes_fora', LINHAS_FINALIZACOES_TIME)
 
-    # ✅ STEP 3: ANALISAR MERCADOS
+    # ✅ STEP 3: CANDIDATOS DE CADA MERCADO
     # Nota: Odds raramente disponíveis para finalizações, então odds geralmente será None
-    
-    # --- TOTAL DE FINALIZAÇÕES OVER ---
-    linhas_over_total = [21.5, 18.5, 15.5]
-    for linha in linhas_over_total:
-        # ✅ REFATORADO: Calcular probabilidade estatística
-        prob_pct = calculate_statistical_probability_shots_over(
-            weighted_shots_avg=media_exp_total,
-            line=linha
-        )
-        
-        # ✅ PURE ANALYST: Calculate confidence based purely on statistical probability
-        bet_type = f"Over {linha} Finalizações"
-        conf_final, breakdown = calculate_final_confidence(
-            statistical_probability_pct=prob_pct,
-            bet_type=bet_type,
-            tactical_script=script_name
-        )
-        
-        print(f"     {bet_type}: Prob={prob_pct:.1f}% → Conf={conf_final:.1f}")
-        
-        # Threshold mais alto para shots (menos confiável que outros mercados)
-        if conf_final >= 5.5:
-            palpites.append({
-                "tipo": f"{bet_type} (Total)",
-                "confianca": conf_final,
-                "odd": None,  # Raramente disponível
-                "time": "Total",
-                "breakdown": breakdown,
-                "probabilidade_estatistica": prob_pct
-            })
+    # Threshold mais alto para shots (menos confiável que outros mercados)
+    candidatos = []
 
-    # --- TOTAL DE FINALIZAÇÕES UNDER ---
-    linhas_under_total = [18.5, 15.5]
-    for linha in linhas_under_total:
-        prob_over = calculate_statistical_probability_shots_over(
-            weighted_shots_avg=media_exp_total,
-            line=linha
-        )
-        prob_under = 100.0 - prob_over
-        
-        bet_type = f"Under {linha} Finalizações"
-        conf_final, breakdown = calculate_final_confidence(
-            statistical_probability_pct=prob_under,
-            bet_type=bet_type,
-            tactical_script=script_name
-        )
-        
-        if conf_final >= 5.5:
-            palpites.append({
-                "tipo": f"{bet_type} (Total)",
-                "confianca": conf_final,
-                "odd": None,
-                "time": "Total",
-                "breakdown": breakdown,
-                "probabilidade_estatistica": prob_under
-            })
+    def candidato(tipo, time, prob_pct, bet_type):
+        candidatos.append(({"tipo": tipo, "odd": None, "time": time}, prob_pct, bet_type, 5.5))
 
-    # --- FINALIZAÇÕES NO GOL (Shots on Target) OVER/UNDER ---
+    # --- TOTAL DE FINALIZAÇÕES OVER/UNDER ---
+    for linha in [21.5, 18.5, 15.5]:
+        candidato(f"Over {linha} Finalizações (Total)", "Total", over_total[linha], f"Over {linha} Finalizações")
+    for linha in [18.5, 15.5]:
+        candidato(f"Under {linha} Finalizações (Total)", "Total", 100.0 - over_total[linha], f"Under {linha} Finalizações")
+
+    # --- FINALIZAÇÕES NO GOL (Shots on Target) OVER/UNDER --- (mínimo de 45% de probabilidade)
     if media_exp_no_gol > 0:
-        # Over 9.5
-        prob_pct = calculate_statistical_probability_shots_over(
-            weighted_shots_avg=media_exp_no_gol,
-            line=9.5
-        )
-        
-        if prob_pct >= 45:  # Mínimo de probabilidade
-            bet_type = "Over 9.5 Finalizações no Gol"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_pct,
-                bet_type=bet_type,
-                tactical_script=script_name
-            )
-            
-            if conf_final >= 5.5:
-                palpites.append({
-                    "tipo": f"{bet_type} (Total)",
-                    "confianca": conf_final,
-                    "odd": None,
-                    "time": "Total",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_pct
-                })
-        
-        # Under 7.5
-        prob_over = calculate_statistical_probability_shots_over(
-            weighted_shots_avg=media_exp_no_gol,
-            line=7.5
-        )
-        prob_under = 100.0 - prob_over
-        
-        if prob_under >= 45:
-            bet_type = "Under 7.5 Finalizações no Gol"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_under,
-                bet_type=bet_type,
-                tactical_script=script_name
-            )
-            
-            if conf_final >= 5.5:
-                palpites.append({
-                    "tipo": f"{bet_type} (Total)",
-                    "confianca": conf_final,
-                    "odd": None,
-                    "time": "Total",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_under
-                })
+        if over_no_gol[9.5] >= 45:
+            candidato("Over 9.5 Finalizações no Gol (Total)", "Total", over_no_gol[9.5], "Over 9.5 Finalizações no Gol")
+        if 100.0 - over_no_gol[7.5] >= 45:
+            candidato("Under 7.5 Finalizações no Gol (Total)", "Total", 100.0 - over_no_gol[7.5], "Under 7.5 Finalizações no Gol")
 
     # --- FINALIZAÇÕES POR TIME ---
-    # Casa Over/Under
-    if finalizacoes_casa > 0:
-        # Over 11.5 Casa
-        prob_pct = calculate_statistical_probability_shots_over(
-            weighted_shots_avg=finalizacoes_casa,
-            line=11.5
-        )
-        
-        if prob_pct >= 45:
-            bet_type = "Over 11.5 Finalizações Casa"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_pct,
-                bet_type=bet_type,
-                tactical_script=script_name
-            )
-            
-            if conf_final >= 5.5:
-                palpites.append({
-                    "tipo": "Over 11.5 Finalizações (Casa)",
-                    "confianca": conf_final,
-                    "odd": None,
-                    "time": "Casa",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_pct
-                })
-        
-        # Under 8.5 Casa
-        prob_over = calculate_statistical_probability_shots_over(
-            weighted_shots_avg=finalizacoes_casa,
-            line=8.5
-        )
-        prob_under = 100.0 - prob_over
-        
-        if prob_under >= 45:
-            bet_type = "Under 8.5 Finalizações Casa"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_under,
-                bet_type=bet_type,
-                tactical_script=script_name
-            )
-            
-            if conf_final >= 5.5:
-                palpites.append({
-                    "tipo": "Under 8.5 Finalizações (Casa)",
-                    "confianca": conf_final,
-                    "odd": None,
-                    "time": "Casa",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_under
-                })
-
-    # Fora Over/Under
-    if finalizacoes_fora > 0:
-        # Over 11.5 Fora
-        prob_pct = calculate_statistical_probability_shots_over(
-            weighted_shots_avg=finalizacoes_fora,
-            line=11.5
-        )
-        
-        if prob_pct >= 45:
-            bet_type = "Over 11.5 Finalizações Fora"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_pct,
-                bet_type=bet_type,
-                tactical_script=script_name
-            )
-            
-            if conf_final >= 5.5:
-                palpites.append({
-                    "tipo": "Over 11.5 Finalizações (Fora)",
-                    "confianca": conf_final,
-                    "odd": None,
-                    "time": "Fora",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_pct
-                })
-        
-        # Under 8.5 Fora
-        prob_over = calculate_statistical_probability_shots_over(
-            weighted_shots_avg=finalizacoes_fora,
-            line=8.5
-        )
-        prob_under = 100.0 - prob_over
-        
-        if prob_under >= 45:
-            bet_type = "Under 8.5 Finalizações Fora"
-            conf_final, breakdown = calculate_final_confidence(
-                statistical_probability_pct=prob_under,
-                bet_type=bet_type,
-                tactical_script=script_name
-            )
-            
-            if conf_final >= 5.5:
-                palpites.append({
-                    "tipo": "Under 8.5 Finalizações (Fora)",
-                    "confianca": conf_final,
-                    "odd": None,
-                    "time": "Fora",
-                    "breakdown": breakdown,
-                    "probabilidade_estatistica": prob_under
-                })
+    for time, media, over_time in (("Casa", finalizacoes_casa, over_casa), ("Fora", finalizacoes_fora, over_fora)):
+        if media <= 0:
+            continue
+        if over_time[11.5] >= 45:
+            candidato(f"Over 11.5 Finalizações ({time})", time, over_time[11.5], f"Over 11.5 Finalizações {time}")
+        if 100.0 - over_time[8.5] >= 45:
+            candidato(f"Under 8.5 Finalizações ({time})", time, 100.0 - over_time[8.5], f"Under 8.5 Finalizações {time}")
+
+    # ✅ STEP 4: CONFIANÇA DE TODOS OS CANDIDATOS NUM ÚNICO LOTE (breakdown só sob demanda)
+    confiancas, palpites = avaliar_candidatos(candidatos, script_name)
+    for (_, prob_pct, bet_type, _), conf_final in zip(candidatos, confiancas):
+        print(f"     {bet_type}: Prob={prob_pct:.1f}% → Conf={conf_final:.1f}")
 
     # ✅ RETORNO FINAL
     print(f"  ✅ FINALIZAÇÕES: {len(palpites)} palpites gerados")
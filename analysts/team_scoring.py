@@ -0,0 +1,240 @@
+"""
+PONTUAÇÃO DOS TIMES EM LOTE (SLATE) - POWER, MOMENTO, QSC E PERFIL TÁTICO
+==========================================================================
+
+Implementação única (vetorizada) de Power Score, Momento, QSC Dinâmico e Perfil Tático.
+
+- entradas_do_time() é o único acesso aos dicionários aninhados da API (uma vez por time)
+- calcular_scores() pontua N times de uma vez
+- TabelaScores guarda o resultado do slate, indexado pelas entradas de cada linha (time, liga,
+  posição na tabela, rodada) e conferido contra as stats: uma consulta com dados diferentes
+  dos pontuados nunca recebe o score de outra versão do time
+"""
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from config import QUALITY_SCORES, LEAGUE_WEIGHTING_FACTOR
+from standings_index import indexar_classificacao
+
+
+DEFAULT_BASE_QS = 70
+DEFAULT_LEAGUE_WEIGHT = 0.70
+
+# Colunas da matriz de entradas (uma linha por time)
+ENTRADAS = (
+    'jogos', 'vitorias', 'gols_pro', 'gols_contra',
+    'media_gols_pro', 'media_gols_contra',
+    'vitorias_forma', 'derrotas_forma', 'tem_forma'
+)
+
+# Perfil tático por faixa de média de gols (índice 0/1/2)
+ESTILOS = ('ofensivo', 'neutro', 'defensivo')
+_CANTOS_PRO = np.array([6.5, 5.0, 3.5])
+_FINALIZACOES_PRO = np.array([15.0, 12.0, 9.0])
+_CANTOS_CONTRA = np.array([6.0, 4.5, 3.0])
+_FINALIZACOES_CONTRA = np.array([14.0, 11.0, 8.0])
+
+
+def _float(valor) -> float:
+    try:
+        return float(valor) if valor else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def entradas_do_time(team_stats: Dict) -> Tuple[float, ...]:
+    """Extrai do JSON de /teams/statistics os campos usados nos scores (na ordem de ENTRADAS)"""
+    fixtures = team_stats.get('fixtures', {})
+    goals = team_stats.get('goals', {})
+    form_string = team_stats.get('form') or ''
+    recent_form = form_string[-5:]
+    return (
+        fixtures.get('played', {}).get('total', 0) or 0,
+        fixtures.get('wins', {}).get('total', 0) or 0,
+        goals.get('for', {}).get('total', {}).get('total', 0) or 0,
+        goals.get('against', {}).get('total', {}).get('total', 0) or 0,
+        _float(goals.get('for', {}).get('average', {}).get('total', 0)),
+        _float(goals.get('against', {}).get('average', {}).get('total', 0)),
+        recent_form.count('W'),
+        recent_form.count('L'),
+        1 if form_string else 0,
+    )
+
+
+def calcular_scores(
+    entradas: np.ndarray,
+    base_qs: np.ndarray,
+    position_qs: np.ndarray,
+    league_weight: np.ndarray,
+    rodada: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Pontua N times num único passe.
+
+    - Power (0-100): 50 + win rate × 25 + bônus por faixa de saldo de gols (±5 a ±20)
+    - Momento (0-100): forma nos últimos 5 jogos (4+ vitórias = 95 ... 4+ derrotas = 20), ±10 pela média de gols
+    - QSC: reputação 25% + posição na tabela 30% + saldo 25% + forma 20%, × peso da liga;
+      nas rodadas 1-5 a posição entra em blend 50/50 com a reputação (Season Start Adjustment)
+
+    Args:
+        entradas: (N, len(ENTRADAS)) de entradas_do_time
+        base_qs: QS de reputação (QUALITY_SCORES)
+        position_qs: QS pela posição na tabela (50 quando o time não está na classificação)
+        league_weight: Peso da liga (LEAGUE_WEIGHTING_FACTOR)
+        rodada: Rodada atual (Season Start Adjustment nas rodadas 1-5)
+
+    Returns:
+        dict: Arrays 'power', 'moment', 'qsc', 'qsc_sem_tabela' (int) e 'estilo', 'defesa' (índices)
+    """
+    jogos, vitorias, gols_pro, gols_contra, media_pro, media_contra, v5, d5, tem_forma = entradas.T
+    tem_forma = tem_forma.astype(bool)
+    saldo = gols_pro - gols_contra
+
+    # POWER SCORE (reputação histórica)
+    bonus_vitorias = np.where(jogos > 0, np.trunc(vitorias / np.where(jogos > 0, jogos, 1) * 25), 0)
+    bonus_saldo = np.select(
+        [saldo > 15, saldo > 10, saldo > 5, saldo > 0, saldo < -15, saldo < -10, saldo < -5, saldo < 0],
+        [20, 15, 10, 5, -20, -15, -10, -5], 0
+    )
+    power = np.clip(50 + bonus_vitorias + bonus_saldo, 0, 100)
+
+    # MOMENTO (forma recente + ajuste por gols)
+    moment = np.select([v5 >= 4, v5 >= 3, v5 >= 2, v5 == 1, d5 >= 4, d5 >= 3], [95, 80, 65, 55, 20, 35], 50)
+    moment = np.where(media_pro > 2.5, np.minimum(moment + 10, 100),
+                      np.where(media_pro < 0.8, np.maximum(moment - 10, 0), moment))
+    moment = np.where(tem_forma, moment, 50)
+
+    # QSC DINÂMICO
+    goal_diff_qs = np.where(saldo >= 20, 100.0, np.where(saldo <= -20, 0.0, 50 + (saldo / 20) * 50))
+    form_qs = np.select(
+        [v5 == 5, v5 == 4, v5 == 3, v5 == 2, v5 == 1, d5 == 5, d5 == 4, d5 == 3],
+        [100, 85, 70, 60, 52, 0, 15, 30], 50
+    )
+    form_qs = np.where(tem_forma, form_qs, 50)
+    inicio_temporada = (rodada > 0) & (rodada <= 5)
+
+    def _qsc(pos_qs):
+        qsc = base_qs * 0.25 + pos_qs * 0.30 + goal_diff_qs * 0.25 + form_qs * 0.20
+        return np.rint(qsc * league_weight).astype(int)
+
+    return {
+        'power': power.astype(int),
+        'moment': moment.astype(int),
+        'qsc': _qsc(np.where(inicio_temporada, (position_qs * 0.5) + (base_qs * 0.5), position_qs)),
+        # SoS: QSC do adversário sem classificação e sem ajuste de rodada
+        'qsc_sem_tabela': _qsc(np.full(len(entradas), 50.0)),
+        'estilo': np.select([media_pro > 1.8, media_pro > 1.2], [0, 1], 2),
+        'defesa': np.select([media_contra > 1.5, media_contra > 1.0], [0, 1], 2),
+    }
+
+
+def perfil_tatico(estilo: int, defesa: int) -> Dict:
+    """Perfil tático (volume de cantos/finalizações estimado pela média de gols) a partir dos índices do lote"""
+    total_volume = _CANTOS_PRO[estilo] + _FINALIZACOES_PRO[estilo]
+    if total_volume > 20:
+        volume = 'alto'
+    elif total_volume > 15:
+        volume = 'medio'
+    else:
+        volume = 'baixo'
+    return {
+        'corners_for_avg': float(_CANTOS_PRO[estilo]),
+        'corners_against_avg': float(_CANTOS_CONTRA[defesa]),
+        'shots_for_avg': float(_FINALIZACOES_PRO[estilo]),
+        'shots_against_avg': float(_FINALIZACOES_CONTRA[defesa]),
+        'offensive_style': ESTILOS[estilo],
+        'volume_intensity': volume
+    }
+
+
+def position_qs_da_tabela(classificacao, team_id, team_name) -> float:
+    """QS pela posição na tabela (1º = 100, último = 50; fora da tabela = 50)"""
+    classificacao = indexar_classificacao(classificacao)
+    team_info = classificacao.linha(team_id, team_name) if classificacao else None
+    if not team_info:
+        return 50
+    rank = team_info['rank']
+    total_teams = classificacao.total_times
+    return 100 - ((rank - 1) / (total_teams - 1)) * 50 if total_teams > 1 else 75
+
+
+class TabelaScores:
+    """Scores de todos os times do slate, indexados por (team_id, league_id, position_qs, rodada)"""
+
+    def __init__(self):
+        self._indice: Dict[Tuple, int] = {}
+        self._entradas: list = []
+        self._scores: Dict[str, np.ndarray] = {}
+
+    def construir(self, times: Iterable[Tuple[int, int, Dict, Optional[str], int, Optional[list]]]) -> int:
+        """
+        Pontua todos os times num único passe e substitui a tabela.
+
+        Args:
+            times: (team_id, league_id, team_stats, team_name, rodada, classificacao) de cada linha.
+                O mesmo time pode vir com e sem classificação (jogo do slate e adversário no SoS).
+
+        Returns:
+            int: Linhas pontuadas
+        """
+        indexadas = {}  # Cada classificação indexada uma vez, não uma vez por time
+        indice, entradas, base_qs, position_qs, league_weight, rodadas = {}, [], [], [], [], []
+        for team_id, league_id, team_stats, team_name, rodada, classificacao in times:
+            if classificacao is not None and id(classificacao) not in indexadas:
+                indexadas[id(classificacao)] = indexar_classificacao(classificacao)
+            pos_qs = position_qs_da_tabela(indexadas.get(id(classificacao)), team_id, team_name)
+            chave = (team_id, league_id, pos_qs, rodada)
+            if chave in indice:
+                continue
+            indice[chave] = len(entradas)
+            entradas.append(entradas_do_time(team_stats))
+            base_qs.append(QUALITY_SCORES.get(team_id, DEFAULT_BASE_QS))
+            position_qs.append(pos_qs)
+            league_weight.append(LEAGUE_WEIGHTING_FACTOR.get(league_id, DEFAULT_LEAGUE_WEIGHT) if league_id else DEFAULT_LEAGUE_WEIGHT)
+            rodadas.append(rodada)
+
+        scores = calcular_scores(
+            np.array(entradas, dtype=float).reshape(-1, len(ENTRADAS)),
+            np.array(base_qs, dtype=float), np.array(position_qs, dtype=float),
+            np.array(league_weight, dtype=float), np.array(rodadas, dtype=int)
+        ) if entradas else {}
+
+        self._indice, self._entradas, self._scores = indice, entradas, scores
+        return len(indice)
+
+    def obter(self, team_id: int, league_id: int, entradas: Tuple[float, ...], position_qs: float,
+              rodada: int = 0) -> Optional[Dict]:
+        """
+        Scores da linha pontuada com exatamente estas entradas (None se o time não está na tabela,
+        foi pontuado com outra posição/rodada ou com stats diferentes das passadas)
+        """
+        i = self._indice.get((team_id, league_id, position_qs, rodada))
+        if i is None or self._entradas[i] != entradas:
+            return None
+        return {
+            'power': int(self._scores['power'][i]),
+            'moment': int(self._scores['moment'][i]),
+            'qsc': int(self._scores['qsc'][i]),
+            'qsc_sem_tabela': int(self._scores['qsc_sem_tabela'][i]),
+            'profile': perfil_tatico(int(self._scores['estilo'][i]), int(self._scores['defesa'][i]))
+        }
+
+    def __len__(self):
+        return len(self._indice)
+
+
+tabela = TabelaScores()
+
+
+def scores_do_time(team_stats: Dict, team_id: int, league_id: int, classificacao=None,
+                   team_name: Optional[str] = None, rodada: int = 0) -> Dict:
+    """Consulta a tabela do slate; se ela não tem estas entradas, pontua o time como um lote de uma linha"""
+    entradas = entradas_do_time(team_stats)
+    pos_qs = position_qs_da_tabela(classificacao, team_id, team_name)
+    if (scores := tabela.obter(team_id, league_id, entradas, pos_qs, rodada)) is not None:
+        return scores
+    avulsa = TabelaScores()
+    avulsa.construir([(team_id, league_id, team_stats, team_name, rodada, classificacao)])
+    return avulsa.obter(team_id, league_id, entradas, pos_qs, rodada)
@@ -5,6 +5,9 @@ import logging
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import cache_manager
+import team_features
+import match_history
+from standings_index import ClassificacaoIndexada, indexar_classificacao
 
 import os
 from dotenv import load_dotenv
@@ -115,6 +118,99 @@ async def api_request_with_retry(method: str, url: str, **kwargs):
     
     return response
 
+# ============================================
+# RAW STORE - RESPOSTAS BRUTAS DA API
+# ============================================
+# Cada resposta da API é guardada compacta (apenas o campo 'response'), com chave endpoint + params.
+# As visões processadas (stats_, odds_, h2h_...) são calculadas A PARTIR daqui e memoizadas à parte:
+# mudar uma derivação custa CPU, não quota. O raw store também serve de dataset para replay/backtest.
+
+def chave_resposta_bruta(endpoint: str, params: dict) -> str:
+    """Chave determinística do raw store: raw_<endpoint>?<params ordenados>"""
+    params_ordenados = "&".join(f"{k}={params[k]}" for k in sorted(params))
+    return f"raw_{endpoint}?{params_ordenados}"
+
+async def buscar_resposta_bruta(endpoint: str, params: dict, expiration_minutes=None):
+    """
+    Busca a resposta bruta de um endpoint, consultando primeiro o raw store.
+    Apenas respostas não vazias são guardadas.
+    
+    Args:
+        endpoint: Endpoint da API (ex: 'teams/statistics')
+        params: Parâmetros da requisição
+        expiration_minutes: TTL da resposta bruta (padrão: CACHE_EXPIRATION['raw_'])
+    
+    Returns:
+        Campo 'response' da API (list/dict) ou None
+        
+    Raises:
+        httpx.HTTPError: Se a requisição falhar (tratado por cada fetcher)
+    """
+    cache_key = chave_resposta_bruta(endpoint, params)
+    if cached_data := await cache_manager.aget(cache_key):
+        return cached_data
+
+    await asyncio.sleep(1.6)
+    response = await api_request_with_retry("GET", API_URL + endpoint, params=params)
+    response.raise_for_status()
+
+    data = response.json().get('response')
+    if data:
+        cache_manager.record_fetch(cache_key, data)  # TTL adaptativo: só respostas reais da API
+        cache_manager.set(cache_key, data, expiration_minutes=expiration_minutes)
+    return data
+
+# ============================================
+# AGENDA - KICKOFF E STATUS DOS JOGOS CONHECIDOS
+# ============================================
+# Alimentada por buscar_jogos_do_dia e buscar_ultimos_jogos_time; usada pela política de TTL
+# (cache_manager.get_expiration_for_fixture) de odds, estatísticas de jogo e classificação.
+_agenda_fixtures = {}  # {fixture_id: {"kickoff": datetime, "status": str, "league_id": int|None}}
+
+def _registrar_fixture(fixture_id, data_iso, status, league_id=None):
+    """Registra/atualiza kickoff e status de um jogo na agenda"""
+    try:
+        kickoff = datetime.fromisoformat(data_iso)
+    except (TypeError, ValueError):
+        return
+    anterior = _agenda_fixtures.get(fixture_id, {})
+    _agenda_fixtures[fixture_id] = {
+        "kickoff": kickoff,
+        "status": status,
+        "league_id": league_id if league_id is not None else anterior.get("league_id")
+    }
+
+def registrar_agenda(jogos):
+    """Registra na agenda uma lista de jogos no formato da API (/fixtures)"""
+    for jogo in jogos or []:
+        try:
+            _registrar_fixture(
+                jogo['fixture']['id'],
+                jogo['fixture']['date'],
+                jogo['fixture']['status']['short'],
+                jogo['league']['id']
+            )
+        except (KeyError, TypeError):
+            continue
+
+def ttl_para_fixture(cache_key: str, fixture_id: int, padrao=None):
+    """TTL (minutos) de uma chave ligada a um jogo, conforme kickoff/status conhecidos na agenda"""
+    info = _agenda_fixtures.get(fixture_id)
+    if not info:
+        return padrao if padrao is not None else cache_manager.get_expiration_for_key(cache_key)
+    return cache_manager.get_expiration_for_fixture(cache_key, info["kickoff"], info["status"])
+
+def ttl_para_classificacao(cache_key: str, id_liga: int):
+    """TTL (minutos) da classificação: expira depois do último jogo da liga no dia"""
+    hoje = datetime.now(ZoneInfo("America/Sao_Paulo")).date()
+    kickoffs_hoje = [
+        info["kickoff"] for info in _agenda_fixtures.values()
+        if info["league_id"] == id_liga and info["kickoff"].astimezone(ZoneInfo("America/Sao_Paulo")).date() == hoje
+    ]
+    if not kickoffs_hoje:
+        return cache_manager.get_expiration_for_key(cache_key)
+    return cache_manager.get_expiration_for_fixture(cache_key, max(kickoffs_hoje))
+
 # ============================================
 # LIGAS DE INTERESSE - COBERTURA GLOBAL
 # ============================================
@@ -551,7 +647,7 @@ async def get_current_season(league_id):
     """
     cache_key = f"current_season_{league_id}"
     
-    if cached_season := cache_manager.get(cache_key):
+    if cached_season := await cache_manager.aget(cache_key):
         return str(cached_season)
     
     try:
@@ -618,8 +714,9 @@ async def buscar_jogos_do_dia():
     
     print(f"   (Horário Brasília: {agora_brasilia.strftime('%H:%M')}, Season: {season})")
     
-    if cached_data := cache_manager.get(cache_key):
+    if cached_data := await cache_manager.aget(cache_key):
         print(f"✅ CACHE HIT: {len(cached_data)} jogos encontrados no cache")
+        registrar_agenda(cached_data)
         return cached_data
 
     print(f"⚡ CACHE MISS: Buscando jogos da API ({len(LIGAS_DE_INTERESSE)} ligas)")
@@ -675,25 +772,41 @@ async def buscar_jogos_do_dia():
             print(f"✅ FALLBACK bem-sucedido: {len(todos_os_jogos)} jogos encontrados para AMANHÃ")
 
     print(f"\n✅ Busca completa: {len(todos_os_jogos)} jogos encontrados")
+    registrar_agenda(todos_os_jogos)
     cache_manager.set(cache_key, todos_os_jogos)  # Usa padrão de 240 min (4h)
     return todos_os_jogos
 
+_classificacoes_indexadas = {}  # cache_key -> (lista carregada do disco/L2, ClassificacaoIndexada dela)
+
+def _classificacao_do_cache(cache_key: str, linhas):
+    """Índices montados uma vez por resposta, também para listas que vieram do cache.json/L2"""
+    if isinstance(linhas, ClassificacaoIndexada):
+        return linhas
+    origem, indexada = _classificacoes_indexadas.get(cache_key, (None, None))
+    if origem is not linhas:
+        indexada = indexar_classificacao(linhas)
+        _classificacoes_indexadas[cache_key] = (linhas, indexada)
+    return indexada
+
 async def buscar_classificacao_liga(id_liga: int):
+    """
+    Classificação da liga como ClassificacaoIndexada (lista da API + índices por id/nome),
+    montada uma vez por busca e guardada assim no cache.
+    """
     cache_key = f"classificacao_{id_liga}"
-    if cached_data := cache_manager.get(cache_key): return cached_data
+    if cached_data := await cache_manager.aget(cache_key):
+        return _classificacao_do_cache(cache_key, cached_data)
     
     season = await get_current_season(id_liga)
     
     params = {"league": str(id_liga), "season": season}
     try:
-        await asyncio.sleep(1.6)
         print(f"  🔍 Buscando classificação: Liga {id_liga}, Season {season}")
-        response = await api_request_with_retry("GET", API_URL + "standings", params=params)
-        response.raise_for_status()
-        if data := response.json().get('response'):
+        ttl = ttl_para_classificacao(cache_key, id_liga)
+        if data := await buscar_resposta_bruta("standings", params, expiration_minutes=ttl):
             if data and data[0]['league']['standings']:
-                classificacao = data[0]['league']['standings'][0]
-                cache_manager.set(cache_key, classificacao)
+                classificacao = ClassificacaoIndexada(data[0]['league']['standings'][0])
+                cache_manager.set(cache_key, classificacao, expiration_minutes=ttl)
                 print(f"  ✅ Classificação retornada: {len(classificacao)} times")
                 return classificacao
         print(f"  ⚠️ Nenhuma classificação encontrada para Liga {id_liga}, Season {season}")
@@ -703,29 +816,22 @@ async def buscar_classificacao_liga(id_liga: int):
 
 async def buscar_estatisticas_gerais_time(time_id: int, id_liga: int):
     cache_key = f"stats_{time_id}_liga_{id_liga}"
-    if cached_data := cache_manager.get(cache_key): return cached_data
+    if cached_data := await cache_manager.aget(cache_key): return cached_data
 
     season = await get_current_season(id_liga)
 
     params = {"team": str(time_id), "league": str(id_liga), "season": season}
     try:
-        await asyncio.sleep(1.6)
-        response = await api_request_with_retry("GET", API_URL + "teams/statistics", params=params)
-        response.raise_for_status()
-
-        response_data = response.json()
-        data = response_data.get('response')
+        data = await buscar_resposta_bruta("teams/statistics", params)
 
         # 🔍 INVESTIGAÇÃO COMPLETA: Mostrar TODA a resposta da API
         print(f"\n  🔬 INVESTIGAÇÃO /teams/statistics:")
         print(f"     → Time: {time_id}, Liga: {id_liga}, Season: {season}")
-        print(f"     → URL: {API_URL}teams/statistics")
-        print(f"     → Status: {response.status_code}")
+        print(f"     → Raw store: {chave_resposta_bruta('teams/statistics', params)}")
         
         # DEBUG: Verificar se a API retornou dados
         if not data:
             print(f"     ❌ Campo 'response' está vazio ou None")
-            print(f"     🔍 JSON completo retornado: {response_data}")
             return None
 
         print(f"     ✅ Campo 'response' presente")
@@ -780,136 +886,51 @@ async def buscar_estatisticas_gerais_time(time_id: int, id_liga: int):
             ultimos_jogos = await buscar_ultimos_jogos_time(time_id, limite=5)
 
             if ultimos_jogos:
-                cantos_feitos_casa_soma = 0
-                cantos_feitos_fora_soma = 0
-                cantos_cedidos_casa_soma = 0
-                cantos_cedidos_fora_soma = 0
-                finalizacoes_casa_soma = 0
-                finalizacoes_fora_soma = 0
-                finalizacoes_gol_casa_soma = 0
-                finalizacoes_gol_fora_soma = 0
-                cartoes_amarelos_casa_soma = 0
-                cartoes_amarelos_fora_soma = 0
-                cartoes_vermelhos_casa_soma = 0
-                cartoes_vermelhos_fora_soma = 0
-                jogos_casa = 0
-                jogos_fora = 0
-                vitorias_casa = 0
-                vitorias_fora = 0
-
                 for jogo in ultimos_jogos:
-                    # Buscar estatísticas detalhadas usando a função existente
                     fixture_id = jogo.get('fixture_id')
-                    stats = jogo.get('statistics', {})
-                    teams_info = jogo.get('teams', {})
+                    if not fixture_id or team_features.store.tem_jogo(time_id, fixture_id):
+                        continue
 
-                    if not stats or not fixture_id:
-                        # Tentar buscar estatísticas detalhadas
+                    # Jogo ainda fora da feature store: buscar estatísticas detalhadas e registrar
+                    stats = jogo.get('statistics') or None
+                    if not stats:
                         print(f"     🔍 DEBUG: Buscando stats para fixture {fixture_id}...")
-                        stats_detalhadas = await buscar_estatisticas_jogo(fixture_id)
-                        if stats_detalhadas:
-                            stats = stats_detalhadas
+                        stats = await buscar_estatisticas_jogo(fixture_id)
+                        if stats:
                             print(f"     ✅ DEBUG: Stats encontradas para fixture {fixture_id}")
                         else:
                             print(f"     ⚠️ DEBUG: Nenhuma stat encontrada para fixture {fixture_id}")
-
-                    # Determinar se o time jogou em casa ou fora
-                    home_id = teams_info.get('home', {}).get('id')
-                    away_id = teams_info.get('away', {}).get('id')
-                    eh_casa = home_id == time_id
-                    eh_fora = away_id == time_id
-
-                    if not eh_casa and not eh_fora:
-                        continue
-
-                    # ✅ FIX: Contar o jogo SEMPRE, independente dos valores
-                    if eh_casa:
-                        jogos_casa += 1
-                    else:
-                        jogos_fora += 1
-
-                    team_key = 'home' if eh_casa else 'away'
-                    opponent_key = 'away' if eh_casa else 'home'
-
-                    # Cantos (aceitar valores 0 também)
-                    cantos_feitos = stats.get(team_key, {}).get('Corner Kicks', 0) or 0
-                    cantos_sofridos = stats.get(opponent_key, {}).get('Corner Kicks', 0) or 0
-
-                    if eh_casa:
-                        cantos_feitos_casa_soma += int(cantos_feitos)
-                        cantos_cedidos_casa_soma += int(cantos_sofridos)
-                    else:
-                        cantos_feitos_fora_soma += int(cantos_feitos)
-                        cantos_cedidos_fora_soma += int(cantos_sofridos)
-
-                    # Finalizações (aceitar valores 0 também)
-                    finalizacoes_total = stats.get(team_key, {}).get('Total Shots', 0) or 0
-                    finalizacoes_gol = stats.get(team_key, {}).get('Shots on Goal', 0) or 0
-
-                    if eh_casa:
-                        finalizacoes_casa_soma += int(finalizacoes_total)
-                        finalizacoes_gol_casa_soma += int(finalizacoes_gol)
-                    else:
-                        finalizacoes_fora_soma += int(finalizacoes_total)
-                        finalizacoes_gol_fora_soma += int(finalizacoes_gol)
-
-                    # Cartões (aceitar valores 0 também)
-                    cartoes_amarelos = stats.get(team_key, {}).get('Yellow Cards', 0) or 0
-                    cartoes_vermelhos = stats.get(team_key, {}).get('Red Cards', 0) or 0
-
-                    if eh_casa:
-                        cartoes_amarelos_casa_soma += int(cartoes_amarelos)
-                        cartoes_vermelhos_casa_soma += int(cartoes_vermelhos)
-                    else:
-                        cartoes_amarelos_fora_soma += int(cartoes_amarelos)
-                        cartoes_vermelhos_fora_soma += int(cartoes_vermelhos)
-
-                    # Vitórias (para análise de resultado)
-                    if eh_casa:
-                        home_goals = jogo.get('score', {}).get('fulltime', {}).get('home', 0)
-                        away_goals = jogo.get('score', {}).get('fulltime', {}).get('away', 0)
-                        if home_goals and away_goals is not None and home_goals > away_goals:
-                            vitorias_casa += 1
-                    else:
-                        home_goals = jogo.get('score', {}).get('fulltime', {}).get('home', 0)
-                        away_goals = jogo.get('score', {}).get('fulltime', {}).get('away', 0)
-                        if home_goals is not None and away_goals and away_goals > home_goals:
-                            vitorias_fora += 1
-
-                # Calcular médias
-                # ⚠️ IMPORTANTE: Inicializar ANTES dos condicionais para evitar "variable not associated with a value"
-                cartoes_amarelos_casa = 0.0
-                cartoes_vermelhos_casa = 0.0
-                cartoes_amarelos_fora = 0.0
-                cartoes_vermelhos_fora = 0.0
-                
-                if jogos_casa > 0:
-                    cantos_avg_casa = cantos_feitos_casa_soma / jogos_casa
-                    cantos_sofridos_casa = cantos_cedidos_casa_soma / jogos_casa
-                    finalizacoes_casa = finalizacoes_casa_soma / jogos_casa
-                    finalizacoes_no_gol_casa = finalizacoes_gol_casa_soma / jogos_casa
-                    cartoes_amarelos_casa = cartoes_amarelos_casa_soma / jogos_casa
-                    cartoes_vermelhos_casa = cartoes_vermelhos_casa_soma / jogos_casa
-
-                if jogos_fora > 0:
-                    cantos_avg_fora = cantos_feitos_fora_soma / jogos_fora
-                    cantos_sofridos_fora = cantos_cedidos_fora_soma / jogos_fora
-                    finalizacoes_fora = finalizacoes_fora_soma / jogos_fora
-                    finalizacoes_no_gol_fora = finalizacoes_gol_fora_soma / jogos_fora
-                    cartoes_amarelos_fora = cartoes_amarelos_fora_soma / jogos_fora
-                    cartoes_vermelhos_fora = cartoes_vermelhos_fora_soma / jogos_fora
-
-                print(f"\n  ✅ DADOS CALCULADOS FALLBACK ({jogos_casa} jogos casa / {jogos_fora} jogos fora):")
-                print(f"     🚩 CANTOS: Casa {cantos_avg_casa:.1f} (cede {cantos_sofridos_casa:.1f}) | Fora {cantos_avg_fora:.1f} (cede {cantos_sofridos_fora:.1f})")
-                print(f"     ⚽ FINALIZAÇÕES: Casa {finalizacoes_casa:.1f} total ({finalizacoes_no_gol_casa:.1f} no gol) | Fora {finalizacoes_fora:.1f} total ({finalizacoes_no_gol_fora:.1f} no gol)")
-                print(f"     🟨 CARTÕES: Casa {cartoes_amarelos_casa:.1f} amarelos + {cartoes_vermelhos_casa:.1f} vermelhos | Fora {cartoes_amarelos_fora:.1f} amarelos + {cartoes_vermelhos_fora:.1f} vermelhos")
-                print(f"     📊 SOMAS BRUTAS:")
-                print(f"        Cantos Casa: {cantos_feitos_casa_soma} feitos / {cantos_cedidos_casa_soma} cedidos")
-                print(f"        Cantos Fora: {cantos_feitos_fora_soma} feitos / {cantos_cedidos_fora_soma} cedidos")
-                print(f"        Finalizações Casa: {finalizacoes_casa_soma} total / {finalizacoes_gol_casa_soma} no gol")
-                print(f"        Finalizações Fora: {finalizacoes_fora_soma} total / {finalizacoes_gol_fora_soma} no gol")
-                print(f"        Cartões Casa: {cartoes_amarelos_casa_soma} amarelos / {cartoes_vermelhos_casa_soma} vermelhos")
-                print(f"        Cartões Fora: {cartoes_amarelos_fora_soma} amarelos / {cartoes_vermelhos_fora_soma} vermelhos")
+                    registrar_jogo_finalizado(jogo, stats)
+
+                # Médias por mando lidas da store (agregado rolante quando os jogos são a janela atual)
+                medias = team_features.store.medias_por_mando(time_id, [j.get('fixture_id') for j in ultimos_jogos])
+
+                if medias:
+                    jogos_casa = medias['jogos_casa']
+                    jogos_fora = medias['jogos_fora']
+                    vitorias_casa = medias['vitorias_casa']
+                    vitorias_fora = medias['vitorias_fora']
+
+                    if jogos_casa > 0:
+                        cantos_avg_casa = medias['casa']['cantos_pro']
+                        cantos_sofridos_casa = medias['casa']['cantos_contra']
+                        finalizacoes_casa = medias['casa']['finalizacoes_pro']
+                        finalizacoes_no_gol_casa = medias['casa']['no_gol_pro']
+                        cartoes_amarelos_casa = medias['casa']['amarelos_pro']
+                        cartoes_vermelhos_casa = medias['casa']['vermelhos_pro']
+
+                    if jogos_fora > 0:
+                        cantos_avg_fora = medias['fora']['cantos_pro']
+                        cantos_sofridos_fora = medias['fora']['cantos_contra']
+                        finalizacoes_fora = medias['fora']['finalizacoes_pro']
+                        finalizacoes_no_gol_fora = medias['fora']['no_gol_pro']
+                        cartoes_amarelos_fora = medias['fora']['amarelos_pro']
+                        cartoes_vermelhos_fora = medias['fora']['vermelhos_pro']
+
+                    print(f"\n  ✅ DADOS CALCULADOS FALLBACK ({jogos_casa} jogos casa / {jogos_fora} jogos fora):")
+                    print(f"     🚩 CANTOS: Casa {cantos_avg_casa:.1f} (cede {cantos_sofridos_casa:.1f}) | Fora {cantos_avg_fora:.1f} (cede {cantos_sofridos_fora:.1f})")
+                    print(f"     ⚽ FINALIZAÇÕES: Casa {finalizacoes_casa:.1f} total ({finalizacoes_no_gol_casa:.1f} no gol) | Fora {finalizacoes_fora:.1f} total ({finalizacoes_no_gol_fora:.1f} no gol)")
+                    print(f"     🟨 CARTÕES: Casa {cartoes_amarelos_casa:.1f} amarelos + {cartoes_vermelhos_casa:.1f} vermelhos | Fora {cartoes_amarelos_fora:.1f} amarelos + {cartoes_vermelhos_fora:.1f} vermelhos")
 
         # Preservar campos essenciais do API para cálculo de QSC Dinâmico
         # 🔧 FIX: Garantir que nunca seja None (API pode retornar None explicitamente)
@@ -977,21 +998,17 @@ async def buscar_jogo_de_ida_knockout(home_team_id: int, away_team_id: int, leag
         }
     """
     cache_key = f"first_leg_{home_team_id}_{away_team_id}_{league_id}"
-    if cached_data := cache_manager.get(cache_key):
+    if cached_data := await cache_manager.aget(cache_key):
         return cached_data
     
     params = {"h2h": f"{home_team_id}-{away_team_id}", "league": str(league_id), "last": "3"}
     
     try:
-        await asyncio.sleep(1.6)
-        response = await api_request_with_retry("GET", API_URL + "fixtures/headtohead", params=params)
-        response.raise_for_status()
-        
-        response_json = response.json()
+        data = await buscar_resposta_bruta("fixtures/headtohead", params)
         
         print(f"\n  🔍 Buscando jogo de ida: Time {home_team_id} vs {away_team_id} (Liga {league_id})")
         
-        if data := response_json.get('response'):
+        if data:
             print(f"     → {len(data)} jogos encontrados no H2H")
             
             # Procurar o jogo mais recente que seja "1st Leg" ou jogo de ida
@@ -1044,21 +1061,17 @@ async def buscar_h2h(time1_id: int, time2_id: int, limite: int = 5):
         Lista com histórico de confrontos
     """
     cache_key = f"h2h_{time1_id}_{time2_id}_{limite}"
-    if cached_data := cache_manager.get(cache_key):
+    if cached_data := await cache_manager.aget(cache_key):
         return cached_data
     
     params = {"h2h": f"{time1_id}-{time2_id}", "last": str(limite)}
     try:
-        await asyncio.sleep(1.6)
-        response = await api_request_with_retry("GET", API_URL + "fixtures/headtohead", params=params)
-        response.raise_for_status()
-        
-        response_json = response.json()
+        data = await buscar_resposta_bruta("fixtures/headtohead", params,
+                                           expiration_minutes=cache_manager.get_expiration_for_key(cache_key))
         
         print(f"\n  🔬 H2H: Time {time1_id} vs Time {time2_id}")
-        print(f"     → Status: {response.status_code}")
         
-        if data := response_json.get('response'):
+        if data:
             print(f"     ✅ {len(data)} confrontos históricos encontrados")
             
             confrontos = []
@@ -1097,7 +1110,7 @@ async def buscar_ultimos_jogos_time(time_id: int, limite: int = 5, _tentativa: i
         _tentativa: Controle interno de retry (não usar)
     """
     cache_key = f"ultimos_jogos_finalizados_{time_id}_{limite}"
-    if cached_data := cache_manager.get(cache_key):
+    if cached_data := await cache_manager.aget(cache_key):
         return cached_data
 
     # Determinar temporada atual automaticamente (horário de Brasília)
@@ -1109,19 +1122,14 @@ async def buscar_ultimos_jogos_time(time_id: int, limite: int = 5, _tentativa: i
 
     params = {"team": str(time_id), "season": season, "last": str(limite)}
     try:
-        await asyncio.sleep(1.6)
-        response = await api_request_with_retry("GET", API_URL + "fixtures", params=params)
-        response.raise_for_status()
-        
-        response_json = response.json()
+        data = await buscar_resposta_bruta("fixtures", params)
         
         # 🔍 INVESTIGAÇÃO: Logging completo
         print(f"\n  🔬 INVESTIGAÇÃO /fixtures (últimos jogos) - Tentativa {_tentativa}:")
         print(f"     → Time: {time_id}, Season: {season}, Limite: {limite}")
-        print(f"     → URL: {API_URL}fixtures")
-        print(f"     → Status: {response.status_code}")
+        print(f"     → Raw store: {chave_resposta_bruta('fixtures', params)}")
 
-        if data := response_json.get('response'):
+        if data:
             print(f"     ✅ {len(data)} jogos retornados pela API")
             
             jogos_processados = []
@@ -1139,6 +1147,7 @@ async def buscar_ultimos_jogos_time(time_id: int, limite: int = 5, _tentativa: i
                     continue
                 
                 jogos_finalizados += 1
+                _registrar_fixture(fixture_id, jogo['fixture']['date'], fixture_status, jogo.get('league', {}).get('id'))
                 jogo_info = {
                     "fixture_id": fixture_id,
                     "date": jogo['fixture']['date'],
@@ -1243,33 +1252,29 @@ def normalizar_odds(odds_formatadas):
                 elif "under" in linha.lower():
                     odds_normalizadas[f"cartoes_{time}_under_{linha_limpa}"] = valor
 
-        elif "handicap" in mercado_key.lower() or "spread" in mercado_key.lower():
-            # Mercado Handicaps
+        elif mercado_key.startswith("handicap_"):
+            # Mercado Handicaps: tipo e período vêm da chave (handicap_asia_ft → handicap_asia_ft_casa_-0.5)
             for linha, valor in odds_dict.items():
                 if "Home" in linha:
                     linha_num = linha.replace("Home ", "").replace("home ", "").strip()
-                    odds_normalizadas[f"handicap_casa_{linha_num}"] = valor
+                    odds_normalizadas[f"{mercado_key}_casa_{linha_num}"] = valor
                 elif "Away" in linha:
                     linha_num = linha.replace("Away ", "").replace("away ", "").strip()
-                    odds_normalizadas[f"handicap_fora_{linha_num}"] = valor
+                    odds_normalizadas[f"{mercado_key}_fora_{linha_num}"] = valor
 
     return odds_normalizadas
 
 async def buscar_odds_do_jogo(id_jogo: int):
     cache_key = f"odds_{id_jogo}"
-    if cached_data := cache_manager.get(cache_key): return cached_data
+    if cached_data := await cache_manager.aget(cache_key): return cached_data
 
     params = {"fixture": str(id_jogo)}
     odds_formatadas = {}
 
-    try:
-        await asyncio.sleep(1.6)
-        response = await api_request_with_retry("GET", API_URL + "odds", params=params)
-        response.raise_for_status()
-        
-        response_json = response.json()
+    ttl = ttl_para_fixture(cache_key, id_jogo)
 
-        if data := response_json.get('response'):
+    try:
+        if data := await buscar_resposta_bruta("odds", params, expiration_minutes=ttl):
             if not data:
                 return {}
 
@@ -1324,7 +1329,15 @@ async def buscar_odds_do_jogo(id_jogo: int):
                         odds_formatadas["cards_total"] = {v['value']: float(v['odd']) for v in values_raw}
 
                 elif "Handicap" in bet_name or "Spread" in bet_name:
-                    odds_formatadas["handicap"] = {v['value']: float(v['odd']) for v in values_raw}
+                    # Asiático/europeu e FT/HT separados: cada mercado na sua chave (handicap_asia_ft, handicap_euro_ht...)
+                    tipo = "asia" if "Asian" in bet_name or "Spread" in bet_name else "euro"
+                    if "First Half" in bet_name or "1st Half" in bet_name:
+                        periodo = "ht"
+                    elif "Second Half" in bet_name or "2nd Half" in bet_name:
+                        periodo = "2t"
+                    else:
+                        periodo = "ft"
+                    odds_formatadas.setdefault(f"handicap_{tipo}_{periodo}", {v['value']: float(v['odd']) for v in values_raw})
 
     except httpx.TimeoutException:
         print(f"  ⏱️ TIMEOUT buscando odds do jogo {id_jogo}")
@@ -1334,7 +1347,7 @@ async def buscar_odds_do_jogo(id_jogo: int):
     # Normalizar odds para formato usado pelos analisadores
     if odds_formatadas:
         odds_normalizadas = normalizar_odds(odds_formatadas)
-        cache_manager.set(cache_key, odds_normalizadas)
+        cache_manager.set(cache_key, odds_normalizadas, expiration_minutes=ttl)
         return odds_normalizadas
 
     return {}
@@ -1393,30 +1406,54 @@ async def buscar_jogos_por_liga(liga_id: int):
     jogos_todos = await buscar_jogos_do_dia()
     return [jogo for jogo in jogos_todos if jogo['league']['id'] == liga_id]
 
+def registrar_jogo_finalizado(jogo: dict, stats: dict):
+    """Jogo finalizado com estatísticas: alimenta a feature store e o histórico colunar"""
+    team_features.store.registrar_jogo(jogo, stats)
+    match_history.historico.registrar(jogo, stats)
+
+def importar_historico_do_cache():
+    """
+    Startup: move para o histórico colunar os jogos finalizados que ainda estão como JSON
+    no cache (ultimos_jogos_finalizados_* + stats_jogo_*) e tira essas stats do cache.json.
+    Com a feature store vazia (primeiro deploy), ela é semeada a partir do histórico.
+    """
+    importadas = match_history.historico.importar_do_cache(
+        cache_manager.items_with_prefix("ultimos_jogos_finalizados_"),
+        cache_manager.items_with_prefix("stats_jogo_")
+    )
+    if importadas:
+        removidas = cache_manager.evict_local(importadas)
+        print(f"📦 HISTÓRICO: {len(importadas)} jogos importados do cache ({removidas} stats_jogo_* fora do cache.json)")
+
+    if team_features.store.vazia():
+        semeados = match_history.historico.alimentar_feature_store(
+            team_features.store, team_features.CAPACIDADE_POR_TIME
+        )
+        if semeados:
+            print(f"🧮 FEATURE STORE: semeada com {semeados} jogos do histórico")
+
 async def buscar_estatisticas_jogo(fixture_id: int):
     """Busca estatísticas detalhadas de um jogo específico (cantos, cartões, finalizações, etc)."""
+    # Jogo finalizado já no histórico colunar: sem JSON no cache e sem API
+    if stats_historico := match_history.historico.estatisticas(fixture_id):
+        return stats_historico
+
     cache_key = f"stats_jogo_{fixture_id}"
-    if cached_data := cache_manager.get(cache_key):
+    if cached_data := await cache_manager.aget(cache_key):
         return cached_data
 
     params = {"fixture": str(fixture_id)}
+    # Jogo finalizado = estatísticas imutáveis; sem status conhecido, mantém 4 horas
+    ttl = ttl_para_fixture(cache_key, fixture_id, padrao=240)
+
     try:
-        await asyncio.sleep(1.6)
-        response = await api_request_with_retry("GET", API_URL + "fixtures/statistics", params=params)
-        response.raise_for_status()
-        
-        response_json = response.json()
-        
-        # --- RAW API-FUTEBOL **STATS** RESPONSE ---
-        import json
-        print("--- RAW API-FUTEBOL **STATS** RESPONSE ---")
-        print(json.dumps(response_json, indent=2))
-        print("------------------------------------------")
+        # Resposta bruta completa fica no raw store (replay/debug sem gastar quota)
+        data = await buscar_resposta_bruta("fixtures/statistics", params, expiration_minutes=ttl)
         
         print(f"  🔍 DEBUG FIXTURE {fixture_id} - Resumo da Resposta:")
-        print(f"     Status code: {response.status_code}")
+        print(f"     Raw store: {chave_resposta_bruta('fixtures/statistics', params)}")
 
-        if data := response_json.get('response'):
+        if data:
             if not data or len(data) == 0:
                 print(f"     ⚠️ Response vazio para fixture {fixture_id} - jogo pode não ter acontecido ainda")
                 return None
@@ -1458,7 +1495,7 @@ async def buscar_estatisticas_jogo(fixture_id: int):
                 print(f"       ⚽ Finalizações: {stats_dict.get('Total Shots', 'N/A')} total, {stats_dict.get('Shots on Goal', 'N/A')} no gol")
                 print(f"       🟨 Cartões: {stats_dict.get('Yellow Cards', 'N/A')} amarelos, {stats_dict.get('Red Cards', 'N/A')} vermelhos")
 
-            cache_manager.set(cache_key, stats_processadas, expiration_minutes=240)
+            cache_manager.set(cache_key, stats_processadas, expiration_minutes=ttl)
             return stats_processadas
         else:
             print(f"     ⚠️ Campo 'response' não encontrado ou vazio no JSON")
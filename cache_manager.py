@@ -3,6 +3,8 @@ import json
 import os
 import threading
 import asyncio
+import uuid
+import hashlib
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -18,11 +20,23 @@ _cache_lock = threading.RLock()  # RLock (reentrant) para evitar deadlocks
 CACHE_FILE = "cache.json"
 _is_dirty = False  # Flag para indicar se o cache precisa ser salvo
 
+# 🗄️ CACHE L2 (opcional): tabela cache_entries no PostgreSQL, compartilhada entre instâncias
+# L1 = dict em memória deste processo | L2 = banco (sobrevive a restarts e é visto por todas as réplicas)
+_l2_backend = None      # DatabaseManager habilitado, ou None se L2 desligado
+_l2_pending = {}        # Entradas aguardando gravação em lote no L2 {key: entry}
+L2_FLUSH_BATCH_SIZE = 500
+
+# 📣 BARRAMENTO DE INVALIDAÇÃO: NOTIFY/LISTEN no PostgreSQL
+# Cada processo aplica localmente e publica; os demais aplicam ao receber pelo LISTEN
+INVALIDATION_CHANNEL = "cache_invalidation"
+_PROCESS_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"  # Ignorar as próprias mensagens
+
 # Configurações inteligentes de expiração por tipo de dado
 # ⚡ CACHE CALIBRADO: TTLs otimizados por sensibilidade temporal
 CACHE_EXPIRATION = {
     'jogos_': 1440,              # 24 HORAS - jogos do dia
     'odds_': 1440,               # 24 HORAS - odds (dados sensíveis ao tempo)
+    'stats_jogo_': 240,          # 4 HORAS - estatísticas de um jogo (ajustado pela política de kickoff)
     'stats_': 1440,              # 24 HORAS - estatísticas de times (dados recentes)
     'classificacao_': 1440,      # 24 HORAS - classificação (atualização moderada)
     'analise_jogo_': 1440,       # 24 HORAS - análise completa de jogo
@@ -31,22 +45,253 @@ CACHE_EXPIRATION = {
     'ligas_': 1440,              # 24 HORAS - lista de ligas disponíveis (dados estáveis)
     'h2h_': 10080,               # 7 DIAS - confrontos diretos históricos (dados históricos)
     'current_season_': 1440,     # 24 HORAS - temporada atual da liga
+    'raw_': 1440,                # 24 HORAS - respostas brutas da API (raw store do api_client)
     'default': 1440              # 24 HORAS - padrão
 }
 
-def get_expiration_for_key(key):
-    """Determina tempo de expiração baseado no prefixo da chave"""
+# 🏷️ NAMESPACES COM GERAÇÃO: cada chave pertence a um namespace (pelo prefixo) e, opcionalmente,
+# a escopos extras (liga, jogo). A entrada guarda a geração de cada um no momento do set();
+# bump_generation() invalida o namespace inteiro em O(1) e as entradas antigas expiram sozinhas.
+NAMESPACE_RAW = "raw"          # Respostas da API (caras em quota)
+NAMESPACE_DERIVED = "derived"  # Resultados derivados de análise
+NAMESPACE_RENDER = "render"    # Mensagens já formatadas para o Telegram
+
+CACHE_NAMESPACES = {
+    'raw_': NAMESPACE_RAW,
+    # Visões processadas do api_client: recalculadas do raw store, sem gastar quota
+    'stats_': NAMESPACE_DERIVED,
+    'odds_': NAMESPACE_DERIVED,
+    'classificacao_': NAMESPACE_DERIVED,
+    'h2h_': NAMESPACE_DERIVED,
+    'ultimos_jogos_': NAMESPACE_DERIVED,
+    'first_leg_': NAMESPACE_DERIVED,
+    'analise_jogo_': NAMESPACE_RENDER,
+    'default': NAMESPACE_RAW
+}
+
+GENERATIONS_FILE = "cache_generations.json"
+GENERATIONS_KEY = "__generations__"  # Chave reservada no L2 para compartilhar as gerações
+_generations = {}  # {namespace: geração atual}
+_namespace_versions = {}  # {namespace: versão da lógica que gerou a geração atual}
+
+def get_namespace_for_key(key):
+    """Determina o namespace de geração baseado no prefixo da chave"""
+    for prefix, namespace in CACHE_NAMESPACES.items():
+        if key.startswith(prefix):
+            return namespace
+    return CACHE_NAMESPACES['default']
+
+def league_scope(league_id):
+    """Escopo de geração de uma liga (para set(..., scopes=[...]))"""
+    return f"league:{league_id}"
+
+def fixture_scope(fixture_id):
+    """Escopo de geração de um jogo (para set(..., scopes=[...]))"""
+    return f"fixture:{fixture_id}"
+
+# 📈 TTL ADAPTATIVO: cada refetch real na API (chaves raw_) tem o payload comparado (hash) com o anterior da mesma chave.
+# Famílias que quase nunca mudam ganham TTL maior; as voláteis, menor - sempre dentro dos limites.
+TTL_STATS_FILE = "cache_ttl_stats.json"
+TTL_ADAPTATIVO_MIN_AMOSTRAS = 10   # Refetches mínimos antes de mexer no TTL da família
+TTL_ADAPTATIVO_ALPHA = 0.1         # Peso de cada novo refetch na taxa (média móvel exponencial)
+TTL_ADAPTATIVO_LIMITES = {         # (fator mínimo, fator máximo) sobre o TTL base da família
+    'odds_': (0.25, 1.0),          # Odds nunca ficam mais tempo que o padrão
+    'raw_odds': (0.25, 1.0),
+    'current_season_': (1.0, 14.0),
+    'h2h_': (1.0, 4.0),
+    'default': (0.5, 4.0)
+}
+MAX_PAYLOAD_HASHES = 50000         # Hashes guardados mesmo após expiração (para comparar no refetch)
+
+_payload_hashes = {}  # {key: hash do último payload gravado}
+_family_stats = {}    # {familia: {hits, misses, refetches, inalterados, taxa_inalterado}}
+
+def get_family_for_key(key):
+    """Família da chave para estatísticas/TTL: prefixo do CACHE_EXPIRATION ou raw_<endpoint>"""
+    if key.startswith('raw_'):
+        return key.split('?', 1)[0]
+    for prefix in CACHE_EXPIRATION:
+        if prefix != 'default' and key.startswith(prefix):
+            return prefix
+    return 'default'
+
+def _get_base_expiration_for_key(key):
+    """TTL configurado (sem aprendizado) baseado no prefixo da chave"""
     for prefix, minutes in CACHE_EXPIRATION.items():
         if key.startswith(prefix):
             return minutes
     return CACHE_EXPIRATION['default']
 
-def set(key, value, expiration_minutes=None):
+def _learned_expiration(familia, base_minutes):
+    """
+    TTL aprendido: taxa de refetch inalterado 0% → 0.5x, 50% → 1x, 100% → 4x (limitado pela família).
+    Sem amostras suficientes, retorna o TTL base.
+    """
+    stats = _family_stats.get(familia)
+    if not stats or stats['refetches'] < TTL_ADAPTATIVO_MIN_AMOSTRAS:
+        return base_minutes
+
+    taxa = stats['taxa_inalterado']
+    fator = 0.5 + taxa if taxa <= 0.5 else 1.0 + (taxa - 0.5) * 6
+    fator_min, fator_max = TTL_ADAPTATIVO_LIMITES.get(familia, TTL_ADAPTATIVO_LIMITES['default'])
+    fator = max(fator_min, min(fator_max, fator))
+    return max(1, int(base_minutes * fator))
+
+def get_expiration_for_key(key):
+    """Determina tempo de expiração baseado no prefixo da chave (ajustado pelo TTL aprendido)"""
+    return _learned_expiration(get_family_for_key(key), _get_base_expiration_for_key(key))
+
+def _family_stats_for(familia):
+    """Retorna (criando se necessário) o contador da família"""
+    stats = _family_stats.get(familia)
+    if stats is None:
+        stats = {'hits': 0, 'misses': 0, 'refetches': 0, 'inalterados': 0, 'taxa_inalterado': 0.0}
+        _family_stats[familia] = stats
+    return stats
+
+def _record_access(key, hit):
+    """Contabiliza HIT/MISS por família"""
+    with _cache_lock:
+        _family_stats_for(get_family_for_key(key))['hits' if hit else 'misses'] += 1
+
+def record_fetch(key, value):
+    """
+    Registra o payload de uma resposta recém-buscada na API (chaves raw_) e atualiza a taxa
+    de refetch inalterado da família. Visões derivadas reconstruídas do raw store não passam
+    por aqui: a entrada delas não mudou, então não contam como refetch.
+    """
+    try:
+        payload_hash = hashlib.blake2b(
+            json.dumps(value, sort_keys=True, default=str).encode('utf-8'), digest_size=8
+        ).hexdigest()
+    except (TypeError, ValueError):
+        return None
+
+    with _cache_lock:
+        hash_anterior = _payload_hashes.pop(key, None)
+        _payload_hashes[key] = payload_hash  # Reinserir no fim (ordem = recência)
+        if len(_payload_hashes) > MAX_PAYLOAD_HASHES:
+            _payload_hashes.pop(next(iter(_payload_hashes)))
+
+        if hash_anterior is None:
+            return payload_hash
+
+        stats = _family_stats_for(get_family_for_key(key))
+        inalterado = 1.0 if hash_anterior == payload_hash else 0.0
+        stats['refetches'] += 1
+        stats['inalterados'] += int(inalterado)
+        if stats['refetches'] == 1:
+            stats['taxa_inalterado'] = inalterado
+        else:
+            stats['taxa_inalterado'] += TTL_ADAPTATIVO_ALPHA * (inalterado - stats['taxa_inalterado'])
+    return payload_hash
+
+def get_family_stats():
+    """
+    Estatísticas por família: hit ratio, taxa de refetch inalterado e TTL base vs. aprendido.
+    
+    Returns:
+        list[dict]: Ordenado pelo volume de acessos
+    """
+    with _cache_lock:
+        snapshot = {familia: dict(stats) for familia, stats in _family_stats.items()}
+
+    resultado = []
+    for familia, stats in snapshot.items():
+        acessos = stats['hits'] + stats['misses']
+        base = _get_base_expiration_for_key(familia)
+        resultado.append({
+            'familia': familia,
+            'hits': stats['hits'],
+            'misses': stats['misses'],
+            'hit_ratio': stats['hits'] / acessos if acessos else 0.0,
+            'refetches': stats['refetches'],
+            'taxa_inalterado': stats['taxa_inalterado'],
+            'ttl_base': base,
+            'ttl_aprendido': _learned_expiration(familia, base)
+        })
+    return sorted(resultado, key=lambda f: f['hits'] + f['misses'], reverse=True)
+
+# ⏱️ POLÍTICA DE TTL POR KICKOFF/STATUS: dados ligados a um jogo expiram conforme o momento do jogo
+STATUS_FINALIZADOS = {'FT', 'AET', 'PEN'}
+STATUS_AO_VIVO = {'1H', 'HT', '2H', 'ET', 'BT', 'P', 'LIVE', 'INT', 'SUSP'}
+
+# Odds: quanto mais perto do kickoff, mais curto o TTL (horas até o kickoff, TTL em minutos)
+TTL_ODDS_POR_ANTECEDENCIA = [
+    (24, 360),   # > 24h: 6 horas
+    (6, 120),    # 6-24h: 2 horas
+    (1, 30),     # 1-6h: 30 minutos
+    (0, 10),     # < 1h: 10 minutos
+]
+TTL_FIXTURE_FINALIZADA = 43200   # 30 DIAS - estatísticas de jogo encerrado não mudam mais
+TTL_FIXTURE_AO_VIVO = 5          # 5 MINUTOS - jogo em andamento
+DURACAO_ESTIMADA_JOGO_MIN = 135  # Kickoff + 2h15 (intervalo e acréscimos) = fim provável da partida
+
+def _familia_ttl(key):
+    """Agrupa chaves (visão e resposta bruta) na família da política de TTL"""
+    if key.startswith('odds_') or key.startswith('raw_odds?'):
+        return 'odds'
+    if key.startswith('stats_jogo_') or key.startswith('raw_fixtures/statistics?'):
+        return 'fixture_stats'
+    if key.startswith('classificacao_') or key.startswith('raw_standings?'):
+        return 'standings'
+    return None
+
+def get_expiration_for_fixture(key, kickoff=None, status=None):
+    """
+    Determina o TTL (minutos) de uma chave ligada a um jogo, usando kickoff e status.
+    
+    - Odds: TTL encurta conforme o kickoff se aproxima
+    - Estatísticas de jogo finalizado: praticamente imutáveis (30 dias); ao vivo: 5 minutos
+    - Classificação: expira logo após o fim da rodada (kickoff = último jogo da liga no dia)
+    
+    Sem kickoff/status (ou família sem política), usa CACHE_EXPIRATION.
+    
+    Args:
+        key: Chave do cache (visão ou resposta bruta)
+        kickoff: datetime (timezone-aware) do kickoff
+        status: Status curto da API-Football ('NS', 'FT', '1H'...)
+    """
+    padrao = get_expiration_for_key(key)
+    familia = _familia_ttl(key)
+
+    if familia == 'fixture_stats':
+        if status in STATUS_FINALIZADOS:
+            return TTL_FIXTURE_FINALIZADA
+        if status in STATUS_AO_VIVO:
+            return TTL_FIXTURE_AO_VIVO
+        return padrao
+
+    if kickoff is None:
+        return padrao
+
+    minutos_ate_kickoff = (kickoff - agora_brasilia()).total_seconds() / 60
+
+    if familia == 'odds':
+        if status in STATUS_FINALIZADOS or status in STATUS_AO_VIVO:
+            return padrao
+        for horas_minimas, minutos in TTL_ODDS_POR_ANTECEDENCIA:
+            if minutos_ate_kickoff >= horas_minimas * 60:
+                return min(minutos, padrao)
+        return TTL_ODDS_POR_ANTECEDENCIA[-1][1]
+
+    if familia == 'standings':
+        minutos_ate_fim_rodada = minutos_ate_kickoff + DURACAO_ESTIMADA_JOGO_MIN
+        if minutos_ate_fim_rodada > 0:
+            return max(15, min(int(minutos_ate_fim_rodada) + 15, padrao))
+        return padrao
+
+    return padrao
+
+def set(key, value, expiration_minutes=None, scopes=None):
     """
     Adiciona um valor ao cache com tempo de expiração inteligente.
     Se não especificar tempo, usa valores otimizados por tipo.
     Marca o cache como dirty para salvamento periódico em background.
     
+    Args:
+        scopes: Escopos extras de geração (ex: [fixture_scope(id), league_scope(id)])
+    
     PHOENIX V3.0 - CACHE GROWTH FIX: Agora com logging detalhado
     """
     global _cache, _is_dirty
@@ -59,47 +304,392 @@ def set(key, value, expiration_minutes=None):
 
     with _cache_lock:
         is_new_key = key not in _cache
-        _cache[key] = {
+        payload_hash = _payload_hashes.get(key)  # Só chaves raw_ (record_fetch no fetch da API)
+        namespaces = [get_namespace_for_key(key)] + list(scopes or [])
+        entry = {
             "value": value, 
             "expires_at": expiration_time.isoformat(),
-            "created_at": now.isoformat()
+            "created_at": now.isoformat(),
+            "gen": {ns: _generations.get(ns, 0) for ns in namespaces},
+            "hash": payload_hash
         }
+        _cache[key] = entry
         _is_dirty = True  # Marcar para salvamento posterior
         
+        if _l2_backend is not None:
+            _l2_pending[key] = entry  # Gravado no L2 no próximo flush em lote
+        
         if is_new_key:
             print(f"💾 CACHE_SET: NEW key '{key[:50]}...' added (Total: {len(_cache)} items)")
 
+def _is_entry_stale(key, data):
+    """Verifica se a entrada foi gravada numa geração anterior de algum dos seus namespaces"""
+    stamp = data.get("gen") or {get_namespace_for_key(key): 0}
+    return any(_generations.get(ns, 0) != gen for ns, gen in stamp.items())
+
+def _is_entry_expired(data, key=None):
+    """Verifica se uma entrada do cache já expirou (por tempo ou por geração)"""
+    if key is not None and _is_entry_stale(key, data):
+        return True
+    if data.get("expires_at"):
+        try:
+            expiration_time = datetime.fromisoformat(data["expires_at"])
+            return agora_brasilia() > expiration_time
+        except (TypeError, ValueError):
+            pass
+    return False
+
+def _get_local(key):
+    """Consulta só o L1 (removendo a entrada vencida). Retorna (achou, valor)."""
+    global _cache, _is_dirty
+    with _cache_lock:
+        data = _cache.get(key)
+
+        if data:
+            if not _is_entry_expired(data, key):
+                return True, data.get("value")
+            del _cache[key]
+            _is_dirty = True  # Marcar para salvamento posterior
+    return False, None
+
+def _get_many_local(keys):
+    """Consulta só o L1 para várias chaves. Retorna ({key: value} dos HITS, chaves que faltaram)."""
+    global _cache, _is_dirty
+    resultado = {}
+    faltando = []
+
+    with _cache_lock:
+        for key in keys:
+            data = _cache.get(key)
+            if data and not _is_entry_expired(data, key):
+                resultado[key] = data.get("value")
+                continue
+            if data:
+                del _cache[key]
+                _is_dirty = True
+            faltando.append(key)
+    return resultado, faltando
+
+def _resultado_do_l2(keys, resultado, encontrados):
+    """Junta os HITS do L2 aos do L1 e registra o acesso de cada chave"""
+    for key, entry in encontrados.items():
+        resultado[key] = entry.get("value")
+    for key in keys:
+        _record_access(key, key in resultado)
+    return resultado
+
 def get(key):
     """
     Busca um valor no cache, verificando se não expirou.
+    Em caso de MISS no L1 (memória), consulta o L2 (PostgreSQL) antes de desistir.
+    Em código async use aget(): a consulta ao L2 é síncrona e travaria o event loop.
+    """
+    achou, valor = _get_local(key)
+    if achou:
+        _record_access(key, True)
+        return valor
+
+    encontrados = _fetch_from_l2([key]) if _l2_backend is not None else {}
+    return _resultado_do_l2([key], {}, encontrados).get(key)
+
+def get_many(keys):
+    """
+    Busca várias chaves de uma vez: L1 primeiro, e todos os MISSES em UMA única consulta ao L2.
+    Em código async use aget_many().
+    
+    Returns:
+        dict: {key: value} apenas com as chaves encontradas e válidas
+    """
+    resultado, faltando = _get_many_local(keys)
+    encontrados = _fetch_from_l2(faltando) if faltando and _l2_backend is not None else {}
+    return _resultado_do_l2(keys, resultado, encontrados)
+
+async def aget(key):
+    """get() para handlers async: HIT no L1 responde direto; o MISS vai ao L2 numa thread"""
+    achou, valor = _get_local(key)
+    if achou:
+        _record_access(key, True)
+        return valor
+
+    encontrados = await asyncio.to_thread(_fetch_from_l2, [key]) if _l2_backend is not None else {}
+    return _resultado_do_l2([key], {}, encontrados).get(key)
+
+async def aget_many(keys):
+    """get_many() para handlers async: os MISSES do L1 vão ao L2 numa única consulta, numa thread"""
+    resultado, faltando = _get_many_local(keys)
+    encontrados = await asyncio.to_thread(_fetch_from_l2, faltando) if faltando and _l2_backend is not None else {}
+    return _resultado_do_l2(keys, resultado, encontrados)
+
+def items_with_prefix(prefix):
+    """
+    Entradas válidas do L1 cujo nome começa com o prefixo (ex: importação em lote para outro armazenamento).
+
+    Returns:
+        dict: {key: value}
     """
-    global _cache, _is_dirty
     with _cache_lock:
-        data = _cache.get(key)
+        return {
+            key: data.get("value") for key, data in _cache.items()
+            if key.startswith(prefix) and not _is_entry_expired(data, key)
+        }
 
-        if not data:
-            return None
+def evict_local(keys):
+    """
+    Remove chaves só do L1 deste processo (dados que passaram a viver em outro armazenamento).
+    O L2 mantém a cópia até o TTL. Retorna o número de chaves removidas.
+    """
+    return sum(_invalidate_local("key", key) for key in keys)
 
-        if data.get("expires_at"):
-            try:
-                expiration_time = datetime.fromisoformat(data["expires_at"])
-                if agora_brasilia() > expiration_time:
-                    del _cache[key]
-                    _is_dirty = True  # Marcar para salvamento posterior
-                    return None
-            except (TypeError, ValueError):
-                 pass
+def _fetch_from_l2(keys):
+    """Busca chaves no L2 e promove os HITS para o L1. Retorna {key: entry}."""
+    global _is_dirty
+    encontrados = {
+        key: entry for key, entry in _l2_backend.cache_l2_buscar(keys).items()
+        if not _is_entry_stale(key, entry)
+    }
+    if not encontrados:
+        return {}
 
-        return data.get("value")
+    with _cache_lock:
+        for key, entry in encontrados.items():
+            # Não sobrescrever um valor mais novo gravado enquanto consultávamos o banco
+            if key not in _cache:
+                _cache[key] = entry
+        _is_dirty = True
+
+    print(f"🎯 CACHE HIT (L2): {len(encontrados)}/{len(keys)} chave(s) promovidas para memória")
+    return encontrados
 
 def clear():
     """Limpa todo o cache"""
-    global _cache, _is_dirty
+    global _is_dirty
+    _invalidate_local("clear")
     with _cache_lock:
-        _cache = {}
         _is_dirty = True  # Marcar para salvamento periódico
     print("✅ CACHE CLEARED: Toda memória foi limpa! (Salvamento agendado)")
 
+    # Sem isso, o próximo MISS no L1 traria de volta do L2 tudo o que acabamos de limpar
+    if _l2_backend is not None:
+        removidos = _l2_backend.cache_l2_limpar()
+        print(f"✅ CACHE L2 CLEARED: {removidos} entradas removidas do banco")
+        _save_generations_to_l2()  # A limpeza também apagou a chave reservada das gerações
+        _publish_invalidation("clear")
+
+def invalidate(key):
+    """
+    Remove uma chave do cache em TODOS os processos (L1 local, L2 e demais réplicas via NOTIFY).
+    """
+    _invalidate_local("key", key)
+    if _l2_backend is not None:
+        _l2_backend.cache_l2_remover_chaves([key])
+        _publish_invalidation("key", key)
+
+def invalidate_prefix(prefix):
+    """
+    Remove todas as chaves com o prefixo em TODOS os processos (ex: 'odds_', 'analise_jogo_123_').
+    """
+    removidos = _invalidate_local("prefix", prefix)
+    if _l2_backend is not None:
+        removidos_l2 = _l2_backend.cache_l2_limpar(prefix)
+        _publish_invalidation("prefix", prefix)
+        print(f"🗑️ CACHE INVALIDATE: '{prefix}*' ({removidos} em memória, {removidos_l2} no L2)")
+    else:
+        print(f"🗑️ CACHE INVALIDATE: '{prefix}*' ({removidos} em memória)")
+    return removidos
+
+def bump_generation(namespace):
+    """
+    Invalida em O(1) todas as entradas de um namespace (ex: NAMESPACE_DERIVED, league_scope(71)).
+    Nada é apagado agora: entradas da geração anterior viram MISS no próximo get() e saem na limpeza.
+    
+    Returns:
+        int: Nova geração do namespace
+    """
+    global _is_dirty
+    with _cache_lock:
+        nova_geracao = _generations.get(namespace, 0) + 1
+        _generations[namespace] = nova_geracao
+        _is_dirty = True
+
+    print(f"🏷️ CACHE GENERATION: namespace '{namespace}' agora na geração {nova_geracao}")
+
+    if _l2_backend is not None:
+        _save_generations_to_l2()
+        _publish_invalidation("generation", {namespace: nova_geracao})
+    return nova_geracao
+
+# Versões para handlers async: DELETE no L2, NOTIFY e gravação das gerações rodam numa thread,
+# sem travar o event loop (o L1 é atualizado na mesma chamada, sob o _cache_lock)
+async def aclear():
+    await asyncio.to_thread(clear)
+
+async def ainvalidate(key):
+    await asyncio.to_thread(invalidate, key)
+
+async def ainvalidate_prefix(prefix):
+    return await asyncio.to_thread(invalidate_prefix, prefix)
+
+async def abump_generation(namespace):
+    return await asyncio.to_thread(bump_generation, namespace)
+
+def sync_namespace_version(namespace, version):
+    """
+    Faz bump do namespace se a versão da lógica que o produz mudou desde a última execução.
+    Ex: deploy de novos analistas invalida NAMESPACE_DERIVED/RENDER sem tocar nos dados da API.
+    
+    Returns:
+        bool: True se houve bump
+    """
+    global _is_dirty
+    with _cache_lock:
+        versao_anterior = _namespace_versions.get(namespace)
+        if versao_anterior == version:
+            return False
+        _namespace_versions[namespace] = version
+        _is_dirty = True
+
+    print(f"🔖 CACHE VERSION: namespace '{namespace}' {versao_anterior or '(sem versão)'} → {version}")
+    bump_generation(namespace)
+    return True
+
+def _generations_snapshot():
+    """Estado serializável das gerações (disco e L2)"""
+    with _cache_lock:
+        return {"generations": dict(_generations), "versions": dict(_namespace_versions)}
+
+def _merge_generations(snapshot):
+    """Incorpora gerações vindas do disco/L2, mantendo sempre o maior valor por namespace"""
+    if not isinstance(snapshot, dict):
+        return
+    with _cache_lock:
+        for ns, gen in (snapshot.get("generations") or {}).items():
+            if gen > _generations.get(ns, 0):
+                _generations[ns] = gen
+                if ns in (snapshot.get("versions") or {}):
+                    _namespace_versions[ns] = snapshot["versions"][ns]
+        for ns, version in (snapshot.get("versions") or {}).items():
+            _namespace_versions.setdefault(ns, version)
+
+def _save_generations_to_l2():
+    """Grava as gerações atuais no L2 para que novas instâncias partam delas"""
+    agora = agora_brasilia()
+    _l2_backend.cache_l2_salvar_lote({
+        GENERATIONS_KEY: {
+            "value": _generations_snapshot(),
+            "expires_at": (agora + timedelta(days=3650)).isoformat(),
+            "created_at": agora.isoformat()
+        }
+    })
+
+def _invalidate_local(op, value=None):
+    """Aplica uma invalidação apenas no L1 deste processo. Retorna o número de chaves removidas."""
+    global _cache, _is_dirty
+    with _cache_lock:
+        if op == "clear":
+            removidos = len(_cache)
+            _cache = {}
+            _l2_pending.clear()
+        elif op == "key":
+            removidos = 1 if _cache.pop(value, None) is not None else 0
+            _l2_pending.pop(value, None)
+        elif op == "generation":
+            # Gerações só avançam: aplicar o maior valor conhecido
+            for ns, gen in (value or {}).items():
+                if gen > _generations.get(ns, 0):
+                    _generations[ns] = gen
+            return 0
+        elif op == "prefix":
+            keys_to_remove = [k for k in _cache if k.startswith(value)]
+            for key in keys_to_remove:
+                del _cache[key]
+            for key in [k for k in _l2_pending if k.startswith(value)]:
+                del _l2_pending[key]
+            removidos = len(keys_to_remove)
+        else:
+            return 0
+
+        if removidos:
+            _is_dirty = True
+    return removidos
+
+def _publish_invalidation(op, value=None):
+    """Publica a invalidação para os outros processos via NOTIFY"""
+    payload = json.dumps({"origin": _PROCESS_ID, "op": op, "value": value})
+    _l2_backend.publicar_invalidacao_cache(INVALIDATION_CHANNEL, payload)
+
+def apply_invalidation_message(payload):
+    """
+    Aplica uma mensagem recebida pelo LISTEN. Mensagens publicadas por este próprio processo são ignoradas.
+    """
+    try:
+        message = json.loads(payload)
+    except (TypeError, ValueError):
+        print(f"⚠️ CACHE BUS: mensagem inválida ignorada: {payload!r}")
+        return 0
+
+    if message.get("origin") == _PROCESS_ID:
+        return 0
+
+    removidos = _invalidate_local(message.get("op"), message.get("value"))
+    print(f"📣 CACHE BUS: invalidação '{message.get('op')}' {message.get('value') or ''} recebida ({removidos} itens removidos)")
+    return removidos
+
+async def cache_invalidation_listener(db_manager, reconnect_seconds=10):
+    """
+    Tarefa em background que escuta o canal de invalidação (LISTEN) e aplica as mensagens no L1.
+    Usa uma conexão dedicada monitorada pelo event loop (sem polling), e reconecta em caso de queda.
+    
+    Args:
+        db_manager: DatabaseManager habilitado
+        reconnect_seconds: Espera antes de reconectar após falha
+    """
+    if db_manager is None or not db_manager.enabled:
+        return
+
+    print(f"📣 Cache invalidation listener iniciado (canal '{INVALIDATION_CHANNEL}')")
+    loop = asyncio.get_running_loop()
+
+    while True:
+        conn = None
+        try:
+            conn = await asyncio.to_thread(db_manager.abrir_conexao_listen, INVALIDATION_CHANNEL)
+            if conn is None:
+                await asyncio.sleep(reconnect_seconds)
+                continue
+
+            queue = asyncio.Queue()
+
+            def _on_readable():
+                try:
+                    conn.poll()
+                    while conn.notifies:
+                        queue.put_nowait(conn.notifies.pop(0).payload)
+                except Exception as e:
+                    queue.put_nowait(e)  # Acordar o loop abaixo para reconectar
+
+            loop.add_reader(conn.fileno(), _on_readable)
+            try:
+                while True:
+                    item = await queue.get()
+                    if isinstance(item, Exception):
+                        raise item
+                    apply_invalidation_message(item)
+            finally:
+                loop.remove_reader(conn.fileno())
+
+        except asyncio.CancelledError:
+            print("🛑 Cache invalidation listener cancelado (shutdown em progresso)")
+            raise
+        except Exception as e:
+            print(f"❌ Erro no cache invalidation listener: {e} (reconectando em {reconnect_seconds}s)")
+            await asyncio.sleep(reconnect_seconds)
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
 def get_stats():
     """Retorna estatísticas do cache sem alterar o dict durante iteração"""
     global _cache
@@ -109,6 +699,8 @@ def get_stats():
     validos = 0
 
     for key, data in cache_items:
+        if _is_entry_stale(key, data):
+            continue
         if data.get("expires_at"):
             try:
                 expiration_time = datetime.fromisoformat(data["expires_at"])
@@ -138,6 +730,14 @@ def save_cache_to_disk():
                 json.dump(cache_copy, f, indent=4)
             else:
                 f.write('{}')
+
+        with open(GENERATIONS_FILE, 'w') as f:
+            json.dump(_generations_snapshot(), f, indent=4)
+
+        with _cache_lock:
+            ttl_stats = {familia: dict(stats) for familia, stats in _family_stats.items()}
+        with open(TTL_STATS_FILE, 'w') as f:
+            json.dump(ttl_stats, f, indent=4)
         
         # Resetar flag APENAS após escrita bem-sucedida
         with _cache_lock:
@@ -172,6 +772,10 @@ async def periodic_cache_saver(interval_minutes=5):
                 # Executar I/O em thread separada para não bloquear event loop
                 await asyncio.to_thread(save_cache_to_disk)
                 print(f"✅ Cache salvo com sucesso! Tamanho: {stats['total']} itens")
+            
+            if _l2_backend is not None:
+                await asyncio.to_thread(flush_l2)
+                await asyncio.to_thread(_l2_backend.cache_l2_remover_expirados)
         except asyncio.CancelledError:
             # Permitir shutdown limpo re-raising CancelledError
             print("🛑 Cache saver cancelado (shutdown em progresso)")
@@ -193,6 +797,9 @@ def cleanup_expired():
     with _cache_lock:
         keys_to_remove = []
         for key, data in _cache.items():
+            if _is_entry_stale(key, data):
+                keys_to_remove.append(key)
+                continue
             if data.get("expires_at"):
                 try:
                     expiration_time = datetime.fromisoformat(data["expires_at"])
@@ -217,11 +824,24 @@ def load_cache_from_disk():
     """Carrega o cache do arquivo JSON ao iniciar o bot"""
     global _cache
     try:
+        if os.path.exists(GENERATIONS_FILE):
+            with open(GENERATIONS_FILE, 'r') as f:
+                _merge_generations(json.load(f))
+
+        if os.path.exists(TTL_STATS_FILE):
+            with open(TTL_STATS_FILE, 'r') as f:
+                for familia, stats in json.load(f).items():
+                    _family_stats_for(familia).update(stats)
+
         if os.path.exists(CACHE_FILE):
             with open(CACHE_FILE, 'r') as f:
                 content = f.read()
                 if content:
                     _cache = json.loads(content)
+                    # Hashes dos payloads (inclusive expirados) para comparar no próximo refetch
+                    for key, data in _cache.items():
+                        if data.get("hash"):
+                            _payload_hashes[key] = data["hash"]
                     # Limpar expirados ao carregar
                     cleanup_expired()
                     stats = get_stats()
@@ -234,3 +854,84 @@ def load_cache_from_disk():
     except (json.JSONDecodeError, Exception) as e:
         print(f"❌ ERRO ao carregar cache: {e}")
         _cache = {}
+
+def enable_l2_cache(db_manager):
+    """
+    Ativa o cache L2 compartilhado (tabela cache_entries) usando o DatabaseManager informado.
+    Sem banco habilitado, o cache continua apenas em memória + cache.json.
+    
+    Returns:
+        bool: True se o L2 foi ativado
+    """
+    global _l2_backend
+    if db_manager is None or not db_manager.enabled:
+        print("ℹ️  CACHE L2 desabilitado (banco indisponível). Usando apenas memória + disco.")
+        return False
+
+    _l2_backend = db_manager
+    print("✅ CACHE L2 habilitado: PostgreSQL (cache_entries)")
+    return True
+
+def flush_l2():
+    """
+    Grava no L2, em lotes, todas as entradas pendentes desde o último flush.
+    Em caso de falha, as entradas voltam para a fila (sem sobrescrever valores mais novos).
+    
+    Returns:
+        int: Número de entradas gravadas
+    """
+    global _l2_pending
+    if _l2_backend is None:
+        return 0
+
+    with _cache_lock:
+        if not _l2_pending:
+            return 0
+        pendentes = _l2_pending
+        _l2_pending = {}
+
+    itens = list(pendentes.items())
+    gravados = 0
+    for i in range(0, len(itens), L2_FLUSH_BATCH_SIZE):
+        lote = dict(itens[i:i + L2_FLUSH_BATCH_SIZE])
+        salvos = _l2_backend.cache_l2_salvar_lote(lote)
+        if salvos == 0:
+            with _cache_lock:
+                for key, entry in itens[i:]:
+                    _l2_pending.setdefault(key, entry)
+            print(f"❌ CACHE L2: falha no flush, {len(itens) - i} entradas re-agendadas")
+            break
+        gravados += salvos
+
+    if gravados:
+        print(f"🗄️ CACHE L2: {gravados} entradas gravadas em lote")
+    return gravados
+
+def preload_from_l2():
+    """
+    Warm start: carrega do L2 todas as entradas válidas que ainda não estão no L1.
+    Uma nova réplica (ou um restart) começa com o cache que as outras já pagaram.
+    
+    Returns:
+        int: Número de entradas carregadas
+    """
+    global _is_dirty
+    if _l2_backend is None:
+        return 0
+
+    entradas = _l2_backend.cache_l2_carregar_validos()
+    geracoes = entradas.pop(GENERATIONS_KEY, None)
+    if geracoes:
+        _merge_generations(geracoes.get("value"))
+
+    carregadas = 0
+    with _cache_lock:
+        for key, entry in entradas.items():
+            if key not in _cache and not _is_entry_stale(key, entry):
+                _cache[key] = entry
+                carregadas += 1
+        if carregadas:
+            _is_dirty = True
+
+    print(f"✅ CACHE L2 LOADED: {carregadas} entradas carregadas do banco (Total no L2: {len(entradas)})")
+    return carregadas
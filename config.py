@@ -7,6 +7,11 @@ Arquivo central para todas as configurações e constantes do projeto.
 # --- CONFIGURAÇÕES GLOBAIS DO BOT ---
 JOGOS_POR_PAGINA = 5
 
+# --- VERSÃO DA LÓGICA DE ANÁLISE ---
+# Alterar ao mudar analistas, formatação ou visões processadas do api_client:
+# invalida análises, visões e mensagens em cache (as respostas brutas da API ficam)
+VERSAO_MODELO_ANALISE = "phoenix-3.1"
+
 # --- CONFIGURAÇÕES DOS ANALISTAS ---
 ODD_MINIMA_DE_VALOR = 1.20  # Reduzido para capturar valor em favoritos
 
@@ -1,30 +1,191 @@
 # db_manager.py
 import os
 import json
+import time
+import zlib
+import hashlib
+import asyncio
+import threading
 import psycopg2
-from psycopg2 import pool
-from psycopg2.extras import RealDictCursor, Json
+from psycopg2 import pool, sql
+from psycopg2.extras import RealDictCursor, Json, execute_values
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 from zoneinfo import ZoneInfo
 from contextlib import contextmanager
 
+import cache_manager
+
 # 🇧🇷 HORÁRIO DE BRASÍLIA: Todas as operações de datetime usam timezone de Brasília
 BRASILIA_TZ = ZoneInfo("America/Sao_Paulo")
 
+def hash_dossier(dossier_json: str) -> str:
+    """Hash de conteúdo do dossier (chave da tabela daily_dossiers)"""
+    return hashlib.blake2b(dossier_json.encode('utf-8'), digest_size=20).hexdigest()
+
+def comprimir_dossier(dossier_json: str) -> bytes:
+    return zlib.compress(dossier_json.encode('utf-8'), 6)
+
+def descomprimir_dossier(dados) -> str:
+    return zlib.decompress(bytes(dados)).decode('utf-8')
+
 def agora_brasilia():
     """Retorna datetime atual no horário de Brasília"""
     return datetime.now(BRASILIA_TZ)
 
+# ⏱️ Limites do banco: nenhuma query pode segurar uma conexão (e quem espera por ela) indefinidamente
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '5000'))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv('DB_POOL_TIMEOUT_SECONDS', '10'))
+
+# 🗂️ Particionamento diário (RANGE por dia de Brasília): retenção = DROP de partição, consultas do dia só tocam 1 partição
+PARTICOES_DIAS_A_FRENTE = 7
+TABELAS_PARTICIONADAS = {
+    # tabela: coluna de particionamento, retenção em dias e expressão para migrar linhas de tabelas antigas
+    'analises_jogos': {'coluna': 'data_jogo', 'retencao_dias': 7, 'expressao_legado': None},
+    'daily_analyses': {'coluna': 'data_ref', 'retencao_dias': 2,
+                       'expressao_legado': "(created_at AT TIME ZONE 'America/Sao_Paulo')::date"},
+}
+
+# 🔧 Migrações versionadas: (versão, descrição, método do DatabaseManager que recebe o cursor).
+# Nunca editar uma migração já publicada - mudanças de schema entram como uma nova versão no fim da lista.
+SCHEMA_BASE_SQL = """
+    -- Tabela principal de análises de jogos (cache)
+    CREATE TABLE IF NOT EXISTS analises_jogos (
+        id SERIAL,
+        fixture_id INTEGER NOT NULL,
+        data_jogo TIMESTAMP WITH TIME ZONE NOT NULL,
+        liga VARCHAR(255),
+        time_casa VARCHAR(255),
+        time_fora VARCHAR(255),
+        stats_casa JSONB,
+        stats_fora JSONB,
+        classificacao JSONB,
+        analise_gols JSONB,
+        analise_cantos JSONB,
+        analise_btts JSONB,
+        analise_resultado JSONB,
+        analise_cartoes JSONB,
+        analise_contexto JSONB,
+        analise_finalizacoes JSONB,
+        analise_handicaps JSONB,
+        analysis_summary JSONB,
+        versao_modelo VARCHAR(50),
+        palpites_totais INTEGER DEFAULT 0,
+        confianca_media DECIMAL(3,1) DEFAULT 0,
+        data_analise TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        atualizado_em TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        PRIMARY KEY (id, data_jogo),
+        UNIQUE (fixture_id, data_jogo)
+    ) PARTITION BY RANGE (data_jogo);
+
+    CREATE TABLE IF NOT EXISTS analises_jogos_default PARTITION OF analises_jogos DEFAULT;
+
+    -- Bancos antigos: snapshot completo (todos os mercados + resumo do master_analyzer + versão do modelo)
+    ALTER TABLE analises_jogos ADD COLUMN IF NOT EXISTS analise_finalizacoes JSONB;
+    ALTER TABLE analises_jogos ADD COLUMN IF NOT EXISTS analise_handicaps JSONB;
+    ALTER TABLE analises_jogos ADD COLUMN IF NOT EXISTS analysis_summary JSONB;
+    ALTER TABLE analises_jogos ADD COLUMN IF NOT EXISTS versao_modelo VARCHAR(50);
+
+    -- Índices para performance
+    CREATE INDEX IF NOT EXISTS idx_analises_jogos_fixture_id ON analises_jogos(fixture_id);
+    CREATE INDEX IF NOT EXISTS idx_analises_jogos_data_jogo ON analises_jogos(data_jogo);
+    CREATE INDEX IF NOT EXISTS idx_analises_jogos_atualizado_em ON analises_jogos(atualizado_em);
+
+    -- Dossiers do sistema de fila: gravados UMA vez (comprimidos), endereçados pelo hash do conteúdo
+    CREATE TABLE IF NOT EXISTS daily_dossiers (
+        content_hash VARCHAR(40) PRIMARY KEY,
+        fixture_id INTEGER NOT NULL,
+        analysis_type VARCHAR(50) NOT NULL,
+        dossier_zlib BYTEA NOT NULL,
+        tamanho_bytes INTEGER NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_daily_dossiers_created_at ON daily_dossiers(created_at);
+
+    -- Nova tabela para sistema de fila de análises diárias (referência fina por usuário -> daily_dossiers)
+    CREATE TABLE IF NOT EXISTS daily_analyses (
+        id SERIAL,
+        fixture_id INTEGER NOT NULL,
+        analysis_type VARCHAR(50) NOT NULL,
+        dossier_hash VARCHAR(40) REFERENCES daily_dossiers(content_hash),
+        dossier_json TEXT,
+        user_id BIGINT NOT NULL,
+        data_ref DATE NOT NULL DEFAULT CURRENT_DATE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        PRIMARY KEY (id, data_ref),
+        UNIQUE (fixture_id, analysis_type, user_id, data_ref)
+    ) PARTITION BY RANGE (data_ref);
+
+    CREATE TABLE IF NOT EXISTS daily_analyses_default PARTITION OF daily_analyses DEFAULT;
+
+    -- Bancos antigos: dossier_json por linha vira legado (lido só se dossier_hash for NULL)
+    ALTER TABLE daily_analyses ADD COLUMN IF NOT EXISTS dossier_hash VARCHAR(40) REFERENCES daily_dossiers(content_hash);
+    ALTER TABLE daily_analyses ALTER COLUMN dossier_json DROP NOT NULL;
+
+    -- Índices para performance na tabela daily_analyses
+    -- Paginação por keyset: índice casa exatamente com o ORDER BY (created_at DESC, id DESC)
+    DROP INDEX IF EXISTS idx_daily_analyses_user_type;
+    CREATE INDEX IF NOT EXISTS idx_daily_analyses_keyset ON daily_analyses(user_id, analysis_type, created_at DESC, id DESC);
+    CREATE INDEX IF NOT EXISTS idx_daily_analyses_created_at ON daily_analyses(created_at);
+    CREATE INDEX IF NOT EXISTS idx_daily_analyses_fixture_id ON daily_analyses(fixture_id);
+    CREATE INDEX IF NOT EXISTS idx_daily_analyses_dossier_hash ON daily_analyses(dossier_hash);
+    
+    -- Cache L2 compartilhado entre processos (cache_manager)
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        key TEXT PRIMARY KEY,
+        value JSONB NOT NULL,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries(expires_at);
+
+    -- Comentários para documentação
+    COMMENT ON TABLE analises_jogos IS 'Cache de análises completas de jogos processados';
+    COMMENT ON COLUMN analises_jogos.versao_modelo IS 'Versão do modelo que gerou o snapshot (linhas de outra versão são ignoradas)';
+    COMMENT ON TABLE daily_analyses IS 'Análises processadas em batch pelo sistema de fila assíncrona';
+    COMMENT ON COLUMN daily_analyses.analysis_type IS 'Tipo: full, goals_only, corners_only, btts_only, result_only, simple_bet, multiple_bet, bingo';
+    COMMENT ON COLUMN daily_analyses.dossier_json IS 'LEGADO: JSON completo por usuário (novas linhas usam dossier_hash)';
+    COMMENT ON COLUMN daily_analyses.data_ref IS 'Dia (Brasília) da análise - chave das partições diárias';
+    COMMENT ON COLUMN daily_analyses.dossier_hash IS 'Hash do dossier em daily_dossiers (compartilhado entre usuários)';
+    COMMENT ON TABLE daily_dossiers IS 'Dossiers do master_analyzer, comprimidos com zlib e gravados uma única vez por conteúdo';
+    COMMENT ON TABLE cache_entries IS 'Cache L2 compartilhado: respostas da API e análises derivadas, com expiração';
+"""
+
+MIGRACOES = [
+    (1, "Schema base: analises_jogos/daily_analyses particionadas, daily_dossiers, cache_entries", '_migracao_001_schema_base'),
+    (2, "cache_entries.gen: gerações (namespace + escopos) de cada entrada do L2", '_migracao_002_cache_entries_gen'),
+]
+SCHEMA_VERSAO_ATUAL = MIGRACOES[-1][0]
+MIGRACOES_LOCK_ID = 724_001  # pg_advisory_lock exclusivo das migrações
+
 class DatabaseManager:
     """
     Gerenciador de banco de dados para armazenar análises completas de jogos.
     Evita refazer análises desnecessárias e economiza créditos da API.
     Usa connection pooling para melhor performance e eficiência.
+    
+    API síncrona (scripts, threads) + `self.aio` (AsyncDatabaseManager) para os handlers async:
+    as chamadas rodam em threads, com pool thread-safe, sem bloquear o event loop.
     """
 
     def __init__(self, min_conn=1, max_conn=10):
         self.database_url = os.getenv('DATABASE_URL')
+        self.max_conn = max_conn
+        self._pool_slots = threading.BoundedSemaphore(max_conn)
+        self._metricas_lock = threading.Lock()
+        self._metricas = {
+            'checkouts': 0,
+            'em_uso': 0,
+            'pico_em_uso': 0,
+            'espera_total_ms': 0.0,
+            'espera_max_ms': 0.0,
+            'timeouts_pool': 0
+        }
+        self.aio = AsyncDatabaseManager(self)
+        
         if not self.database_url:
             print("⚠️ DATABASE_URL não encontrado. Cache de análises desabilitado.")
             self.enabled = False
@@ -32,13 +193,15 @@ class DatabaseManager:
         else:
             self.enabled = True
             try:
-                # Criar connection pool
-                self.pool = psycopg2.pool.SimpleConnectionPool(
+                # Criar connection pool (ThreadedConnectionPool: seguro para uso via asyncio.to_thread)
+                self.pool = psycopg2.pool.ThreadedConnectionPool(
                     min_conn,
                     max_conn,
-                    self.database_url
+                    self.database_url,
+                    # timezone de Brasília na sessão: CURRENT_DATE e limites das partições diárias batem com agora_brasilia()
+                    options=f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS} -c timezone=America/Sao_Paulo"
                 )
-                print(f"✅ Connection pool criado: {min_conn}-{max_conn} conexões")
+                print(f"✅ Connection pool criado: {min_conn}-{max_conn} conexões (statement_timeout={DB_STATEMENT_TIMEOUT_MS}ms)")
             except Exception as e:
                 print(f"❌ Erro ao criar connection pool: {e}")
                 self.enabled = False
@@ -46,81 +209,105 @@ class DatabaseManager:
 
     @contextmanager
     def _get_connection(self):
-        """Context manager para obter conexão do pool"""
+        """
+        Context manager para obter conexão do pool.
+        Espera até DB_POOL_TIMEOUT_SECONDS por uma conexão livre (em vez de falhar com pool esgotado)
+        e devolve a conexão sempre limpa (rollback de transação pendente/abortada).
+        """
         if not self.enabled or not self.pool:
             yield None
             return
         
+        inicio = time.monotonic()
+        if not self._pool_slots.acquire(timeout=DB_POOL_TIMEOUT_SECONDS):
+            with self._metricas_lock:
+                self._metricas['timeouts_pool'] += 1
+            raise psycopg2.pool.PoolError(f"Nenhuma conexão livre em {DB_POOL_TIMEOUT_SECONDS}s")
+        
+        espera_ms = (time.monotonic() - inicio) * 1000
+        with self._metricas_lock:
+            self._metricas['checkouts'] += 1
+            self._metricas['em_uso'] += 1
+            self._metricas['pico_em_uso'] = max(self._metricas['pico_em_uso'], self._metricas['em_uso'])
+            self._metricas['espera_total_ms'] += espera_ms
+            self._metricas['espera_max_ms'] = max(self._metricas['espera_max_ms'], espera_ms)
+        
         conn = None
         try:
             conn = self.pool.getconn()
             yield conn
         finally:
             if conn:
-                self.pool.putconn(conn)
+                if not conn.closed and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                self.pool.putconn(conn, close=bool(conn.closed))
+            with self._metricas_lock:
+                self._metricas['em_uso'] -= 1
+            self._pool_slots.release()
+    
+    def obter_metricas_pool(self) -> Dict:
+        """
+        Retorna métricas do connection pool (uso, pico, espera média/máxima por conexão, timeouts).
+        """
+        with self._metricas_lock:
+            metricas = dict(self._metricas)
+        
+        metricas['max_conexoes'] = self.max_conn
+        metricas['espera_media_ms'] = (
+            metricas['espera_total_ms'] / metricas['checkouts'] if metricas['checkouts'] else 0.0
+        )
+        metricas['statement_timeout_ms'] = DB_STATEMENT_TIMEOUT_MS
+        return metricas
     
     def initialize_database(self):
         """
-        Inicializa o schema do banco de dados, criando todas as tabelas necessárias.
-        Executa CREATE TABLE IF NOT EXISTS para garantir que o schema está completo.
+        Inicializa o schema do banco de dados aplicando as migrações pendentes (ver MIGRACOES).
+        Mantido para scripts; o bot usa garantir_schema() no startup.
+        """
+        return self.garantir_schema()
+    
+    # ========================================
+    # MIGRAÇÕES DE SCHEMA (schema_migrations)
+    # ========================================
+
+    def versao_schema(self) -> int:
+        """Versão aplicada do schema (0 = banco sem schema_migrations). Uma única query trivial."""
+        if not self.enabled:
+            return 0
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return 0
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_migrations")
+                    return cursor.fetchone()[0]
+                except psycopg2.errors.UndefinedTable:
+                    return 0
+                finally:
+                    cursor.close()
+        except Exception as e:
+            print(f"❌ Erro ao verificar versão do schema: {e}")
+            return 0
+
+    def garantir_schema(self) -> bool:
+        """
+        Checagem rápida de startup: se o banco já está na versão de SCHEMA_VERSAO_ATUAL não roda DDL nenhum;
+        senão aplica, em ordem, só as migrações que faltam.
         """
         if not self.enabled:
             print("⚠️ Database não habilitado, pulando inicialização")
             return False
         
-        schema_sql = """
-        -- Tabela principal de análises de jogos (cache)
-        CREATE TABLE IF NOT EXISTS analises_jogos (
-            id SERIAL PRIMARY KEY,
-            fixture_id INTEGER UNIQUE NOT NULL,
-            data_jogo TIMESTAMP WITH TIME ZONE NOT NULL,
-            liga VARCHAR(255),
-            time_casa VARCHAR(255),
-            time_fora VARCHAR(255),
-            stats_casa JSONB,
-            stats_fora JSONB,
-            classificacao JSONB,
-            analise_gols JSONB,
-            analise_cantos JSONB,
-            analise_btts JSONB,
-            analise_resultado JSONB,
-            analise_cartoes JSONB,
-            analise_contexto JSONB,
-            palpites_totais INTEGER DEFAULT 0,
-            confianca_media DECIMAL(3,1) DEFAULT 0,
-            data_analise TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            atualizado_em TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-
-        -- Índices para performance
-        CREATE INDEX IF NOT EXISTS idx_analises_jogos_fixture_id ON analises_jogos(fixture_id);
-        CREATE INDEX IF NOT EXISTS idx_analises_jogos_data_jogo ON analises_jogos(data_jogo);
-        CREATE INDEX IF NOT EXISTS idx_analises_jogos_atualizado_em ON analises_jogos(atualizado_em);
-
-        -- Nova tabela para sistema de fila de análises diárias
-        CREATE TABLE IF NOT EXISTS daily_analyses (
-            id SERIAL PRIMARY KEY,
-            fixture_id INTEGER NOT NULL,
-            analysis_type VARCHAR(50) NOT NULL,
-            dossier_json TEXT NOT NULL,
-            user_id BIGINT NOT NULL,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            CONSTRAINT daily_analyses_unique UNIQUE (fixture_id, analysis_type, user_id)
-        );
-
-        -- Índices para performance na tabela daily_analyses
-        CREATE INDEX IF NOT EXISTS idx_daily_analyses_user_type ON daily_analyses(user_id, analysis_type);
-        CREATE INDEX IF NOT EXISTS idx_daily_analyses_created_at ON daily_analyses(created_at);
-        CREATE INDEX IF NOT EXISTS idx_daily_analyses_fixture_id ON daily_analyses(fixture_id);
-        
-        -- Comentários para documentação
-        COMMENT ON TABLE analises_jogos IS 'Cache de análises completas de jogos processados';
-        COMMENT ON TABLE daily_analyses IS 'Análises processadas em batch pelo sistema de fila assíncrona';
-        COMMENT ON COLUMN daily_analyses.analysis_type IS 'Tipo: full, goals_only, corners_only, btts_only, result_only, simple_bet, multiple_bet, bingo';
-        COMMENT ON COLUMN daily_analyses.dossier_json IS 'JSON completo do dossier de análise gerado pelo master_analyzer';
-        """
+        versao = self.versao_schema()
+        if versao >= SCHEMA_VERSAO_ATUAL:
+            print(f"✅ Schema do banco em dia (versão {versao})")
+            return True
         
+        return self._aplicar_migracoes()
+
+    def _aplicar_migracoes(self) -> bool:
         try:
             with self._get_connection() as conn:
                 if not conn:
@@ -129,35 +316,288 @@ class DatabaseManager:
                 
                 cursor = conn.cursor()
                 
-                # Executar todo o schema
-                cursor.execute(schema_sql)
-                
-                conn.commit()
-                cursor.close()
-                
-                print("✅ Database schema inicializado com sucesso!")
-                print("   📋 Tabelas criadas: analises_jogos, daily_analyses")
-                return True
+                # O pool aplica statement_timeout em toda conexão: DDL pesado (cópia das tabelas legadas)
+                # e a espera pelo lock de outro processo migrando não podem ser cortados no meio.
+                # SET LOCAL vale só até o commit, então é repetido em cada transação abaixo.
+                cursor.execute("SET LOCAL statement_timeout = 0")
+                # Vários processos podem subir juntos: só um migra, os outros esperam e encontram tudo aplicado
+                cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRACOES_LOCK_ID,))
+                try:
+                    cursor.execute("""
+                        CREATE TABLE IF NOT EXISTS schema_migrations (
+                            versao INTEGER PRIMARY KEY,
+                            descricao TEXT NOT NULL,
+                            aplicada_em TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                        )
+                    """)
+                    cursor.execute("SELECT versao FROM schema_migrations")
+                    aplicadas = {v for (v,) in cursor.fetchall()}
+                    conn.commit()
+                    
+                    for versao, descricao, nome_metodo in MIGRACOES:
+                        if versao in aplicadas:
+                            continue
+                        
+                        print(f"🔧 Aplicando migração {versao:03d}: {descricao}")
+                        cursor.execute("SET LOCAL statement_timeout = 0")
+                        getattr(self, nome_metodo)(cursor)
+                        cursor.execute(
+                            "INSERT INTO schema_migrations (versao, descricao) VALUES (%s, %s)",
+                            (versao, descricao)
+                        )
+                        # Cada migração é atômica: DDL + registro no mesmo commit
+                        conn.commit()
+                finally:
+                    conn.rollback()
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRACOES_LOCK_ID,))
+                    conn.commit()
+                    cursor.close()
+            
+            print(f"✅ Database schema inicializado com sucesso! (versão {SCHEMA_VERSAO_ATUAL})")
+            print("   📋 Tabelas criadas: analises_jogos, daily_analyses, daily_dossiers, cache_entries")
+            return True
                 
         except Exception as e:
             print(f"❌ Erro ao inicializar database schema: {e}")
             return False
+
+    def _migracao_001_schema_base(self, cursor):
+        """Schema base: tabelas de análise particionadas por dia, dossiers compartilhados e cache L2"""
+        # Tabelas antigas (sem partição) saem do caminho antes do schema novo
+        legados = self._renomear_tabelas_legadas(cursor)
+        
+        cursor.execute(SCHEMA_BASE_SQL)
+        
+        # Partições precisam existir antes de copiar as linhas antigas para o destino certo
+        hoje = agora_brasilia().date()
+        for tabela in TABELAS_PARTICIONADAS:
+            for deslocamento in range(-1, PARTICOES_DIAS_A_FRENTE + 1):
+                self._criar_particao(cursor, tabela, hoje + timedelta(days=deslocamento))
+        
+        for tabela in legados:
+            self._migrar_tabela_legada(cursor, tabela)
+
+    def _migracao_002_cache_entries_gen(self, cursor):
+        """Carimbo de geração no L2: sem ele, bump_generation não alcança o que já está no banco"""
+        cursor.execute("ALTER TABLE cache_entries ADD COLUMN IF NOT EXISTS gen JSONB")
+        cursor.execute(
+            "COMMENT ON COLUMN cache_entries.gen IS "
+            "'Geração de cada namespace/escopo da entrada no momento do set() ({namespace: geração})'"
+        )
     
+    # ========================================
+    # PARTICIONAMENTO DIÁRIO
+    # ========================================
+
+    @staticmethod
+    def _nome_particao(tabela: str, dia) -> str:
+        return f"{tabela}_p{dia:%Y%m%d}"
+
+    def _renomear_tabelas_legadas(self, cursor) -> List[str]:
+        """
+        Tabelas criadas antes do particionamento (heap simples) viram <tabela>_legado,
+        junto com seus índices, para o schema particionado ser criado com os nomes originais.
+        
+        Returns:
+            Tabelas renomeadas (a migrar com _migrar_tabela_legada)
+        """
+        legados = []
+        for tabela in TABELAS_PARTICIONADAS:
+            cursor.execute("""
+                SELECT c.relkind FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relname = %s AND n.nspname = current_schema()
+            """, (tabela,))
+            linha = cursor.fetchone()
+            if not linha or linha[0] != 'r':
+                continue  # não existe ou já é particionada ('p')
+            
+            legado = f"{tabela}_legado"
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s",
+                (tabela,)
+            )
+            for (indice,) in cursor.fetchall():
+                cursor.execute(sql.SQL("ALTER INDEX {} RENAME TO {}").format(
+                    sql.Identifier(indice), sql.Identifier(f"{indice}_legado")
+                ))
+            cursor.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                sql.Identifier(tabela), sql.Identifier(legado)
+            ))
+            print(f"🗂️ Tabela {tabela} sem particionamento renomeada para {legado} (será migrada)")
+            legados.append(tabela)
+        return legados
+
+    def _migrar_tabela_legada(self, cursor, tabela: str):
+        """Copia as linhas de <tabela>_legado para a tabela particionada e remove a antiga"""
+        config = TABELAS_PARTICIONADAS[tabela]
+        legado = f"{tabela}_legado"
+        
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = %s
+        """, (legado,))
+        colunas_legado = {c for (c,) in cursor.fetchall()}
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = %s
+            ORDER BY ordinal_position
+        """, (tabela,))
+        colunas = [c for (c,) in cursor.fetchall() if c in colunas_legado]
+        
+        destino = [sql.Identifier(c) for c in colunas]
+        origem = [sql.Identifier(c) for c in colunas]
+        coluna_particao = config['coluna']
+        if coluna_particao not in colunas_legado and config['expressao_legado']:
+            destino.append(sql.Identifier(coluna_particao))
+            origem.append(sql.SQL(config['expressao_legado']))
+        
+        cursor.execute(sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}").format(
+            sql.Identifier(tabela),
+            sql.SQL(', ').join(destino),
+            sql.SQL(', ').join(origem),
+            sql.Identifier(legado)
+        ))
+        migradas = cursor.rowcount
+        
+        # Sequência do SERIAL novo continua depois dos ids copiados
+        cursor.execute(sql.SQL(
+            "SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE((SELECT MAX(id) FROM {}), 0) + 1, false)"
+        ).format(sql.Identifier(tabela)), (tabela,))
+        
+        cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(legado)))
+        print(f"✅ {migradas} linhas de {legado} migradas para {tabela} (particionada)")
+
+    def _criar_particao(self, cursor, tabela: str, dia):
+        cursor.execute(
+            sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(
+                sql.Identifier(self._nome_particao(tabela, dia)), sql.Identifier(tabela)
+            ),
+            (dia.isoformat(), (dia + timedelta(days=1)).isoformat())
+        )
+
+    def garantir_particoes(self, dias_a_frente: int = PARTICOES_DIAS_A_FRENTE) -> int:
+        """
+        Cria as partições diárias de ontem até hoje + dias_a_frente (idempotente).
+        
+        Returns:
+            Número de partições verificadas/criadas
+        """
+        if not self.enabled:
+            return 0
+        
+        hoje = agora_brasilia().date()
+        criadas = 0
+        
+        for tabela in TABELAS_PARTICIONADAS:
+            for deslocamento in range(-1, dias_a_frente + 1):
+                dia = hoje + timedelta(days=deslocamento)
+                try:
+                    with self._get_connection() as conn:
+                        if not conn:
+                            return criadas
+                        cursor = conn.cursor()
+                        self._criar_particao(cursor, tabela, dia)
+                        conn.commit()
+                        cursor.close()
+                        criadas += 1
+                except Exception as e:
+                    # Ex: partição DEFAULT já tem linhas desse dia - o dia continua sendo atendido por ela
+                    print(f"⚠️ Não foi possível criar partição {self._nome_particao(tabela, dia)}: {e}")
+        
+        return criadas
+
+    def remover_particoes_expiradas(self, retencao_dias: Optional[Dict[str, int]] = None) -> int:
+        """
+        Retenção O(1): DETACH + DROP das partições diárias mais antigas que a retenção de cada tabela
+        (em vez de DELETE linha a linha). Linhas antigas que caíram na partição DEFAULT e
+        dossiers que ficaram sem referência também são removidos.
+        
+        Args:
+            retencao_dias: {tabela: dias} - padrão vem de TABELAS_PARTICIONADAS
+            
+        Returns:
+            Número de partições removidas
+        """
+        if not self.enabled:
+            return 0
+        
+        hoje = agora_brasilia().date()
+        removidas = 0
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return 0
+                cursor = conn.cursor()
+                
+                for tabela, config in TABELAS_PARTICIONADAS.items():
+                    dias = (retencao_dias or {}).get(tabela, config['retencao_dias'])
+                    limite = hoje - timedelta(days=dias)
+                    nome_limite = self._nome_particao(tabela, limite)
+                    
+                    cursor.execute("""
+                        SELECT filha.relname FROM pg_inherits i
+                        JOIN pg_class filha ON filha.oid = i.inhrelid
+                        JOIN pg_class pai ON pai.oid = i.inhparent
+                        WHERE pai.relname = %s
+                    """, (tabela,))
+                    
+                    for (particao,) in cursor.fetchall():
+                        # Nomes <tabela>_pAAAAMMDD ordenam como datas
+                        if not particao.startswith(f"{tabela}_p") or particao >= nome_limite:
+                            continue
+                        cursor.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+                            sql.Identifier(tabela), sql.Identifier(particao)
+                        ))
+                        cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(particao)))
+                        removidas += 1
+                    
+                    cursor.execute(
+                        sql.SQL("DELETE FROM {} WHERE {} < %s").format(
+                            sql.Identifier(f"{tabela}_default"), sql.Identifier(config['coluna'])
+                        ),
+                        (limite.isoformat(),)
+                    )
+                
+                limite_dossiers = hoje - timedelta(
+                    days=(retencao_dias or {}).get('daily_analyses', TABELAS_PARTICIONADAS['daily_analyses']['retencao_dias'])
+                )
+                cursor.execute("""
+                    DELETE FROM daily_dossiers d
+                    WHERE d.created_at < %s
+                    AND NOT EXISTS (SELECT 1 FROM daily_analyses a WHERE a.dossier_hash = d.content_hash)
+                """, (limite_dossiers.isoformat(),))
+                dossiers_removidos = cursor.rowcount
+                
+                conn.commit()
+                cursor.close()
+                
+                print(f"🧹 Retenção: {removidas} partições removidas ({dossiers_removidos} dossiers órfãos)")
+                return removidas
+        
+        except Exception as e:
+            print(f"❌ Erro ao remover partições expiradas: {e}")
+            return 0
+
     def close_pool(self):
         """Fecha o connection pool ao desligar a aplicação"""
         if self.pool:
             self.pool.closeall()
             print("✅ Connection pool fechado")
 
-    def salvar_analise(self, fixture_id: int, dados_jogo: dict, analises: dict, stats: dict):
+    def salvar_analise(self, fixture_id: int, dados_jogo: dict, analises: dict, stats: dict,
+                       analysis_summary: Optional[dict] = None, versao_modelo: Optional[str] = None):
         """
         Salva análise completa de um jogo no banco de dados.
 
         Args:
             fixture_id: ID único do jogo na API-Football
             dados_jogo: Dict com {data_jogo, liga, time_casa, time_fora}
-            analises: Dict com {gols, cantos, btts, resultado, cartoes, contexto}
+            analises: Dict com {gols, cantos, btts, resultado, cartoes, finalizacoes, handicaps, contexto}
             stats: Dict com {stats_casa, stats_fora, classificacao}
+            analysis_summary: Resumo do analysis_packet (script, posições...) para reconstruir sem o master_analyzer
+            versao_modelo: Versão do modelo que gerou a análise (config.VERSAO_MODELO_ANALISE)
         """
         if not self.enabled:
             return False
@@ -173,7 +613,7 @@ class DatabaseManager:
                 total_palpites = 0
                 confiancas = []
 
-                for mercado in ['gols', 'cantos', 'btts', 'resultado', 'cartoes']:
+                for mercado in ['gols', 'cantos', 'btts', 'resultado', 'cartoes', 'finalizacoes', 'handicaps']:
                     if mercado in analises and analises[mercado]:
                         palpites = analises[mercado].get('palpites', [])
                         total_palpites += len(palpites)
@@ -188,9 +628,10 @@ class DatabaseManager:
                     (fixture_id, data_jogo, liga, time_casa, time_fora, 
                      stats_casa, stats_fora, classificacao,
                      analise_gols, analise_cantos, analise_btts, analise_resultado, analise_cartoes, analise_contexto,
+                     analise_finalizacoes, analise_handicaps, analysis_summary, versao_modelo,
                      palpites_totais, confianca_media, data_analise, atualizado_em)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (fixture_id) 
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (fixture_id, data_jogo) 
                     DO UPDATE SET
                         stats_casa = EXCLUDED.stats_casa,
                         stats_fora = EXCLUDED.stats_fora,
@@ -201,6 +642,10 @@ class DatabaseManager:
                         analise_resultado = EXCLUDED.analise_resultado,
                         analise_cartoes = EXCLUDED.analise_cartoes,
                         analise_contexto = EXCLUDED.analise_contexto,
+                        analise_finalizacoes = EXCLUDED.analise_finalizacoes,
+                        analise_handicaps = EXCLUDED.analise_handicaps,
+                        analysis_summary = EXCLUDED.analysis_summary,
+                        versao_modelo = EXCLUDED.versao_modelo,
                         palpites_totais = EXCLUDED.palpites_totais,
                         confianca_media = EXCLUDED.confianca_media,
                         atualizado_em = EXCLUDED.atualizado_em
@@ -221,6 +666,10 @@ class DatabaseManager:
                     Json(analises.get('resultado', {})),
                     Json(analises.get('cartoes', {})),
                     Json(analises.get('contexto', {})),
+                    Json(analises.get('finalizacoes', {})),
+                    Json(analises.get('handicaps', {})),
+                    Json(analysis_summary or {}),
+                    versao_modelo,
                     total_palpites,
                     confianca_media,
                     agora_brasilia(),
@@ -237,13 +686,16 @@ class DatabaseManager:
             print(f"❌ Erro ao salvar análise no banco: {e}")
             return False
 
-    def buscar_analise(self, fixture_id: int, max_idade_horas: int = 12) -> Optional[Dict]:
+    def buscar_analise(self, fixture_id: int, max_idade_horas: int = 12,
+                       versao_modelo: Optional[str] = None, data_jogo: Optional[str] = None) -> Optional[Dict]:
         """
         Busca análise existente no banco de dados.
 
         Args:
             fixture_id: ID único do jogo
             max_idade_horas: Idade máxima da análise em horas (padrão: 12h)
+            versao_modelo: Se informado, ignora snapshots gerados por outra versão do modelo
+            data_jogo: Data do jogo (AAAA-MM-DD) - restringe a busca a uma única partição
 
         Returns:
             Dict com a análise completa ou None se não encontrar
@@ -266,8 +718,16 @@ class DatabaseManager:
                     WHERE fixture_id = %s 
                     AND atualizado_em >= %s
                 """
+                params = [fixture_id, limite_tempo]
+                if versao_modelo:
+                    query += " AND versao_modelo = %s"
+                    params.append(versao_modelo)
+                if data_jogo:
+                    query += " AND data_jogo = %s"
+                    params.append(data_jogo)
+                query += " ORDER BY atualizado_em DESC LIMIT 1"
 
-                cursor.execute(query, (fixture_id, limite_tempo))
+                cursor.execute(query, params)
                 resultado = cursor.fetchone()
 
                 cursor.close()
@@ -285,38 +745,60 @@ class DatabaseManager:
             print(f"❌ Erro ao buscar análise no banco: {e}")
             return None
 
-    def limpar_analises_antigas(self, dias: int = 7):
+    def buscar_analises_em_lote(self, fixture_ids: List[int], max_idade_horas: int = 12,
+                                versao_modelo: Optional[str] = None,
+                                datas_jogo: Optional[List[str]] = None) -> Dict[int, Dict]:
         """
-        Remove análises antigas do banco de dados.
+        Busca análises existentes de vários jogos em UMA única query.
 
         Args:
-            dias: Remover análises com mais de X dias (padrão: 7)
+            fixture_ids: IDs dos jogos
+            max_idade_horas: Idade máxima da análise em horas (padrão: 12h)
+            versao_modelo: Se informado, ignora snapshots gerados por outra versão do modelo
+            datas_jogo: Datas dos jogos (AAAA-MM-DD) - restringe a busca às partições desses dias
+
+        Returns:
+            Dict {fixture_id: análise completa} apenas com os jogos encontrados
         """
-        if not self.enabled:
-            return 0
+        if not self.enabled or not fixture_ids:
+            return {}
 
         try:
             with self._get_connection() as conn:
                 if not conn:
-                    return 0
+                    return {}
                     
-                cursor = conn.cursor()
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+                limite_tempo = agora_brasilia() - timedelta(hours=max_idade_horas)
 
-                limite_tempo = agora_brasilia() - timedelta(days=dias)
+                query = """
+                    SELECT * FROM analises_jogos 
+                    WHERE fixture_id = ANY(%s) 
+                    AND atualizado_em >= %s
+                """
+                params = [list(fixture_ids), limite_tempo]
+                if versao_modelo:
+                    query += " AND versao_modelo = %s"
+                    params.append(versao_modelo)
+                if datas_jogo:
+                    query += " AND data_jogo = ANY(%s::timestamptz[])"
+                    params.append(sorted(set(datas_jogo)))
+                # Mais recente por último: vence no dict abaixo se o jogo tiver sido remarcado
+                query += " ORDER BY atualizado_em"
 
-                query = "DELETE FROM analises_jogos WHERE data_jogo < %s"
-                cursor.execute(query, (limite_tempo,))
+                cursor.execute(query, params)
+                resultados = cursor.fetchall()
 
-                deletados = cursor.rowcount
-                conn.commit()
                 cursor.close()
 
-                print(f"🧹 Limpeza: {deletados} análises antigas removidas")
-                return deletados
+                analises = {r['fixture_id']: dict(r) for r in resultados}
+                print(f"🎯 CACHE (DB) EM LOTE: {len(analises)}/{len(fixture_ids)} análises encontradas")
+                return analises
 
         except Exception as e:
-            print(f"❌ Erro ao limpar análises antigas: {e}")
-            return 0
+            print(f"❌ Erro ao buscar análises em lote no banco: {e}")
+            return {}
 
     def obter_estatisticas_cache(self) -> Dict:
         """
@@ -360,6 +842,7 @@ class DatabaseManager:
     def forcar_reanalisar(self, fixture_id: int):
         """
         Remove análise específica do cache, forçando reanálise.
+        Síncrono (DELETE + invalidação do L2 + NOTIFY): em handlers async use `await db_manager.aio.forcar_reanalisar(id)`.
         """
         if not self.enabled:
             return False
@@ -377,7 +860,10 @@ class DatabaseManager:
                 cursor.close()
 
                 print(f"🔄 Análise do Fixture #{fixture_id} removida. Será reanalisado.")
-                return True
+            
+            # Mensagens já renderizadas desse jogo também saem do cache (em todos os processos)
+            cache_manager.invalidate_prefix(f"analise_jogo_{fixture_id}_")
+            return True
 
         except Exception as e:
             print(f"❌ Erro ao forçar reanálise: {e}")
@@ -393,41 +879,93 @@ class DatabaseManager:
             dossier_json: JSON completo da análise (dossier)
             user_id: ID do usuário que solicitou
         """
-        if not self.enabled:
-            return False
+        return self.save_daily_analyses_em_lote([{
+            "fixture_id": fixture_id,
+            "analysis_type": analysis_type,
+            "dossier_json": dossier_json,
+            "user_id": user_id
+        }]) > 0
+    
+    def save_daily_analyses_em_lote(self, analises: List[Dict]) -> int:
+        """
+        Salva várias análises do sistema de fila com um commit só.
+        
+        O dossier é gravado UMA vez em daily_dossiers (zlib, chave = hash do conteúdo) e cada
+        usuário recebe apenas uma linha de referência em daily_analyses. Assim o volume escala
+        com o número de jogos e não com jogos × usuários.
+        
+        Args:
+            analises: Lista de dicts {fixture_id, analysis_type, dossier_json, user_id, created_at}
+                      (sem chaves repetidas - o ON CONFLICT não pode tocar a mesma linha duas vezes)
+            
+        Returns:
+            Número de análises gravadas
+        """
+        if not self.enabled or not analises:
+            return 0
         
         try:
             with self._get_connection() as conn:
                 if not conn:
-                    return False
+                    return 0
                     
                 cursor = conn.cursor()
+                agora = agora_brasilia()
                 
-                query = """
+                dossiers = {}
+                referencias = []
+                for a in analises:
+                    content_hash = hash_dossier(a['dossier_json'])
+                    if content_hash not in dossiers:
+                        dossiers[content_hash] = (
+                            content_hash,
+                            a['fixture_id'],
+                            a['analysis_type'],
+                            psycopg2.Binary(comprimir_dossier(a['dossier_json'])),
+                            len(a['dossier_json']),
+                            agora
+                        )
+                    created_at = a.get('created_at') or agora
+                    referencias.append(
+                        (a['fixture_id'], a['analysis_type'], content_hash, a['user_id'], created_at, created_at.date())
+                    )
+                
+                # Dossier idêntico já gravado (outro usuário / outro job) não é reescrito
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO daily_dossiers
+                    (content_hash, fixture_id, analysis_type, dossier_zlib, tamanho_bytes, created_at)
+                    VALUES %s
+                    ON CONFLICT (content_hash) DO NOTHING
+                    """,
+                    list(dossiers.values()),
+                    page_size=100
+                )
+                
+                execute_values(
+                    cursor,
+                    """
                     INSERT INTO daily_analyses 
-                    (fixture_id, analysis_type, dossier_json, user_id, created_at)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON CONFLICT (fixture_id, analysis_type, user_id)
+                    (fixture_id, analysis_type, dossier_hash, user_id, created_at, data_ref)
+                    VALUES %s
+                    ON CONFLICT (fixture_id, analysis_type, user_id, data_ref)
                     DO UPDATE SET
-                        dossier_json = EXCLUDED.dossier_json,
+                        dossier_hash = EXCLUDED.dossier_hash,
+                        dossier_json = NULL,
                         created_at = EXCLUDED.created_at
-                """
-                
-                cursor.execute(query, (
-                    fixture_id,
-                    analysis_type,
-                    dossier_json,
-                    user_id,
-                    agora_brasilia()
-                ))
+                    """,
+                    referencias,
+                    page_size=500
+                )
                 
                 conn.commit()
                 cursor.close()
-                return True
+                return len(referencias)
             
         except Exception as e:
-            print(f"❌ Erro ao salvar daily analysis: {e}")
-            return False
+            print(f"❌ Erro ao salvar daily analyses em lote: {e}")
+            return 0
     
     def get_daily_analyses(self, user_id: int, analysis_type: str, offset: int = 0, limit: int = 5) -> List[Dict]:
         """
@@ -453,11 +991,12 @@ class DatabaseManager:
                 cursor = conn.cursor(cursor_factory=RealDictCursor)
                 
                 query = """
-                    SELECT id, fixture_id, analysis_type, dossier_json, created_at
-                    FROM daily_analyses
-                    WHERE user_id = %s AND analysis_type = %s
-                    AND created_at >= CURRENT_DATE
-                    ORDER BY created_at DESC
+                    SELECT a.id, a.fixture_id, a.analysis_type, a.dossier_json, d.dossier_zlib, a.created_at
+                    FROM daily_analyses a
+                    LEFT JOIN daily_dossiers d ON d.content_hash = a.dossier_hash
+                    WHERE a.user_id = %s AND a.analysis_type = %s
+                    AND a.data_ref = CURRENT_DATE
+                    ORDER BY a.created_at DESC
                     LIMIT %s OFFSET %s
                 """
                 
@@ -466,12 +1005,107 @@ class DatabaseManager:
                 
                 cursor.close()
                 
-                return [dict(r) for r in resultados]
+                return [self._linha_daily_analysis(r) for r in resultados]
             
         except Exception as e:
             print(f"❌ Erro ao buscar daily analyses: {e}")
             return []
     
+    def get_daily_analyses_keyset(self, user_id: int, analysis_type: str, cursor: Optional[tuple] = None,
+                                  direcao: str = 'next', limit: int = 5) -> Dict:
+        """
+        Paginação por keyset (sem OFFSET): uma única query retorna a página e o total do dia.
+        
+        Args:
+            user_id: ID do usuário
+            analysis_type: Tipo de análise
+            cursor: (created_at, id) da borda da página atual; None = primeira página
+            direcao: 'next' (análises mais antigas que o cursor) ou 'prev' (mais novas)
+            limit: Limite de resultados
+            
+        Returns:
+            Dict com 'analyses' (sempre em ordem created_at DESC), 'total' e 'has_beyond'
+            (se existem mais linhas além da página na direção pedida)
+        """
+        if not self.enabled:
+            return {'analyses': [], 'total': 0, 'has_beyond': False}
+        
+        if cursor is None:
+            condicao_keyset = ""
+            ordem = "DESC"
+            params_keyset = ()
+        elif direcao == 'prev':
+            condicao_keyset = "AND (a.created_at, a.id) > (%s, %s)"
+            ordem = "ASC"
+            params_keyset = (cursor[0], cursor[1])
+        else:
+            condicao_keyset = "AND (a.created_at, a.id) < (%s, %s)"
+            ordem = "DESC"
+            params_keyset = (cursor[0], cursor[1])
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return {'analyses': [], 'total': 0, 'has_beyond': False}
+                    
+                cur = conn.cursor(cursor_factory=RealDictCursor)
+                
+                # Total via subquery escalar no mesmo índice (index-only scan) - sem 2ª ida ao banco
+                query = f"""
+                    SELECT a.id, a.fixture_id, a.analysis_type, a.dossier_json, d.dossier_zlib, a.created_at,
+                           (SELECT COUNT(*) FROM daily_analyses t
+                            WHERE t.user_id = %s AND t.analysis_type = %s
+                            AND t.data_ref = CURRENT_DATE) AS total
+                    FROM daily_analyses a
+                    LEFT JOIN daily_dossiers d ON d.content_hash = a.dossier_hash
+                    WHERE a.user_id = %s AND a.analysis_type = %s
+                    AND a.data_ref = CURRENT_DATE
+                    {condicao_keyset}
+                    ORDER BY a.created_at {ordem}, a.id {ordem}
+                    LIMIT %s
+                """
+                
+                cur.execute(query, (user_id, analysis_type, user_id, analysis_type) + params_keyset + (limit + 1,))
+                resultados = cur.fetchall()
+                
+                total = resultados[0]['total'] if resultados else None
+                if total is None:
+                    # Página vazia (ex: cursor além do fim): total ainda é necessário para o rodapé
+                    cur.execute(
+                        """
+                        SELECT COUNT(*) AS total FROM daily_analyses
+                        WHERE user_id = %s AND analysis_type = %s AND data_ref = CURRENT_DATE
+                        """,
+                        (user_id, analysis_type)
+                    )
+                    total = cur.fetchone()['total']
+                
+                cur.close()
+                
+                has_beyond = len(resultados) > limit
+                linhas = [self._linha_daily_analysis(r) for r in resultados[:limit]]
+                for linha in linhas:
+                    linha.pop('total', None)
+                if ordem == "ASC":
+                    linhas.reverse()
+                
+                return {'analyses': linhas, 'total': total, 'has_beyond': has_beyond}
+            
+        except Exception as e:
+            print(f"❌ Erro ao buscar daily analyses (keyset): {e}")
+            return {'analyses': [], 'total': 0, 'has_beyond': False}
+    
+    @staticmethod
+    def _linha_daily_analysis(linha) -> Dict:
+        """Monta a linha no formato antigo (com dossier_json) a partir do dossier compartilhado"""
+        analise = dict(linha)
+        dossier_zlib = analise.pop('dossier_zlib', None)
+        if dossier_zlib is not None:
+            analise['dossier_json'] = descomprimir_dossier(dossier_zlib)
+        elif analise.get('dossier_json') is None:
+            analise['dossier_json'] = '{}'
+        return analise
+    
     def count_daily_analyses(self, user_id: int, analysis_type: str) -> int:
         """
         Conta total de análises disponíveis para paginação.
@@ -493,11 +1127,12 @@ class DatabaseManager:
                     
                 cursor = conn.cursor()
                 
+                # Só a tabela de referências: o dossier (pesado) não entra na contagem
                 query = """
                     SELECT COUNT(*) as total
                     FROM daily_analyses
                     WHERE user_id = %s AND analysis_type = %s
-                    AND created_at >= CURRENT_DATE
+                    AND data_ref = CURRENT_DATE
                 """
                 
                 cursor.execute(query, (user_id, analysis_type))
@@ -510,3 +1145,352 @@ class DatabaseManager:
         except Exception as e:
             print(f"❌ Erro ao contar daily analyses: {e}")
             return 0
+
+    # ========================================
+    # CACHE L2 (cache_entries)
+    # ========================================
+
+    @staticmethod
+    def _linhas_para_entradas_cache(resultados) -> Dict[str, Dict]:
+        """Converte linhas (key, value, expires_at, created_at, gen) para o formato de entrada do cache_manager"""
+        return {
+            key: {
+                "value": value,
+                "expires_at": expires_at.astimezone(BRASILIA_TZ).isoformat(),
+                "created_at": created_at.astimezone(BRASILIA_TZ).isoformat() if created_at else None,
+                "gen": gen
+            }
+            for key, value, expires_at, created_at, gen in resultados
+        }
+
+    def cache_l2_buscar(self, keys: List[str]) -> Dict[str, Dict]:
+        """
+        Busca em lote entradas válidas do cache L2.
+        
+        Args:
+            keys: Lista de chaves do cache
+            
+        Returns:
+            Dict {key: {value, expires_at, created_at, gen}} apenas com as chaves encontradas
+        """
+        if not self.enabled or not keys:
+            return {}
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return {}
+                    
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    "SELECT key, value, expires_at, created_at, gen FROM cache_entries "
+                    "WHERE key = ANY(%s) AND expires_at > NOW()",
+                    (list(keys),)
+                )
+                resultados = cursor.fetchall()
+                
+                cursor.close()
+                
+                return self._linhas_para_entradas_cache(resultados)
+            
+        except Exception as e:
+            print(f"❌ Erro ao buscar cache L2: {e}")
+            return {}
+    
+    def cache_l2_carregar_validos(self) -> Dict[str, Dict]:
+        """
+        Carrega todas as entradas ainda válidas do cache L2 (warm start de uma nova instância).
+        
+        Returns:
+            Dict {key: {value, expires_at, created_at, gen}}
+        """
+        if not self.enabled:
+            return {}
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return {}
+                    
+                cursor = conn.cursor()
+                
+                cursor.execute(
+                    "SELECT key, value, expires_at, created_at, gen FROM cache_entries WHERE expires_at > NOW()"
+                )
+                resultados = cursor.fetchall()
+                
+                cursor.close()
+                
+                return self._linhas_para_entradas_cache(resultados)
+            
+        except Exception as e:
+            print(f"❌ Erro ao carregar cache L2: {e}")
+            return {}
+    
+    def cache_l2_salvar_lote(self, entries: Dict[str, Dict]) -> int:
+        """
+        Grava em lote (upsert) entradas no cache L2 com um único round-trip.
+        
+        Args:
+            entries: Dict {key: {value, expires_at, created_at, gen}} no formato do cache_manager
+            
+        Returns:
+            Número de entradas gravadas
+        """
+        if not self.enabled or not entries:
+            return 0
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return 0
+                    
+                cursor = conn.cursor()
+                
+                rows = [
+                    (
+                        key, Json(data.get("value")), data.get("expires_at"),
+                        data.get("created_at") or agora_brasilia(),
+                        Json(data["gen"]) if data.get("gen") else None
+                    )
+                    for key, data in entries.items()
+                ]
+                
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO cache_entries (key, value, expires_at, created_at, gen)
+                    VALUES %s
+                    ON CONFLICT (key)
+                    DO UPDATE SET
+                        value = EXCLUDED.value,
+                        expires_at = EXCLUDED.expires_at,
+                        created_at = EXCLUDED.created_at,
+                        gen = EXCLUDED.gen
+                    """,
+                    rows,
+                    page_size=500
+                )
+                
+                conn.commit()
+                cursor.close()
+                
+                return len(rows)
+            
+        except Exception as e:
+            print(f"❌ Erro ao salvar cache L2: {e}")
+            return 0
+    
+    def cache_l2_limpar(self, prefixo: Optional[str] = None) -> int:
+        """
+        Remove entradas do cache L2 (todas ou apenas as de um prefixo).
+        
+        Args:
+            prefixo: Prefixo da chave (ex: 'odds_'). None remove tudo.
+            
+        Returns:
+            Número de entradas removidas
+        """
+        if not self.enabled:
+            return 0
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return 0
+                    
+                cursor = conn.cursor()
+                
+                if prefixo:
+                    prefixo_like = prefixo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                    cursor.execute("DELETE FROM cache_entries WHERE key LIKE %s", (prefixo_like + '%',))
+                else:
+                    cursor.execute("DELETE FROM cache_entries")
+                
+                removidos = cursor.rowcount
+                conn.commit()
+                cursor.close()
+                
+                return removidos
+            
+        except Exception as e:
+            print(f"❌ Erro ao limpar cache L2: {e}")
+            return 0
+    
+    def cache_l2_remover_chaves(self, keys: List[str]) -> int:
+        """
+        Remove chaves específicas do cache L2.
+        
+        Args:
+            keys: Lista de chaves a remover
+            
+        Returns:
+            Número de entradas removidas
+        """
+        if not self.enabled or not keys:
+            return 0
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return 0
+                    
+                cursor = conn.cursor()
+                
+                cursor.execute("DELETE FROM cache_entries WHERE key = ANY(%s)", (list(keys),))
+                
+                removidos = cursor.rowcount
+                conn.commit()
+                cursor.close()
+                
+                return removidos
+            
+        except Exception as e:
+            print(f"❌ Erro ao remover chaves do cache L2: {e}")
+            return 0
+    
+    def cache_l2_remover_expirados(self) -> int:
+        """
+        Remove entradas expiradas do cache L2.
+        
+        Returns:
+            Número de entradas removidas
+        """
+        if not self.enabled:
+            return 0
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return 0
+                    
+                cursor = conn.cursor()
+                
+                cursor.execute("DELETE FROM cache_entries WHERE expires_at <= NOW()")
+                
+                removidos = cursor.rowcount
+                conn.commit()
+                cursor.close()
+                
+                return removidos
+            
+        except Exception as e:
+            print(f"❌ Erro ao remover expirados do cache L2: {e}")
+            return 0
+
+    # ========================================
+    # BARRAMENTO DE INVALIDAÇÃO (LISTEN/NOTIFY)
+    # ========================================
+
+    def publicar_invalidacao_cache(self, canal: str, payload: str) -> bool:
+        """
+        Publica uma mensagem de invalidação de cache via NOTIFY para todos os processos.
+        
+        Args:
+            canal: Canal do LISTEN/NOTIFY
+            payload: Mensagem (JSON) com a invalidação
+        """
+        if not self.enabled:
+            return False
+        
+        try:
+            with self._get_connection() as conn:
+                if not conn:
+                    return False
+                    
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT pg_notify(%s, %s)", (canal, payload))
+                
+                conn.commit()
+                cursor.close()
+                return True
+            
+        except Exception as e:
+            print(f"❌ Erro ao publicar invalidação de cache: {e}")
+            return False
+    
+    def abrir_conexao_listen(self, canal: str):
+        """
+        Abre uma conexão DEDICADA (fora do pool) em autocommit, já escutando o canal.
+        A conexão fica presa ao listener enquanto ele viver, por isso não sai do pool.
+        
+        Args:
+            canal: Canal do LISTEN/NOTIFY
+            
+        Returns:
+            Conexão psycopg2 ou None se o banco não estiver disponível
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            conn = psycopg2.connect(self.database_url)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            
+            cursor = conn.cursor()
+            cursor.execute(f"LISTEN {canal}")
+            cursor.close()
+            
+            print(f"👂 LISTEN ativo no canal '{canal}'")
+            return conn
+            
+        except Exception as e:
+            print(f"❌ Erro ao abrir conexão LISTEN: {e}")
+            return None
+
+
+class AsyncDatabaseManager:
+    """
+    Interface assíncrona do DatabaseManager para os handlers do bot.
+    
+    Cada método público do DatabaseManager está disponível aqui como corrotina
+    (ex: `await db_manager.aio.buscar_analise(fixture_id)`), executado em thread
+    separada com o pool thread-safe. Assim uma query lenta não trava as demais updates.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self._db = db_manager
+
+    @property
+    def enabled(self) -> bool:
+        return self._db.enabled
+
+    def obter_metricas_pool(self) -> Dict:
+        """Métricas são lidas da memória, sem I/O"""
+        return self._db.obter_metricas_pool()
+
+    async def manutencao_particoes_periodica(self, intervalo_horas: float = 6):
+        """
+        Tarefa em background: cria as partições dos próximos dias e remove as expiradas.
+        Roda em thread para não bloquear o event loop.
+        """
+        print(f"🗂️ Manutenção de partições iniciada: a cada {intervalo_horas}h")
+        
+        while True:
+            try:
+                # Primeira rodada logo após o startup (que não roda DDL), depois a cada intervalo
+                await asyncio.to_thread(self._db.garantir_particoes)
+                await asyncio.to_thread(self._db.remover_particoes_expiradas)
+                await asyncio.sleep(intervalo_horas * 3600)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Erro na manutenção de partições: {e}")
+                await asyncio.sleep(intervalo_horas * 3600)
+
+    def __getattr__(self, nome):
+        if nome.startswith('_'):
+            raise AttributeError(nome)
+        
+        metodo = getattr(self._db, nome)
+        if not callable(metodo):
+            return metodo
+        
+        async def executar_em_thread(*args, **kwargs):
+            return await asyncio.to_thread(metodo, *args, **kwargs)
+        
+        executar_em_thread.__name__ = nome
+        executar_em_thread.__doc__ = metodo.__doc__
+        return executar_em_thread
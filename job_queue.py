@@ -6,7 +6,7 @@ import json
 
 from api_client import buscar_jogos_do_dia
 from analysts.master_analyzer import generate_match_analysis
-from db_manager import DatabaseManager
+from db_manager import DatabaseManager, agora_brasilia
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +15,100 @@ analysis_queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
 
 job_status = {}
 
+# Escrita em lote de daily_analyses: flush por tamanho OU por tempo (e sempre no fim do job / shutdown)
+DAILY_WRITER_BATCH_SIZE = 50
+DAILY_WRITER_MAX_WAIT_SECONDS = 2.0
+
+class DailyAnalysisWriter:
+    """
+    Buffer de dossiers para daily_analyses.
+    Em vez de 1 conexão + INSERT + commit por jogo, acumula e grava tudo com um único execute_values.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, batch_size: int = DAILY_WRITER_BATCH_SIZE,
+                 max_wait_seconds: float = DAILY_WRITER_MAX_WAIT_SECONDS):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._buffer = {}  # {(fixture_id, analysis_type, user_id): linha} - a última versão vence
+        self._first_added_at = None
+        self._lock = asyncio.Lock()
+
+    async def add(self, fixture_id: int, analysis_type: str, dossier_json: str, user_id: int):
+        """Adiciona um dossier ao buffer e grava o lote se atingir o tamanho máximo"""
+        async with self._lock:
+            self._buffer[(fixture_id, analysis_type, user_id)] = {
+                "fixture_id": fixture_id,
+                "analysis_type": analysis_type,
+                "dossier_json": dossier_json,
+                "user_id": user_id,
+                "created_at": agora_brasilia()
+            }
+            if self._first_added_at is None:
+                self._first_added_at = asyncio.get_running_loop().time()
+            
+            if len(self._buffer) >= self.batch_size:
+                await self._flush_locked()
+
+    async def flush(self) -> int:
+        """Grava imediatamente tudo o que está no buffer"""
+        async with self._lock:
+            return await self._flush_locked()
+
+    async def _flush_locked(self) -> int:
+        if not self._buffer:
+            return 0
+        
+        linhas = self._buffer
+        self._buffer = {}
+        self._first_added_at = None
+        
+        gravadas = await self.db_manager.aio.save_daily_analyses_em_lote(list(linhas.values()))
+        if gravadas == 0 and self.db_manager.enabled:
+            # Falha no banco: devolver ao buffer (sem sobrescrever versões mais novas) para a próxima tentativa
+            for chave, linha in linhas.items():
+                self._buffer.setdefault(chave, linha)
+            self._first_added_at = asyncio.get_running_loop().time()
+            logger.error(f"❌ Falha ao gravar lote de {len(linhas)} daily analyses (re-agendado)")
+            return 0
+        
+        logger.info(f"💾 Lote de {gravadas} daily analyses gravado")
+        return gravadas
+
+    async def run_periodic_flush(self):
+        """Tarefa em background: grava o buffer quando o item mais antigo passa de max_wait_seconds"""
+        while True:
+            try:
+                await asyncio.sleep(self.max_wait_seconds / 2)
+                if self._first_added_at is not None:
+                    idade = asyncio.get_running_loop().time() - self._first_added_at
+                    if idade >= self.max_wait_seconds:
+                        # shield: cancelar a tarefa no shutdown não interrompe um lote já retirado do buffer
+                        await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erro no flush periódico de daily analyses: {e}")
+
+_daily_writer: Optional[DailyAnalysisWriter] = None
+_flush_task: Optional[asyncio.Task] = None  # Referência forte: o event loop só guarda referência fraca
+
+async def flush_daily_writer():
+    """
+    Grava o que estiver pendente no buffer de daily_analyses (usado no shutdown).
+    Cancela antes o flush periódico, para não concorrer com um lote ainda em andamento.
+    """
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        try:
+            await _flush_task
+        except asyncio.CancelledError:
+            pass
+        _flush_task = None
+    if _daily_writer is not None:
+        await _daily_writer.flush()
+
 class AnalysisJob:
     def __init__(self, user_id: int, analysis_type: str, league_id: Optional[int] = None, fixture_id: Optional[int] = None):
         self.user_id = user_id
@@ -108,8 +202,12 @@ def cleanup_old_jobs(max_age_hours: int = 24):
     return len(jobs_to_remove)
 
 async def background_analysis_worker(db_manager: DatabaseManager):
+    global _daily_writer, _flush_task
     logger.info("🚀 Background analysis worker iniciado!")
     
+    _daily_writer = DailyAnalysisWriter(db_manager)
+    _flush_task = asyncio.create_task(_daily_writer.run_periodic_flush())
+    
     while True:
         try:
             job = await analysis_queue.get()
@@ -141,8 +239,7 @@ async def background_analysis_worker(db_manager: DatabaseManager):
                     
                     dossier_json = json.dumps(analysis_packet, ensure_ascii=False)
                     
-                    await asyncio.to_thread(
-                        db_manager.save_daily_analysis,
+                    await _daily_writer.add(
                         fixture_id=fixture_id,
                         analysis_type=job.analysis_type,
                         dossier_json=dossier_json,
@@ -158,6 +255,9 @@ async def background_analysis_worker(db_manager: DatabaseManager):
                 
                 await asyncio.sleep(0.1)
             
+            # Tudo do job gravado antes de marcá-lo como concluído
+            await _daily_writer.flush()
+            
             job.status = "completed"
             job.completed_at = datetime.now()
             logger.info(f"🎉 Job {job.job_id} concluído! {job.processed} jogos analisados")
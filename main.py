@@ -12,11 +12,12 @@ from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQuer
 
 import cache_manager
 from db_manager import DatabaseManager
-from config import JOGOS_POR_PAGINA
+from config import JOGOS_POR_PAGINA, VERSAO_MODELO_ANALISE
 from api_client import (buscar_jogos_do_dia, buscar_estatisticas_gerais_time, buscar_classificacao_liga, 
                         buscar_odds_do_jogo, buscar_ligas_disponiveis_hoje, buscar_jogos_por_liga, NOMES_LIGAS_PT,
-                        buscar_ultimos_jogos_time, buscar_todas_ligas_suportadas, ORDEM_PAISES)
-from analysts.master_analyzer import generate_match_analysis
+                        buscar_ultimos_jogos_time, buscar_todas_ligas_suportadas, ORDEM_PAISES,
+                        importar_historico_do_cache)
+from analysts.master_analyzer import generate_match_analysis, preparar_scores_do_slate
 from analysts.goals_analyzer_v2 import analisar_mercado_gols
 from analysts.match_result_analyzer_v2 import analisar_mercado_resultado_final
 from analysts.corners_analyzer import analisar_mercado_cantos
@@ -28,7 +29,11 @@ from analysts.handicaps_analyzer import analisar_mercado_handicaps
 # PURE ANALYST PROTOCOL: value_detector removido - análise independente de odds
 from analysts.justification_generator import generate_persuasive_justification
 import job_queue
+import picks_index
 import pagination_helpers
+import team_features
+import match_history
+from standings_index import indexar_classificacao
 
 load_dotenv()
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
@@ -39,11 +44,12 @@ LIGAS_POR_PAGINA = 10
 # Dicionário global para armazenar análises processadas em background
 analises_em_background = {}
 
-# Inicializar gerenciador de banco de dados
+# Inicializar gerenciador de banco de dados (o schema é verificado em main(), não no import)
 db_manager = DatabaseManager()
 
-# Inicializar schema do banco de dados (criar tabelas se não existirem)
-db_manager.initialize_database()
+# Índice em memória com os palpites do dia (Aposta Simples, Múltipla e Bingo leem daqui)
+indice_palpites = picks_index.PicksIndex()
+_indice_palpites_lock = asyncio.Lock()
 
 # Rate Limiting - Previne abuso de comandos
 user_command_timestamps = {}
@@ -172,19 +178,21 @@ def validate_suggestions(main_suggestion, alternative_suggestions):
     
     return validated
 
+def posicoes_na_classificacao(classificacao, jogo):
+    """Posições de casa e fora na ClassificacaoIndexada (por id, nome como reserva; "N/A" fora dela)"""
+    if not classificacao:
+        return "N/A", "N/A"
+    home, away = jogo['teams']['home'], jogo['teams']['away']
+    return classificacao.posicao(home['id'], home['name']), classificacao.posicao(away['id'], away['name'])
+
 def analisar_contexto_jogo(classificacao, time_casa_nome, time_fora_nome, rodada_atual):
+    classificacao = indexar_classificacao(classificacao)
     if not classificacao or rodada_atual == 0:
         return ""
 
-    time_casa_info = None
-    time_fora_info = None
-    total_times = len(classificacao)
-
-    for time_info in classificacao:
-        if time_info['team']['name'] == time_casa_nome:
-            time_casa_info = time_info
-        if time_info['team']['name'] == time_fora_nome:
-            time_fora_info = time_info
+    time_casa_info = classificacao.linha(team_name=time_casa_nome)
+    time_fora_info = classificacao.linha(team_name=time_fora_nome)
+    total_times = classificacao.total_times
 
     if not time_casa_info or not time_fora_info:
         return ""
@@ -397,14 +405,7 @@ async def gerar_analise_completa_todos_mercados(jogo):
     classificacao = await buscar_classificacao_liga(id_liga)
     
     # Extrair posições da classificação
-    pos_casa = "N/A"
-    pos_fora = "N/A"
-    if classificacao:
-        for time_info in classificacao:
-            if time_info['team']['name'] == jogo['teams']['home']['name']:
-                pos_casa = time_info['rank']
-            if time_info['team']['name'] == jogo['teams']['away']['name']:
-                pos_fora = time_info['rank']
+    pos_casa, pos_fora = posicoes_na_classificacao(classificacao, jogo)
     
     # Adicionar posições e classificação ao analysis_packet
     analysis_packet['home_position'] = pos_casa
@@ -429,7 +430,7 @@ async def gerar_analise_completa_todos_mercados(jogo):
     analise_cantos = analisar_mercado_cantos(analysis_packet, odds)
     print("--- ✅ CORNERS ANALYZER DONE ---")
     
-    analise_btts = analisar_mercado_btts(stats_casa, stats_fora, odds, script)
+    analise_btts = analisar_mercado_btts(stats_casa, stats_fora, odds, script, analysis_packet)
     print("--- ✅ BTTS ANALYZER DONE ---")
     
     analise_cartoes = analisar_mercado_cartoes(analysis_packet, odds)
@@ -438,7 +439,7 @@ async def gerar_analise_completa_todos_mercados(jogo):
     analise_finalizacoes = analisar_mercado_finalizacoes(stats_casa, stats_fora, odds, analysis_packet, script)
     print("--- ✅ SHOTS ANALYZER DONE ---")
     
-    analise_handicaps = analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao, pos_casa, pos_fora, script)
+    analise_handicaps = analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao, pos_casa, pos_fora, script, analysis_packet)
     print("--- ✅ HANDICAPS ANALYZER DONE ---")
     
     # 4️⃣ EXTRAIR INFORMAÇÕES DO MASTER PACKET
@@ -593,6 +594,83 @@ def detectar_diferenca_tecnica(jogo, classificacao, pos_casa, pos_fora):
     return alerta
 
 
+# Mercados persistidos no snapshot de analises_jogos (coluna analise_<mercado>), na ordem dos analyzers
+MERCADOS_SNAPSHOT = ['gols', 'cantos', 'btts', 'resultado', 'cartoes', 'finalizacoes', 'handicaps']
+
+def classificar_analises_por_mercado(analises_brutas):
+    """Mapeia os resultados dos analyzers para as chaves de MERCADOS_SNAPSHOT"""
+    analises_dict = {}
+    for a in analises_brutas:
+        if a:
+            mercado_lower = a['mercado'].lower()
+            if 'gol' in mercado_lower and 'btts' not in mercado_lower:
+                analises_dict['gols'] = a
+            elif 'canto' in mercado_lower or 'escanteio' in mercado_lower:
+                analises_dict['cantos'] = a
+            elif 'btts' in mercado_lower or 'ambas' in mercado_lower:
+                analises_dict['btts'] = a
+            elif 'resultado' in mercado_lower:
+                analises_dict['resultado'] = a
+            elif 'cart' in mercado_lower:
+                analises_dict['cartoes'] = a
+            elif 'finaliza' in mercado_lower or 'shot' in mercado_lower:
+                analises_dict['finalizacoes'] = a
+            elif 'handicap' in mercado_lower:
+                analises_dict['handicaps'] = a
+    return analises_dict
+
+def data_jogo_do_fixture(jogo):
+    """Data (AAAA-MM-DD) usada como data_jogo em analises_jogos - também a chave da partição"""
+    return jogo['fixture']['date'].split('T')[0]
+
+def analises_do_snapshot(analise_db):
+    """Reconstrói a lista de resultados dos analyzers a partir de uma linha de analises_jogos"""
+    return [analise_db[f'analise_{m}'] for m in MERCADOS_SNAPSHOT if analise_db.get(f'analise_{m}')]
+
+def resumo_do_snapshot(analise_db, classificacao, jogo):
+    """
+    Script tático e posições gravados no analysis_summary do snapshot (sem rodar o master_analyzer).
+    Snapshots sem resumo (master_analyzer com erro) caem no script padrão e nas posições da classificação.
+    """
+    resumo = analise_db.get('analysis_summary') or {}
+    pos_casa, pos_fora = posicoes_na_classificacao(classificacao, jogo)
+    return (resumo.get('selected_script') or 'EQUILIBRADO',
+            resumo.get('home_position') or pos_casa,
+            resumo.get('away_position') or pos_fora)
+
+async def salvar_snapshot_analise(jogo, analises_brutas, stats_casa, stats_fora, classificacao, analysis_packet):
+    """
+    Persiste o snapshot completo (todos os mercados + resumo do master_analyzer + versão do modelo).
+    Um hit no banco depois disso reconstrói a resposta sem API e sem recalcular nada.
+    """
+    data_jogo_str = data_jogo_do_fixture(jogo)
+    liga_info = NOMES_LIGAS_PT.get(jogo['league']['id'])
+    nome_liga = liga_info[0] if liga_info else jogo['league']['name']
+
+    dados_jogo = {
+        'data_jogo': data_jogo_str,
+        'liga': nome_liga,
+        'time_casa': jogo['teams']['home']['name'],
+        'time_fora': jogo['teams']['away']['name']
+    }
+
+    stats_dict = {
+        'stats_casa': stats_casa,
+        'stats_fora': stats_fora,
+        'classificacao': classificacao
+    }
+
+    analysis_summary = {}
+    if analysis_packet and 'error' not in analysis_packet:
+        analysis_summary = dict(analysis_packet.get('analysis_summary', {}))
+        analysis_summary['home_position'] = analysis_packet.get('home_position')
+        analysis_summary['away_position'] = analysis_packet.get('away_position')
+
+    await db_manager.aio.salvar_analise(
+        jogo['fixture']['id'], dados_jogo, classificar_analises_por_mercado(analises_brutas), stats_dict,
+        analysis_summary=analysis_summary, versao_modelo=VERSAO_MODELO_ANALISE
+    )
+
 async def gerar_palpite_completo(jogo, filtro_mercado=None, filtro_tipo_linha=None):
     id_jogo = jogo['fixture']['id']
     id_liga = jogo['league']['id']
@@ -600,53 +678,33 @@ async def gerar_palpite_completo(jogo, filtro_mercado=None, filtro_tipo_linha=No
 
     # Cache de análise completa do jogo (economiza MUITO processamento!)
     cache_key = f"analise_jogo_{id_jogo}_{filtro_mercado}_{filtro_tipo_linha}"
-    cached_analise = cache_manager.get(cache_key)
+    cached_analise = await cache_manager.aget(cache_key)
     if cached_analise:
         return cached_analise
 
     # 🎯 VERIFICAR BANCO DE DADOS PRIMEIRO (análise completa sem filtros)
     if not filtro_mercado and not filtro_tipo_linha:
-        analise_db = db_manager.buscar_analise(id_jogo, max_idade_horas=12)
+        analise_db = await db_manager.aio.buscar_analise(
+            id_jogo, max_idade_horas=12, versao_modelo=VERSAO_MODELO_ANALISE,
+            data_jogo=data_jogo_do_fixture(jogo)
+        )
         if analise_db:
             usar_cache_otimizado = True
             print(f"💾 CACHE OTIMIZADO: Usando análise salva do Fixture #{id_jogo}")
 
-            # Reconstruir listas de análises a partir do banco
-            analises_brutas = []
-            if analise_db.get('analise_gols'):
-                analises_brutas.append(analise_db['analise_gols'])
-            if analise_db.get('analise_cantos'):
-                analises_brutas.append(analise_db['analise_cantos'])
-            if analise_db.get('analise_btts'):
-                analises_brutas.append(analise_db['analise_btts'])
-            if analise_db.get('analise_resultado'):
-                analises_brutas.append(analise_db['analise_resultado'])
-            if analise_db.get('analise_cartoes'):
-                analises_brutas.append(analise_db['analise_cartoes'])
-            if analise_db.get('analise_finalizacoes'):
-                analises_brutas.append(analise_db['analise_finalizacoes'])
-            if analise_db.get('analise_handicaps'):
-                analises_brutas.append(analise_db['analise_handicaps'])
-
-            analises_encontradas = [a for a in analises_brutas if a]
+            # Reconstruir listas de análises a partir do snapshot (sem master_analyzer)
+            analises_encontradas = analises_do_snapshot(analise_db)
             stats_casa = analise_db['stats_casa']
             stats_fora = analise_db['stats_fora']
-            classificacao = analise_db['classificacao']
-
-            # Extrair posições da classificação
-            pos_casa = "N/A"
-            pos_fora = "N/A"
-            if classificacao:
-                for time_info in classificacao:
-                    if time_info['team']['name'] == jogo['teams']['home']['name']:
-                        pos_casa = time_info['rank']
-                    if time_info['team']['name'] == jogo['teams']['away']['name']:
-                        pos_fora = time_info['rank']
+            classificacao = indexar_classificacao(analise_db['classificacao'])
+
+            # Script e posições do resumo do master_analyzer salvo junto com o snapshot
+            script, pos_casa, pos_fora = resumo_do_snapshot(analise_db, classificacao, jogo)
 
             # Pular direto para a geração da mensagem
             if analises_encontradas:
                 total_palpites = sum(len(a.get('palpites', [])) for a in analises_encontradas)
-                print(f"  ✅ DB CACHE: {len(analises_encontradas)} mercados com {total_palpites} palpites recuperados")
+                print(f"  ✅ DB CACHE: {len(analises_encontradas)} mercados com {total_palpites} palpites recuperados (script {script})")
         else:
             analise_db = None
     else:
@@ -668,15 +726,7 @@ async def gerar_palpite_completo(jogo, filtro_mercado=None, filtro_tipo_linha=No
             return None
 
         classificacao = await buscar_classificacao_liga(id_liga)
-        pos_casa = "N/A"
-        pos_fora = "N/A"
-
-        if classificacao:
-            for time_info in classificacao:
-                if time_info['team']['name'] == jogo['teams']['home']['name']:
-                    pos_casa = time_info['rank']
-                if time_info['team']['name'] == jogo['teams']['away']['name']:
-                    pos_fora = time_info['rank']
+        pos_casa, pos_fora = posicoes_na_classificacao(classificacao, jogo)
 
         # PURE ANALYST PROTOCOL: Análise independente de valor de mercado
         print(f"  🧠 PURE ANALYST MODE: Análise baseada em probabilidades estatísticas")
@@ -699,11 +749,11 @@ async def gerar_palpite_completo(jogo, filtro_mercado=None, filtro_tipo_linha=No
         analises_brutas = [
             analisar_mercado_gols(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None,
             analisar_mercado_cantos(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None,
-            analisar_mercado_btts(stats_casa, stats_fora, odds, script),
+            analisar_mercado_btts(stats_casa, stats_fora, odds, script, analysis_packet),
             analisar_mercado_resultado_final(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None,
             analisar_mercado_cartoes(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None,
             analisar_mercado_finalizacoes(stats_casa, stats_fora, odds, analysis_packet, script),
-            analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao, pos_casa, pos_fora, script)
+            analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao, pos_casa, pos_fora, script, analysis_packet)
         ]
 
         print(f"  DEBUG Jogo {id_jogo}: Gols={bool(analises_brutas[0])}, Cantos={bool(analises_brutas[1])}, BTTS={bool(analises_brutas[2])}, Resultado={bool(analises_brutas[3])}, Cartões={bool(analises_brutas[4])}, Finalizações={bool(analises_brutas[5])}, Handicaps={bool(analises_brutas[6])}")
@@ -719,43 +769,7 @@ async def gerar_palpite_completo(jogo, filtro_mercado=None, filtro_tipo_linha=No
 
             # 💾 SALVAR ANÁLISE COMPLETA NO BANCO DE DADOS
             if not filtro_mercado and not filtro_tipo_linha:
-                data_jogo_str = jogo['fixture']['date'].split('T')[0]
-                liga_info = NOMES_LIGAS_PT.get(jogo['league']['id'])
-                nome_liga = liga_info[0] if liga_info else jogo['league']['name']
-
-                dados_jogo = {
-                    'data_jogo': data_jogo_str,
-                    'liga': nome_liga,
-                    'time_casa': jogo['teams']['home']['name'],
-                    'time_fora': jogo['teams']['away']['name']
-                }
-
-                analises_dict = {}
-                for a in analises_brutas:
-                    if a:
-                        mercado_lower = a['mercado'].lower()
-                        if 'gol' in mercado_lower and 'btts' not in mercado_lower:
-                            analises_dict['gols'] = a
-                        elif 'canto' in mercado_lower or 'escanteio' in mercado_lower:
-                            analises_dict['cantos'] = a
-                        elif 'btts' in mercado_lower or 'ambas' in mercado_lower:
-                            analises_dict['btts'] = a
-                        elif 'resultado' in mercado_lower:
-                            analises_dict['resultado'] = a
-                        elif 'cart' in mercado_lower:
-                            analises_dict['cartoes'] = a
-                        elif 'finaliza' in mercado_lower or 'shot' in mercado_lower:
-                            analises_dict['finalizacoes'] = a
-                        elif 'handicap' in mercado_lower:
-                            analises_dict['handicaps'] = a
-
-                stats_dict = {
-                    'stats_casa': stats_casa,
-                    'stats_fora': stats_fora,
-                    'classificacao': classificacao
-                }
-
-                db_manager.salvar_analise(id_jogo, dados_jogo, analises_dict, stats_dict)
+                await salvar_snapshot_analise(jogo, analises_brutas, stats_casa, stats_fora, classificacao, analysis_packet)
 
     if filtro_mercado:
         print(f"DEBUG: Filtro mercado = '{filtro_mercado}'")
@@ -846,20 +860,13 @@ async def gerar_palpite_completo(jogo, filtro_mercado=None, filtro_tipo_linha=No
     mensagem += f"🏆 <b>{nome_liga}</b>\n"
     mensagem += f"━━━━━━━━━━━━━━━━━━━━━━━━\n\n"
 
-    # Buscar posições e forma dos times na classificação
-    pos_casa = "N/A"
-    pos_fora = "N/A"
+    # Posições já resolvidas acima (classificação ou resumo do snapshot); forma vem da classificação
     forma_casa = "N/A"
     forma_fora = "N/A"
 
     if classificacao:
-        for time_info in classificacao:
-            if time_info['team']['name'] == time_casa_nome:
-                pos_casa = time_info.get('rank', 'N/A')
-                forma_casa = time_info.get('form', 'N/A')
-            if time_info['team']['name'] == time_fora_nome:
-                pos_fora = time_info.get('rank', 'N/A')
-                forma_fora = time_info.get('form', 'N/A')
+        forma_casa = classificacao.forma(time_casa_id, time_casa_nome)
+        forma_fora = classificacao.forma(time_fora_id, time_fora_nome)
 
     mensagem += f"⚽ <b>{time_casa_nome}</b> <i>({pos_casa}º)</i> <b>vs</b> <b>{time_fora_nome}</b> <i>({pos_fora}º)</i>\n"
     mensagem += f"🕐 <b>Horário:</b> {horario_formatado} (Brasília)\n\n"
@@ -934,10 +941,99 @@ async def gerar_palpite_completo(jogo, filtro_mercado=None, filtro_tipo_linha=No
     mensagem_final = mensagem + "\n"
 
     # Guardar análise completa no cache (120 minutos = 2 horas)
-    cache_manager.set(cache_key, mensagem_final)
+    cache_manager.set(cache_key, mensagem_final,
+                      scopes=[cache_manager.fixture_scope(id_jogo), cache_manager.league_scope(id_liga)])
 
     return mensagem_final
 
+def _adicionar_palpites_globais(todos_palpites_globais, jogo, analises):
+    for analise in analises:
+        if analise and 'palpites' in analise:
+            mercado_nome = analise.get('mercado', '')
+            for palpite in analise['palpites']:
+                # PURE ANALYST: Não filtra por odd mínima, apenas por confiança
+                todos_palpites_globais.append({
+                    'jogo': jogo,
+                    'palpite': palpite,
+                    'mercado': mercado_nome,  # Adicionar mercado aqui
+                    'time_casa': jogo['teams']['home']['name'],
+                    'time_fora': jogo['teams']['away']['name'],
+                    'liga': jogo['league']['name'],
+                    'horario': jogo['fixture']['date']
+                })
+
+async def coletar_palpites_do_jogo(jogo, analise_db=None, odds=None):
+    """
+    Coleta os palpites de TODOS os mercados de um jogo.
+    Com snapshot do banco (analise_db) não faz nenhuma chamada de API nem recálculo.
+    """
+    palpites_jogo = []
+    fixture_id = jogo['fixture']['id']
+
+    if analise_db:
+        # Snapshot completo no banco: nenhuma chamada de API nem recálculo dos mercados
+        _adicionar_palpites_globais(palpites_jogo, jogo, analises_do_snapshot(analise_db))
+        return palpites_jogo
+
+    # Buscar dados frescos
+    time_casa_id = jogo['teams']['home']['id']
+    time_fora_id = jogo['teams']['away']['id']
+    liga_id = jogo['league']['id']
+
+    stats_casa = await buscar_estatisticas_gerais_time(time_casa_id, liga_id)
+    stats_fora = await buscar_estatisticas_gerais_time(time_fora_id, liga_id)
+    classificacao = await buscar_classificacao_liga(liga_id)
+
+    # Buscar odds do jogo
+    if odds is None:
+        odds = await buscar_odds_do_jogo(fixture_id)
+
+    if not stats_casa or not stats_fora or not odds:
+        return palpites_jogo
+
+    # Obter posições na classificação
+    pos_casa, pos_fora = posicoes_na_classificacao(classificacao, jogo)
+
+    # 📜 PHOENIX V3.0: Buscar análise master para contexto tático
+    analysis_packet = await generate_match_analysis(jogo)
+    
+    # Adicionar posições e classificação ao analysis_packet
+    if analysis_packet and 'error' not in analysis_packet:
+        analysis_packet['home_position'] = pos_casa
+        analysis_packet['away_position'] = pos_fora
+        analysis_packet['league_standings'] = classificacao
+        script = analysis_packet.get('analysis_summary', {}).get('selected_script', 'EQUILIBRADO')
+        stats_casa = analysis_packet.get('raw_data', {}).get('home_stats', {})
+        stats_fora = analysis_packet.get('raw_data', {}).get('away_stats', {})
+    else:
+        script = 'EQUILIBRADO'
+    
+    # Analisar todos os mercados COM OS PARÂMETROS CORRETOS (Phoenix V3.0 - unified signature)
+    analise_gols = analisar_mercado_gols(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None
+    analise_cantos = analisar_mercado_cantos(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None
+    analise_btts = analisar_mercado_btts(stats_casa, stats_fora, odds, script, analysis_packet)
+    analise_resultado = analisar_mercado_resultado_final(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None
+    analise_cartoes = analisar_mercado_cartoes(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None
+    analise_finalizacoes = analisar_mercado_finalizacoes(stats_casa, stats_fora, odds, analysis_packet, script)
+    analise_handicaps = analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao, pos_casa, pos_fora, script, analysis_packet)
+
+    analises_jogo = [analise_gols, analise_cantos, analise_btts, analise_resultado, analise_cartoes, analise_finalizacoes, analise_handicaps]
+
+    # 💾 Persistir snapshot para que a próxima coleta do dia venha direto do banco
+    if any(analises_jogo):
+        await salvar_snapshot_analise(jogo, analises_jogo, stats_casa, stats_fora, classificacao, analysis_packet)
+
+    # Coletar palpites
+    _adicionar_palpites_globais(palpites_jogo, jogo, analises_jogo)
+    return palpites_jogo
+
+async def _buscar_snapshots_do_slate(jogos):
+    # Buscar cache de análise do banco para o dia inteiro (1 query em vez de 1 por jogo)
+    return await db_manager.aio.buscar_analises_em_lote(
+        [jogo['fixture']['id'] for jogo in jogos], max_idade_horas=12, versao_modelo=VERSAO_MODELO_ANALISE,
+        datas_jogo=[data_jogo_do_fixture(jogo) for jogo in jogos]
+    )
+
 async def coletar_todos_palpites_disponiveis():
     """
     Coleta TODOS os palpites de TODOS os jogos e TODOS os mercados.
@@ -948,82 +1044,14 @@ async def coletar_todos_palpites_disponiveis():
         return []
 
     todos_palpites_globais = []
+    analises_db = await _buscar_snapshots_do_slate(jogos)
+    # Jogos sem snapshot serão analisados: pontuar todos os times deles num único passe
+    await preparar_scores_do_slate([jogo for jogo in jogos if not analises_db.get(jogo['fixture']['id'])])
 
     for jogo in jogos:
-        fixture_id = jogo['fixture']['id']
-
-        # Buscar cache de análise do banco
-        analise_db = db_manager.buscar_analise(fixture_id, max_idade_horas=12)
-
-        if analise_db:
-            # Usar análise do cache
-            stats_casa = analise_db.get('stats_casa', {})
-            stats_fora = analise_db.get('stats_fora', {})
-            classificacao = analise_db.get('classificacao', [])
-        else:
-            # Buscar dados frescos
-            time_casa_id = jogo['teams']['home']['id']
-            time_fora_id = jogo['teams']['away']['id']
-            liga_id = jogo['league']['id']
-
-            stats_casa = await buscar_estatisticas_gerais_time(time_casa_id, liga_id)
-            stats_fora = await buscar_estatisticas_gerais_time(time_fora_id, liga_id)
-            classificacao = await buscar_classificacao_liga(liga_id)
-
-        # Buscar odds do jogo
-        odds = await buscar_odds_do_jogo(fixture_id)
-
-        if not stats_casa or not stats_fora or not odds:
-            continue
-
-        # Obter posições na classificação
-        pos_casa = "N/A"
-        pos_fora = "N/A"
-        if classificacao:
-            for time_info in classificacao:
-                if time_info['team']['name'] == jogo['teams']['home']['name']:
-                    pos_casa = time_info['rank']
-                if time_info['team']['name'] == jogo['teams']['away']['name']:
-                    pos_fora = time_info['rank']
-
-        # 📜 PHOENIX V3.0: Buscar análise master para contexto tático
-        analysis_packet = await generate_match_analysis(jogo)
-        
-        # Adicionar posições e classificação ao analysis_packet
-        if analysis_packet and 'error' not in analysis_packet:
-            analysis_packet['home_position'] = pos_casa
-            analysis_packet['away_position'] = pos_fora
-            analysis_packet['league_standings'] = classificacao
-            script = analysis_packet.get('analysis_summary', {}).get('selected_script', 'EQUILIBRADO')
-            stats_casa = analysis_packet.get('raw_data', {}).get('home_stats', {})
-            stats_fora = analysis_packet.get('raw_data', {}).get('away_stats', {})
-        else:
-            script = 'EQUILIBRADO'
-        
-        # Analisar todos os mercados COM OS PARÂMETROS CORRETOS (Phoenix V3.0 - unified signature)
-        analise_gols = analisar_mercado_gols(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None
-        analise_cantos = analisar_mercado_cantos(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None
-        analise_btts = analisar_mercado_btts(stats_casa, stats_fora, odds, script)
-        analise_resultado = analisar_mercado_resultado_final(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None
-        analise_cartoes = analisar_mercado_cartoes(analysis_packet, odds) if analysis_packet and 'error' not in analysis_packet else None
-        analise_finalizacoes = analisar_mercado_finalizacoes(stats_casa, stats_fora, odds, analysis_packet, script)
-        analise_handicaps = analisar_mercado_handicaps(stats_casa, stats_fora, odds, classificacao, pos_casa, pos_fora, script)
-
-        # Coletar palpites
-        for analise in [analise_gols, analise_cantos, analise_btts, analise_resultado, analise_cartoes, analise_finalizacoes, analise_handicaps]:
-            if analise and 'palpites' in analise:
-                mercado_nome = analise.get('mercado', '')
-                for palpite in analise['palpites']:
-                    # PURE ANALYST: Não filtra por odd mínima, apenas por confiança
-                    todos_palpites_globais.append({
-                        'jogo': jogo,
-                        'palpite': palpite,
-                        'mercado': mercado_nome,  # Adicionar mercado aqui
-                        'time_casa': jogo['teams']['home']['name'],
-                        'time_fora': jogo['teams']['away']['name'],
-                        'liga': jogo['league']['name'],
-                        'horario': jogo['fixture']['date']
-                    })
+        todos_palpites_globais.extend(
+            await coletar_palpites_do_jogo(jogo, analises_db.get(jogo['fixture']['id']))
+        )
 
     # DIAGNÓSTICO: Log de produtividade
     print(f"\n📊 RELATÓRIO DE GERAÇÃO DE PALPITES:")
@@ -1033,6 +1061,76 @@ async def coletar_todos_palpites_disponiveis():
     
     return todos_palpites_globais
 
+async def atualizar_indice_palpites():
+    """
+    Atualização INCREMENTAL do índice de palpites do dia.
+    Cada jogo só é recalculado se sua impressão digital mudou: o conteúdo das odds (vindas do cache)
+    e, com snapshot, o atualizado_em do banco. Odds que mudaram desde a última indexação de um jogo
+    com snapshot fazem ele ser reanalisado com as odds novas (o snapshot guarda as odds antigas).
+    """
+    async with _indice_palpites_lock:
+        jogos = await buscar_jogos_do_dia()
+        data_slate = datetime.now(ZoneInfo("America/Sao_Paulo")).date().isoformat()
+        if indice_palpites.data_slate != data_slate:
+            indice_palpites.resetar(data_slate)
+
+        if not jogos:
+            indice_palpites.manter_apenas([])
+            indice_palpites.marcar_pronto()
+            return
+
+        analises_db = await _buscar_snapshots_do_slate(jogos)
+        pendentes = []
+
+        for jogo in jogos:
+            fixture_id = jogo['fixture']['id']
+            analise_db = analises_db.get(fixture_id)
+            odds = await buscar_odds_do_jogo(fixture_id)
+            fingerprint = f"odds:{picks_index.calcular_fingerprint(odds)}"
+
+            if analise_db:
+                versao_db = f"db:{analise_db.get('atualizado_em')}|"
+                fingerprint = versao_db + fingerprint
+                anterior = indice_palpites.fingerprint(fixture_id)
+                if anterior and anterior != fingerprint and anterior.startswith(versao_db):
+                    analise_db = None  # Mesmo snapshot, odds novas: reanalisar em vez de reusar os palpites dele
+
+            if indice_palpites.fingerprint(fixture_id) != fingerprint:
+                pendentes.append((jogo, analise_db, odds, fingerprint))
+
+        # Times dos jogos que serão reanalisados: pontuados num único passe antes do loop
+        await preparar_scores_do_slate([jogo for jogo, analise_db, _, _ in pendentes if not analise_db])
+
+        for jogo, analise_db, odds, fingerprint in pendentes:
+            palpites_jogo = await coletar_palpites_do_jogo(jogo, analise_db, odds)
+            indice_palpites.atualizar_fixture(jogo['fixture']['id'], palpites_jogo, fingerprint)
+        recalculados = len(pendentes)
+
+        indice_palpites.manter_apenas(jogo['fixture']['id'] for jogo in jogos)
+        indice_palpites.marcar_pronto()
+
+        stats = indice_palpites.get_stats()
+        print(f"📇 Índice de palpites: {recalculados}/{len(jogos)} jogos recalculados | {stats['palpites']} palpites")
+
+async def obter_palpites_do_dia():
+    """Palpites do slate ordenados por confiança, direto da memória (constrói o índice só se ainda não existir)"""
+    data_slate = datetime.now(ZoneInfo("America/Sao_Paulo")).date().isoformat()
+    if not indice_palpites.pronto or indice_palpites.data_slate != data_slate:
+        await atualizar_indice_palpites()
+    return indice_palpites.palpites_ordenados()
+
+async def manter_indice_palpites(intervalo_minutos=10):
+    """Tarefa em background: mantém o índice de palpites atualizado"""
+    print(f"📇 Índice de palpites: atualização a cada {intervalo_minutos} minutos")
+    while True:
+        try:
+            await atualizar_indice_palpites()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Erro ao atualizar índice de palpites: {e}")
+        await asyncio.sleep(intervalo_minutos * 60)
+
 def converter_odd_para_float(odd_raw):
     """
     Converte odd (que pode ser string, float ou None) para float de forma segura.
@@ -1051,7 +1149,7 @@ async def gerar_aposta_simples():
     PURE ANALYST: Gera UMA ÚNICA tendência de alta confiança de TODOS os jogos/mercados.
     Prioriza confiança estatística pura (sem dependência de odds).
     """
-    todos_palpites = await coletar_todos_palpites_disponiveis()
+    todos_palpites = await obter_palpites_do_dia()
 
     if not todos_palpites:
         return None
@@ -1064,7 +1162,7 @@ async def gerar_aposta_simples():
         palpites_alta_confianca = [p for p in todos_palpites if p['palpite'].get('confianca', 0) >= 5.5]
     
     if not palpites_alta_confianca:
-        palpites_alta_confianca = todos_palpites  # Último fallback: usar todos
+        palpites_alta_confianca = list(todos_palpites)  # Último fallback: usar todos (cópia: a lista é do índice)
 
     # Ordenar por confiança (maior primeiro)
     palpites_alta_confianca.sort(key=lambda x: x['palpite'].get('confianca', 0), reverse=True)
@@ -1079,7 +1177,7 @@ async def gerar_multipla_inteligente(min_jogos, max_jogos):
     """
     PURE ANALYST: Gera múltipla com N jogos priorizando confiança estatística pura.
     """
-    todos_palpites = await coletar_todos_palpites_disponiveis()
+    todos_palpites = await obter_palpites_do_dia()
 
     if not todos_palpites:
         return []
@@ -1130,7 +1228,7 @@ async def gerar_bingo_odd_alta(odd_min, odd_max):
     - Prefere VOLUME com valor (muitos jogos @1.30-1.80)
     - Usa algoritmo de otimização para melhor combinação
     """
-    todos_palpites = await coletar_todos_palpites_disponiveis()
+    todos_palpites = await obter_palpites_do_dia()
 
     if not todos_palpites:
         return []
@@ -1290,6 +1388,30 @@ async def cache_stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE
     else:
         disk_size_mb = 0
     
+    # TTL aprendido e hit ratio por família de chave (top 8 por volume de acessos)
+    familias = cache_manager.get_family_stats()[:8]
+    linhas_familias = ""
+    for familia in familias:
+        linhas_familias += (
+            f"├─ <code>{familia['familia']}</code>: hit {familia['hit_ratio']:.0%} | "
+            f"inalterado {familia['taxa_inalterado']:.0%} ({familia['refetches']} refetches) | "
+            f"TTL {familia['ttl_base']}→<b>{familia['ttl_aprendido']}</b> min\n"
+        )
+    if not linhas_familias:
+        linhas_familias = "└─ <i>Sem dados ainda</i>\n"
+    
+    # Connection pool do PostgreSQL
+    if db_manager.enabled:
+        pool = db_manager.obter_metricas_pool()
+        linhas_db = (
+            f"├─ Em uso: <b>{pool['em_uso']}/{pool['max_conexoes']}</b> (pico {pool['pico_em_uso']})\n"
+            f"├─ Checkouts: <b>{pool['checkouts']}</b> | espera média {pool['espera_media_ms']:.1f} ms "
+            f"(máx {pool['espera_max_ms']:.0f} ms)\n"
+            f"└─ Timeouts do pool: <b>{pool['timeouts_pool']}</b> | statement_timeout {pool['statement_timeout_ms']} ms\n"
+        )
+    else:
+        linhas_db = "└─ <i>Banco desabilitado</i>\n"
+    
     await update.message.reply_text(
         f"📊 <b>Estatísticas do Cache</b>\n\n"
         f"💾 <b>Memória RAM (estado atual):</b>\n"
@@ -1300,6 +1422,10 @@ async def cache_stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE
         f"└─ Tamanho: <b>{disk_size_mb:.2f} MB</b>\n\n"
         f"🔄 <b>Status de Salvamento:</b>\n"
         f"└─ Mudanças pendentes: <b>{'SIM ⏳' if is_dirty else 'NÃO ✅'}</b>\n\n"
+        f"📈 <b>Por família (hit ratio | refetch inalterado | TTL base→aprendido):</b>\n"
+        f"{linhas_familias}\n"
+        f"🗄️ <b>PostgreSQL (connection pool):</b>\n"
+        f"{linhas_db}\n"
         f"ℹ️ <i>O cache é salvo automaticamente a cada 5 minutos.</i>",
         parse_mode='HTML'
     )
@@ -1316,6 +1442,40 @@ async def limpar_cache_command(update: Update, context: ContextTypes.DEFAULT_TYP
         )
         return
     
+    # /limpar_cache <escopo>: invalidação seletiva por geração, sem apagar os dados caros da API
+    # Escopos: analises | mensagens | api | liga <id> | jogo <id>
+    if context.args:
+        escopo = context.args[0].lower()
+        alvo = context.args[1] if len(context.args) > 1 else None
+        namespaces = {
+            'analises': cache_manager.NAMESPACE_DERIVED,
+            'mensagens': cache_manager.NAMESPACE_RENDER,
+            'api': cache_manager.NAMESPACE_RAW,
+        }
+        if escopo in namespaces:
+            namespace = namespaces[escopo]
+        elif escopo == 'liga' and alvo and alvo.isdigit():
+            namespace = cache_manager.league_scope(int(alvo))
+        elif escopo == 'jogo' and alvo and alvo.isdigit():
+            namespace = cache_manager.fixture_scope(int(alvo))
+        else:
+            await update.message.reply_text(
+                "⚠️ Uso: /limpar_cache [analises | mensagens | api | liga &lt;id&gt; | jogo &lt;id&gt;]",
+                parse_mode='HTML'
+            )
+            return
+        
+        geracao = await cache_manager.abump_generation(namespace)
+        if escopo == 'jogo':
+            indice_palpites.invalidar(int(alvo))
+        elif escopo != 'mensagens':
+            indice_palpites.invalidar()
+        await update.message.reply_text(
+            f"✅ Cache <b>{namespace}</b> invalidado (geração {geracao}). Os demais dados foram mantidos.",
+            parse_mode='HTML'
+        )
+        return
+    
     # Mostrar estatísticas ANTES de limpar
     stats = cache_manager.get_stats()
     await update.message.reply_text(
@@ -1327,7 +1487,8 @@ async def limpar_cache_command(update: Update, context: ContextTypes.DEFAULT_TYP
         parse_mode='HTML'
     )
     
-    cache_manager.clear()
+    await cache_manager.aclear()
+    indice_palpites.invalidar()
     await update.message.reply_text("✅ Memória de análise (cache) foi limpa com sucesso!")
 
 async def getlog_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -1439,7 +1600,7 @@ async def debug_confianca_command(update: Update, context: ContextTypes.DEFAULT_
 async def processar_um_jogo(jogo, idx_total, filtro_mercado, filtro_tipo_linha):
     """Processa um único jogo (async) - verifica cache primeiro"""
     cache_key = f"analise_jogo_{jogo['fixture']['id']}_{filtro_mercado}_{filtro_tipo_linha}"
-    analise_cached = cache_manager.get(cache_key)
+    analise_cached = await cache_manager.aget(cache_key)
 
     if analise_cached:
         print(f"✅ CACHE HIT: Jogo {idx_total} (ID {jogo['fixture']['id']})")
@@ -1717,7 +1878,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         
         await asyncio.sleep(2)
         
-        paginated = pagination_helpers.get_paginated_analyses(db_manager, user_id, 'goals_only', 0)
+        paginated = await pagination_helpers.get_paginated_analyses(db_manager, user_id, 'goals_only', 0)
         
         if paginated['analyses']:
             from analysts.dossier_formatter import format_evidence_based_dossier
@@ -1727,7 +1888,10 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 formatted_msg = format_evidence_based_dossier(dossier)
                 await context.bot.send_message(chat_id=query.message.chat_id, text=formatted_msg, parse_mode='HTML')
             
-            keyboard = pagination_helpers.create_pagination_keyboard(0, paginated['has_more'], 'goals_only', paginated['total_pages'])
+            keyboard = pagination_helpers.create_pagination_keyboard(
+                0, paginated['has_more'], 'goals_only', paginated['total_pages'],
+                paginated['first_cursor'], paginated['last_cursor']
+            )
             await context.bot.send_message(
                 chat_id=query.message.chat_id,
                 text=f"📊 Mostrando {len(paginated['analyses'])} de {paginated['total']} análises",
@@ -1759,7 +1923,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         
         await asyncio.sleep(2)
         
-        paginated = pagination_helpers.get_paginated_analyses(db_manager, user_id, 'corners_only', 0)
+        paginated = await pagination_helpers.get_paginated_analyses(db_manager, user_id, 'corners_only', 0)
         
         if paginated['analyses']:
             from analysts.dossier_formatter import format_evidence_based_dossier
@@ -1769,7 +1933,10 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 formatted_msg = format_evidence_based_dossier(dossier)
                 await context.bot.send_message(chat_id=query.message.chat_id, text=formatted_msg, parse_mode='HTML')
             
-            keyboard = pagination_helpers.create_pagination_keyboard(0, paginated['has_more'], 'corners_only', paginated['total_pages'])
+            keyboard = pagination_helpers.create_pagination_keyboard(
+                0, paginated['has_more'], 'corners_only', paginated['total_pages'],
+                paginated['first_cursor'], paginated['last_cursor']
+            )
             await context.bot.send_message(
                 chat_id=query.message.chat_id,
                 text=f"📊 Mostrando {len(paginated['analyses'])} de {paginated['total']} análises",
@@ -1801,7 +1968,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         
         await asyncio.sleep(2)
         
-        paginated = pagination_helpers.get_paginated_analyses(db_manager, user_id, 'btts_only', 0)
+        paginated = await pagination_helpers.get_paginated_analyses(db_manager, user_id, 'btts_only', 0)
         
         if paginated['analyses']:
             from analysts.dossier_formatter import format_evidence_based_dossier
@@ -1811,7 +1978,10 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 formatted_msg = format_evidence_based_dossier(dossier)
                 await context.bot.send_message(chat_id=query.message.chat_id, text=formatted_msg, parse_mode='HTML')
             
-            keyboard = pagination_helpers.create_pagination_keyboard(0, paginated['has_more'], 'btts_only', paginated['total_pages'])
+            keyboard = pagination_helpers.create_pagination_keyboard(
+                0, paginated['has_more'], 'btts_only', paginated['total_pages'],
+                paginated['first_cursor'], paginated['last_cursor']
+            )
             await context.bot.send_message(
                 chat_id=query.message.chat_id,
                 text=f"📊 Mostrando {len(paginated['analyses'])} de {paginated['total']} análises",
@@ -1843,7 +2013,7 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         
         await asyncio.sleep(2)
         
-        paginated = pagination_helpers.get_paginated_analyses(db_manager, user_id, 'result_only', 0)
+        paginated = await pagination_helpers.get_paginated_analyses(db_manager, user_id, 'result_only', 0)
         
         if paginated['analyses']:
             from analysts.dossier_formatter import format_evidence_based_dossier
@@ -1853,7 +2023,10 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 formatted_msg = format_evidence_based_dossier(dossier)
                 await context.bot.send_message(chat_id=query.message.chat_id, text=formatted_msg, parse_mode='HTML')
             
-            keyboard = pagination_helpers.create_pagination_keyboard(0, paginated['has_more'], 'result_only', paginated['total_pages'])
+            keyboard = pagination_helpers.create_pagination_keyboard(
+                0, paginated['has_more'], 'result_only', paginated['total_pages'],
+                paginated['first_cursor'], paginated['last_cursor']
+            )
             await context.bot.send_message(
                 chat_id=query.message.chat_id,
                 text=f"📊 Mostrando {len(paginated['analyses'])} de {paginated['total']} análises",
@@ -2145,13 +2318,13 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await query.edit_message_text(text=mensagem, reply_markup=InlineKeyboardMarkup(keyboard), parse_mode='HTML')
 
     elif data.startswith('page_'):
-        parts = data.split('_')
-        analysis_type = parts[1]
-        page = int(parts[2])
+        pagina = pagination_helpers.parse_pagination_callback(data)
+        analysis_type = pagina['analysis_type']
         user_id = query.from_user.id
         
-        paginated = pagination_helpers.get_paginated_analyses(
-            db_manager, user_id, analysis_type, page
+        paginated = await pagination_helpers.get_paginated_analyses(
+            db_manager, user_id, analysis_type, pagina['page'],
+            cursor=pagina['cursor'], direcao=pagina['direcao']
         )
         
         if not paginated['analyses']:
@@ -2178,7 +2351,9 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             paginated['current_page'],
             paginated['has_more'],
             analysis_type,
-            paginated['total_pages']
+            paginated['total_pages'],
+            paginated['first_cursor'],
+            paginated['last_cursor']
         )
         
         status_msg = f"📊 Mostrando {len(paginated['analyses'])} de {paginated['total']} análises"
@@ -2515,9 +2690,30 @@ async def post_init(application: Application) -> None:
     asyncio.create_task(job_queue.background_analysis_worker(db_manager))
     print("✅ Background worker iniciado!")
     
+    print("📇 Iniciando índice de palpites do dia...")
+    asyncio.create_task(manter_indice_palpites())
+    print("✅ Índice de palpites iniciado!")
+    
     print("🔄 Iniciando cache saver periódico...")
     asyncio.create_task(cache_manager.periodic_cache_saver())
     print("✅ Cache saver iniciado!")
+    
+    print("🧮 Iniciando salvamento periódico da feature store...")
+    asyncio.create_task(team_features.periodic_saver())
+    print("✅ Feature store saver iniciado!")
+    
+    print("📚 Iniciando gravação periódica do histórico de jogos...")
+    asyncio.create_task(match_history.periodic_flush())
+    print("✅ Histórico de jogos iniciado!")
+    
+    if db_manager.enabled:
+        print("📣 Iniciando listener de invalidação de cache...")
+        asyncio.create_task(cache_manager.cache_invalidation_listener(db_manager))
+        print("✅ Listener de invalidação iniciado!")
+        
+        print("🗂️ Iniciando manutenção de partições...")
+        asyncio.create_task(db_manager.aio.manutencao_particoes_periodica())
+        print("✅ Manutenção de partições iniciada!")
 
 async def post_shutdown(application: Application) -> None:
     """
@@ -2539,10 +2735,19 @@ async def post_shutdown(application: Application) -> None:
     try:
         print("💾 Salvando cache final...")
         await asyncio.to_thread(cache_manager.save_cache_to_disk)
+        await asyncio.to_thread(cache_manager.flush_l2)
+        await asyncio.to_thread(team_features.store.salvar_em_disco)
+        await asyncio.to_thread(match_history.historico.flush)
         print("✅ Cache salvo com sucesso!")
     except Exception as e:
         print(f"⚠️ Erro ao salvar cache: {e}")
     
+    try:
+        print("💾 Gravando análises pendentes no banco...")
+        await job_queue.flush_daily_writer()
+    except Exception as e:
+        print(f"⚠️ Erro ao gravar análises pendentes: {e}")
+    
     try:
         print("🔌 Fechando cliente HTTP assíncrono...")
         import api_client
@@ -2596,7 +2801,18 @@ def setup_signal_handlers(application: Application) -> None:
 def main() -> None:
     asyncio.run(startup_validation())
 
+    # Checagem rápida de versão do schema; DDL só roda se houver migração pendente
+    db_manager.garantir_schema()
+
     cache_manager.load_cache_from_disk()
+    team_features.store.carregar_do_disco()
+    match_history.historico.abrir()
+    importar_historico_do_cache()
+    if cache_manager.enable_l2_cache(db_manager):
+        cache_manager.preload_from_l2()
+    # Deploy com nova lógica de análise invalida só o que é derivado dela (dados da API ficam)
+    cache_manager.sync_namespace_version(cache_manager.NAMESPACE_DERIVED, VERSAO_MODELO_ANALISE)
+    cache_manager.sync_namespace_version(cache_manager.NAMESPACE_RENDER, VERSAO_MODELO_ANALISE)
 
     application = Application.builder().token(TELEGRAM_TOKEN).post_init(post_init).post_shutdown(post_shutdown).build()
     
@@ -0,0 +1,322 @@
+# match_history.py
+"""
+Histórico colunar de jogos FINALIZADOS em disco.
+
+Uma .npy tipada por coluna (fixture_id, data, ids dos times, gols, cantos, finalizações,
+finalizações no gol e cartões de cada lado) em DIRETORIO_HISTORICO, aberta com memory-map
+no startup: análises e backtests fatiam por time ou por data direto nos arrays, sem parse
+de JSON, e a memória residente não cresce junto com o histórico.
+
+Escrita em lote: registrar() acumula linhas pendentes e flush() grava todas de uma vez
+no fim das colunas (capacidade pré-alocada, dobrada quando enche).
+"""
+
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DIRETORIO_HISTORICO = "historico_partidas"
+ARQUIVO_META = "meta.json"
+CAPACIDADE_INICIAL = 4096
+TAMANHO_LOTE = 256  # Linhas pendentes que disparam um flush automático
+
+COLUNAS = {
+    'fixture_id': np.int64,
+    'data': np.int64,  # Epoch em segundos (UTC)
+    'home_id': np.int64,
+    'away_id': np.int64,
+    'gols_casa': np.int16, 'gols_fora': np.int16,
+    'cantos_casa': np.int16, 'cantos_fora': np.int16,
+    'finalizacoes_casa': np.int16, 'finalizacoes_fora': np.int16,
+    'no_gol_casa': np.int16, 'no_gol_fora': np.int16,
+    'amarelos_casa': np.int16, 'amarelos_fora': np.int16,
+    'vermelhos_casa': np.int16, 'vermelhos_fora': np.int16,
+}
+
+# Coluna (sem o sufixo _casa/_fora) → nome da estatística em /fixtures/statistics
+_ESTATISTICAS_API = {
+    'cantos': 'Corner Kicks',
+    'finalizacoes': 'Total Shots',
+    'no_gol': 'Shots on Goal',
+    'amarelos': 'Yellow Cards',
+    'vermelhos': 'Red Cards',
+}
+
+
+def _inteiro(valor) -> int:
+    try:
+        return int(valor or 0)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _epoch(data) -> int:
+    try:
+        return int(datetime.fromisoformat(str(data)).timestamp())
+    except (ValueError, TypeError):
+        return 0
+
+
+def linha_do_jogo(jogo: Dict, stats: Dict) -> Optional[tuple]:
+    """Jogo (formato de buscar_ultimos_jogos_time) + stats (buscar_estatisticas_jogo) → linha na ordem de COLUNAS"""
+    teams = jogo.get('teams', {})
+    fixture_id = jogo.get('fixture_id')
+    home_id = teams.get('home', {}).get('id')
+    away_id = teams.get('away', {}).get('id')
+    if not fixture_id or home_id is None or away_id is None or not stats:
+        return None
+
+    valores = {
+        'fixture_id': int(fixture_id),
+        'data': _epoch(jogo.get('date')),
+        'home_id': int(home_id),
+        'away_id': int(away_id),
+        'gols_casa': _inteiro(jogo.get('home_goals')),
+        'gols_fora': _inteiro(jogo.get('away_goals')),
+    }
+    for coluna, nome_api in _ESTATISTICAS_API.items():
+        valores[f'{coluna}_casa'] = _inteiro(stats.get('home', {}).get(nome_api))
+        valores[f'{coluna}_fora'] = _inteiro(stats.get('away', {}).get(nome_api))
+    return tuple(valores[coluna] for coluna in COLUNAS)
+
+
+def _formatar_estatisticas(valores: Dict[str, int]) -> Dict[str, Dict[str, int]]:
+    """Valores de uma linha → formato de buscar_estatisticas_jogo ({'home': {...}, 'away': {...}})"""
+    return {
+        lado: {nome_api: valores[f'{coluna}_{sufixo}'] for coluna, nome_api in _ESTATISTICAS_API.items()}
+        for lado, sufixo in (('home', 'casa'), ('away', 'fora'))
+    }
+
+
+class HistoricoPartidas:
+    """Colunas memory-mapped + linhas pendentes de flush"""
+
+    def __init__(self, diretorio: str = DIRETORIO_HISTORICO):
+        self.diretorio = diretorio
+        self.linhas = 0
+        self.capacidade = 0
+        self._colunas: Dict[str, np.memmap] = {}
+        self._posicoes: Dict[int, int] = {}  # fixture_id → linha gravada
+        self._pendentes: Dict[int, tuple] = {}
+        self._lock = threading.RLock()
+
+    def _caminho(self, nome: str) -> str:
+        return os.path.join(self.diretorio, f"{nome}.npy")
+
+    def _salvar_meta(self):
+        temporario = os.path.join(self.diretorio, f"{ARQUIVO_META}.tmp")
+        with open(temporario, 'w') as f:
+            json.dump({'linhas': self.linhas, 'capacidade': self.capacidade, 'colunas': list(COLUNAS)}, f)
+        os.replace(temporario, os.path.join(self.diretorio, ARQUIVO_META))
+
+    def _alocar(self, capacidade: int):
+        """Cria (ou aumenta) as colunas com a capacidade pedida, preservando as linhas existentes"""
+        for nome, dtype in COLUNAS.items():
+            temporario = self._caminho(f"{nome}.tmp")
+            nova = np.lib.format.open_memmap(temporario, mode='w+', dtype=dtype, shape=(capacidade,))
+            if nome in self._colunas and self.linhas:
+                nova[:self.linhas] = self._colunas[nome][:self.linhas]
+            nova.flush()
+            del nova
+            os.replace(temporario, self._caminho(nome))
+        self.capacidade = capacidade
+        self._salvar_meta()
+        self._mapear()
+
+    def _mapear(self):
+        self._colunas = {nome: np.load(self._caminho(nome), mmap_mode='r+') for nome in COLUNAS}
+        for nome, coluna in self._colunas.items():
+            if coluna.dtype != COLUNAS[nome] or len(coluna) != self.capacidade:
+                raise ValueError(f"coluna '{nome}' não confere com meta.json")
+
+    def _quarentena(self, motivo) -> str:
+        """Move o diretório ilegível para o lado (nada é apagado) e recria um vazio no lugar"""
+        destino = f"{os.path.normpath(self.diretorio)}.corrompido-{datetime.now():%Y%m%d-%H%M%S}"
+        os.replace(self.diretorio, destino)
+        os.makedirs(self.diretorio)
+        print(f"❌ HISTÓRICO: não foi possível abrir ({motivo}). Arquivos preservados em {destino}/, histórico recriado vazio")
+        return destino
+
+    def abrir(self):
+        """Memory-map das colunas existentes (ou cria o diretório vazio)"""
+        with self._lock:
+            os.makedirs(self.diretorio, exist_ok=True)
+            meta_path = os.path.join(self.diretorio, ARQUIVO_META)
+            self._colunas = {}
+            try:
+                if os.listdir(self.diretorio):
+                    with open(meta_path) as f:
+                        meta = json.load(f)
+                    if meta.get('colunas') != list(COLUNAS):
+                        raise ValueError("colunas diferentes do formato atual")
+                    self.linhas = int(meta['linhas'])
+                    self.capacidade = int(meta['capacidade'])
+                    self._mapear()
+                    fixture_ids = self._colunas['fixture_id'][:self.linhas].tolist()
+                    self._posicoes = dict(zip(fixture_ids, range(self.linhas)))
+                else:
+                    self.linhas = 0
+                    self._posicoes = {}
+                    self._alocar(CAPACIDADE_INICIAL)
+            except Exception as e:
+                # Nunca sobrescrever arquivos existentes: podem ter anos de jogos recuperáveis
+                self._colunas = {}
+                self._quarentena(e)
+                self.linhas = 0
+                self._posicoes = {}
+                self._alocar(CAPACIDADE_INICIAL)
+            print(f"✅ HISTÓRICO: {self.linhas} jogos finalizados mapeados de {self.diretorio}/")
+
+    # ---------- Escrita ----------
+
+    def registrar(self, jogo: Dict, stats: Dict) -> bool:
+        """Acumula um jogo finalizado para o próximo flush em lote"""
+        linha = linha_do_jogo(jogo, stats)
+        if linha is None:
+            return False
+        with self._lock:
+            if linha[0] in self._pendentes:
+                return False
+            self._pendentes[linha[0]] = linha
+            deve_gravar = len(self._pendentes) >= TAMANHO_LOTE
+        if deve_gravar:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        """Grava as linhas pendentes no fim das colunas (um único append em lote)"""
+        with self._lock:
+            if not self._pendentes or not self._colunas:
+                return 0
+            lote = np.array(list(self._pendentes.values()), dtype=np.int64)
+            self._pendentes = {}
+            # Deduplicação do lote inteiro contra o que já está gravado
+            lote = lote[[fixture_id not in self._posicoes for fixture_id in lote[:, 0].tolist()]]
+            if not len(lote):
+                return 0
+
+            necessario = self.linhas + len(lote)
+            if necessario > self.capacidade:
+                self._alocar(max(necessario, self.capacidade * 2))
+
+            for j, (nome, dtype) in enumerate(COLUNAS.items()):
+                coluna = self._colunas[nome]
+                coluna[self.linhas:necessario] = lote[:, j].astype(dtype)
+                coluna.flush()
+            self._posicoes.update(zip(lote[:, 0].tolist(), range(self.linhas, necessario)))
+            self.linhas = necessario
+            self._salvar_meta()
+        print(f"💾 HISTÓRICO: +{len(lote)} jogos gravados (total {self.linhas})")
+        return len(lote)
+
+    # ---------- Leitura ----------
+
+    def colunas(self) -> Dict[str, np.ndarray]:
+        """Visões somente-leitura das colunas gravadas (sem cópia)"""
+        with self._lock:
+            return {nome: coluna[:self.linhas] for nome, coluna in self._colunas.items()}
+
+    def _indice(self, fixture_id: int) -> Optional[int]:
+        return self._posicoes.get(fixture_id)
+
+    def _fatiar(self, mascara: np.ndarray) -> Dict[str, np.ndarray]:
+        indices = np.flatnonzero(mascara)
+        return {nome: coluna[indices] for nome, coluna in self.colunas().items()}
+
+    def jogos_do_time(self, team_id: int, desde: Optional[datetime] = None, ate: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Jogos do time (casa ou fora), opcionalmente num intervalo de datas"""
+        col = self.colunas()
+        mascara = (col['home_id'] == team_id) | (col['away_id'] == team_id)
+        if desde is not None:
+            mascara &= col['data'] >= int(desde.timestamp())
+        if ate is not None:
+            mascara &= col['data'] <= int(ate.timestamp())
+        return self._fatiar(mascara)
+
+    def entre_datas(self, desde: datetime, ate: datetime) -> Dict[str, np.ndarray]:
+        """Todos os jogos no intervalo (backtests)"""
+        col = self.colunas()
+        return self._fatiar((col['data'] >= int(desde.timestamp())) & (col['data'] <= int(ate.timestamp())))
+
+    def estatisticas(self, fixture_id: int) -> Optional[Dict[str, Dict[str, int]]]:
+        """Estatísticas do jogo no formato de buscar_estatisticas_jogo (só os campos guardados)"""
+        with self._lock:
+            linha = self._pendentes.get(fixture_id)
+            if linha is not None:
+                valores = dict(zip(COLUNAS, linha))
+            else:
+                i = self._indice(fixture_id)
+                if i is None:
+                    return None
+                valores = {nome: int(coluna[i]) for nome, coluna in self._colunas.items()}
+        return _formatar_estatisticas(valores)
+
+    def jogos_como_ultimos(self, indices) -> List[Dict]:
+        """Linhas no formato de buscar_ultimos_jogos_time (para alimentar a feature store)"""
+        col = self.colunas()
+        jogos = []
+        for i in indices:
+            jogos.append({
+                'fixture_id': int(col['fixture_id'][i]),
+                'date': datetime.fromtimestamp(int(col['data'][i]), timezone.utc).isoformat(),
+                'teams': {'home': {'id': int(col['home_id'][i])}, 'away': {'id': int(col['away_id'][i])}},
+                'home_goals': int(col['gols_casa'][i]),
+                'away_goals': int(col['gols_fora'][i]),
+            })
+        return jogos
+
+    def alimentar_feature_store(self, store, por_time: int = 20) -> int:
+        """Registra na feature store os por_time jogos mais recentes de cada time, em ordem de data"""
+        col = self.colunas()
+        n = len(col['fixture_id'])
+        if not n:
+            return 0
+        # Cada jogo aparece uma vez por time; posição de recência do jogo dentro de cada time
+        times = np.concatenate([col['home_id'], col['away_id']])
+        linhas = np.concatenate([np.arange(n)] * 2)
+        ordem = np.lexsort((-col['data'][linhas], times))
+        inicio = np.r_[0, np.flatnonzero(np.diff(times[ordem])) + 1]
+        recencia = np.arange(len(ordem)) - np.repeat(inicio, np.diff(np.r_[inicio, len(ordem)]))
+        selecionadas = np.unique(linhas[ordem][recencia < por_time])
+        selecionadas = selecionadas[np.argsort(col['data'][selecionadas], kind='stable')]
+
+        for i, jogo in zip(selecionadas, self.jogos_como_ultimos(selecionadas)):
+            store.registrar_jogo(jogo, _formatar_estatisticas({nome: int(coluna[i]) for nome, coluna in col.items()}))
+        return len(selecionadas)
+
+    def importar_do_cache(self, itens_ultimos_jogos: Dict, itens_stats: Dict) -> List[str]:
+        """
+        Importa em lote o que ainda está como JSON no cache (ultimos_jogos_* + stats_jogo_*).
+
+        Returns:
+            list: Chaves stats_jogo_* que agora estão no histórico (podem sair do cache)
+        """
+        importadas = {}
+        for jogos in itens_ultimos_jogos.values():
+            for jogo in jogos or []:
+                chave = f"stats_jogo_{jogo.get('fixture_id')}"
+                stats = itens_stats.get(chave)
+                if chave not in importadas and stats and linha_do_jogo(jogo, stats) is not None:
+                    self.registrar(jogo, stats)
+                    importadas[chave] = True
+        self.flush()
+        return list(importadas)
+
+
+historico = HistoricoPartidas()
+
+
+async def periodic_flush(interval_minutes=5):
+    """Grava periodicamente os jogos pendentes (um append em lote por ciclo)"""
+    print(f"📚 Histórico de jogos: flush a cada {interval_minutes} minutos")
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            await asyncio.to_thread(historico.flush)
+        except Exception as e:
+            print(f"❌ HISTÓRICO: erro no flush periódico: {e}")
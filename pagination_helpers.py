@@ -1,57 +1,99 @@
 import json
-from typing import List, Dict, Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Tuple
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from db_manager import DatabaseManager
 
-def get_paginated_analyses(
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def encode_cursor(analysis_row: Dict) -> str:
+    """Codifica (created_at, id) de uma linha como '<epoch em µs>_<id>' para caber no callback_data"""
+    created_at = analysis_row['created_at']
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    micros = (created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}_{analysis_row['id']}"
+
+def decode_cursor(micros: str, row_id: str) -> Tuple[datetime, int]:
+    return _EPOCH + timedelta(microseconds=int(micros)), int(row_id)
+
+def parse_pagination_callback(data: str) -> Dict:
+    """
+    Interpreta o callback_data de paginação.
+    
+    Formato: page_<n|p>_<página>_<epoch µs>_<id>_<analysis_type>
+    O tipo vai por último porque pode conter '_' (ex: goals_only).
+    
+    Returns:
+        Dict com 'analysis_type', 'page', 'cursor' e 'direcao'
+    """
+    _, direcao, page, micros, row_id, analysis_type = data.split('_', 5)
+    return {
+        'analysis_type': analysis_type,
+        'page': int(page),
+        'cursor': decode_cursor(micros, row_id),
+        'direcao': 'prev' if direcao == 'p' else 'next'
+    }
+
+async def get_paginated_analyses(
     db_manager: DatabaseManager,
     user_id: int,
     analysis_type: str,
     page: int = 0,
-    limit: int = 5
+    limit: int = 5,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    direcao: str = 'next'
 ) -> Dict:
     """
-    Recupera análises paginadas do banco de dados.
+    Recupera análises paginadas do banco (keyset, sem bloquear o event loop).
     
     Args:
         db_manager: Instância do DatabaseManager
         user_id: ID do usuário
         analysis_type: Tipo de análise
-        page: Número da página (começa em 0)
+        page: Número da página (começa em 0) - usado só para exibição
         limit: Limite de resultados por página
+        cursor: (created_at, id) da borda da página anterior; None = primeira página
+        direcao: 'next' ou 'prev' em relação ao cursor
         
     Returns:
-        Dict com 'analyses', 'total', 'has_more', 'current_page'
+        Dict com 'analyses', 'total', 'has_more', 'current_page', 'total_pages',
+        'first_cursor' e 'last_cursor'
     """
-    offset = page * limit
-    
-    analyses = db_manager.get_daily_analyses(
+    resultado = await db_manager.aio.get_daily_analyses_keyset(
         user_id=user_id,
         analysis_type=analysis_type,
-        offset=offset,
+        cursor=cursor,
+        direcao=direcao,
         limit=limit
     )
     
-    total = db_manager.count_daily_analyses(
-        user_id=user_id,
-        analysis_type=analysis_type
-    )
+    analyses = resultado['analyses']
+    total = resultado['total']
     
-    has_more = (offset + len(analyses)) < total
+    if cursor is not None and direcao == 'prev':
+        # Voltando: sempre existe página seguinte (a que o usuário acabou de ver)
+        has_more = True
+    else:
+        has_more = resultado['has_beyond']
     
     return {
         'analyses': analyses,
         'total': total,
         'has_more': has_more,
         'current_page': page,
-        'total_pages': (total + limit - 1) // limit if total > 0 else 0
+        'total_pages': (total + limit - 1) // limit if total > 0 else 0,
+        'first_cursor': encode_cursor(analyses[0]) if analyses else None,
+        'last_cursor': encode_cursor(analyses[-1]) if analyses else None
     }
 
 def create_pagination_keyboard(
     current_page: int,
     has_more: bool,
     analysis_type: str,
-    total_pages: int
+    total_pages: int,
+    first_cursor: Optional[str] = None,
+    last_cursor: Optional[str] = None
 ) -> InlineKeyboardMarkup:
     """
     Cria teclado inline com botões de paginação.
@@ -61,6 +103,8 @@ def create_pagination_keyboard(
         has_more: Se há mais resultados
         analysis_type: Tipo de análise
         total_pages: Total de páginas
+        first_cursor: Cursor da primeira linha da página (para "Anterior")
+        last_cursor: Cursor da última linha da página (para "Próxima")
         
     Returns:
         InlineKeyboardMarkup com botões de navegação
@@ -68,11 +112,11 @@ def create_pagination_keyboard(
     keyboard = []
     nav_buttons = []
     
-    if current_page > 0:
+    if current_page > 0 and first_cursor:
         nav_buttons.append(
             InlineKeyboardButton(
                 "◀️ Anterior",
-                callback_data=f"page_{analysis_type}_{current_page - 1}"
+                callback_data=f"page_p_{current_page - 1}_{first_cursor}_{analysis_type}"
             )
         )
     
@@ -83,11 +127,11 @@ def create_pagination_keyboard(
         )
     )
     
-    if has_more:
+    if has_more and last_cursor:
         nav_buttons.append(
             InlineKeyboardButton(
                 "Próxima ▶️",
-                callback_data=f"page_{analysis_type}_{current_page + 1}"
+                callback_data=f"page_n_{current_page + 1}_{last_cursor}_{analysis_type}"
             )
         )
     
@@ -0,0 +1,108 @@
+# picks_index.py
+"""
+Índice em memória com TODOS os palpites do dia (slate), compartilhado por
+Aposta Simples, Múltipla e Bingo.
+
+Construído/atualizado em background pelo main.py: cada jogo guarda uma "impressão digital"
+(odds ou snapshot do banco) e só é recalculado quando ela muda. Os botões apenas leem daqui.
+"""
+
+import json
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Iterable
+
+
+def calcular_fingerprint(dados) -> str:
+    """Hash estável de qualquer estrutura JSON (odds, snapshot...) para detectar mudanças"""
+    serializado = json.dumps(dados, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(serializado.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _confianca(item: Dict) -> float:
+    return item['palpite'].get('confianca', 0)
+
+
+class PicksIndex:
+    """
+    Palpites do slate agrupados por jogo, com visão ordenada por confiança (maior primeiro).
+    Itens no mesmo formato de coletar_todos_palpites_disponiveis():
+    {jogo, palpite, mercado, time_casa, time_fora, liga, horario}
+    """
+
+    def __init__(self):
+        self.data_slate: Optional[str] = None
+        self.pronto = False
+        self.atualizado_em: Optional[datetime] = None
+        self._palpites_por_fixture: Dict[int, List[Dict]] = {}
+        self._fingerprints: Dict[int, str] = {}
+        self._ordenados: Optional[List[Dict]] = None
+
+    def resetar(self, data_slate: str):
+        """Novo dia: descarta tudo"""
+        self.data_slate = data_slate
+        self.pronto = False
+        self._palpites_por_fixture = {}
+        self._fingerprints = {}
+        self._ordenados = None
+
+    def fingerprint(self, fixture_id: int) -> Optional[str]:
+        return self._fingerprints.get(fixture_id)
+
+    def atualizar_fixture(self, fixture_id: int, palpites: List[Dict], fingerprint: str):
+        """Substitui os palpites de um jogo (atualização incremental)"""
+        self._palpites_por_fixture[fixture_id] = sorted(palpites, key=_confianca, reverse=True)
+        self._fingerprints[fixture_id] = fingerprint
+        self._ordenados = None
+
+    def manter_apenas(self, fixture_ids: Iterable[int]):
+        """Remove jogos que saíram do slate"""
+        manter = set(fixture_ids)
+        for fixture_id in list(self._palpites_por_fixture):
+            if fixture_id not in manter:
+                del self._palpites_por_fixture[fixture_id]
+                self._fingerprints.pop(fixture_id, None)
+                self._ordenados = None
+
+    def marcar_pronto(self):
+        self.pronto = True
+        self.atualizado_em = datetime.now()
+
+    def invalidar(self, fixture_id: Optional[int] = None):
+        """
+        Força recálculo na próxima atualização (de um jogo ou de todos).
+        Os palpites atuais continuam servindo os botões até lá.
+        """
+        if fixture_id is None:
+            self._fingerprints.clear()
+        else:
+            self._fingerprints.pop(fixture_id, None)
+
+    def palpites_ordenados(self) -> List[Dict]:
+        """Todos os palpites do slate, por confiança decrescente (a lista é cacheada até a próxima mudança)"""
+        if self._ordenados is None:
+            todos = [p for palpites in self._palpites_por_fixture.values() for p in palpites]
+            todos.sort(key=_confianca, reverse=True)
+            self._ordenados = todos
+        return self._ordenados
+
+    def palpites_do_jogo(self, fixture_id: int) -> List[Dict]:
+        return self._palpites_por_fixture.get(fixture_id, [])
+
+    def por_jogo_e_mercado(self) -> Dict[int, Dict[str, List[Dict]]]:
+        """{fixture_id: {mercado: [palpites por confiança decrescente]}}"""
+        agrupado = {}
+        for fixture_id, palpites in self._palpites_por_fixture.items():
+            mercados = agrupado.setdefault(fixture_id, {})
+            for p in palpites:
+                mercados.setdefault(p['mercado'], []).append(p)
+        return agrupado
+
+    def get_stats(self) -> Dict:
+        return {
+            'data_slate': self.data_slate,
+            'pronto': self.pronto,
+            'jogos': len(self._palpites_por_fixture),
+            'palpites': sum(len(p) for p in self._palpites_por_fixture.values()),
+            'atualizado_em': self.atualizado_em.strftime('%H:%M:%S') if self.atualizado_em else None
+        }
@@ -1,10 +1,12 @@
 -- Schema para o banco de dados PostgreSQL do AnalytipsBot
--- Execute este script no seu banco de dados PostgreSQL
+-- REFERÊNCIA do schema final (após todas as MIGRACOES de db_manager.py). Não aplique à mão:
+-- o bot cria e atualiza o banco com DatabaseManager.garantir_schema(), registrando as versões em schema_migrations
 
 -- Tabela principal de análises de jogos (cache)
+-- Particionada por dia (Brasília); as partições diárias são criadas/removidas pelo DatabaseManager
 CREATE TABLE IF NOT EXISTS analises_jogos (
-    id SERIAL PRIMARY KEY,
-    fixture_id INTEGER UNIQUE NOT NULL,
+    id SERIAL,
+    fixture_id INTEGER NOT NULL,
     data_jogo TIMESTAMP WITH TIME ZONE NOT NULL,
     liga VARCHAR(255),
     time_casa VARCHAR(255),
@@ -18,36 +20,80 @@ CREATE TABLE IF NOT EXISTS analises_jogos (
     analise_resultado JSONB,
     analise_cartoes JSONB,
     analise_contexto JSONB,
+    analise_finalizacoes JSONB,
+    analise_handicaps JSONB,
+    analysis_summary JSONB,
+    versao_modelo VARCHAR(50),
     palpites_totais INTEGER DEFAULT 0,
     confianca_media DECIMAL(3,1) DEFAULT 0,
     data_analise TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     atualizado_em TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, data_jogo),
+    UNIQUE (fixture_id, data_jogo)
+) PARTITION BY RANGE (data_jogo);
+
+CREATE TABLE IF NOT EXISTS analises_jogos_default PARTITION OF analises_jogos DEFAULT;
 
 -- Índices para performance
 CREATE INDEX IF NOT EXISTS idx_analises_jogos_fixture_id ON analises_jogos(fixture_id);
 CREATE INDEX IF NOT EXISTS idx_analises_jogos_data_jogo ON analises_jogos(data_jogo);
 CREATE INDEX IF NOT EXISTS idx_analises_jogos_atualizado_em ON analises_jogos(atualizado_em);
 
--- Nova tabela para sistema de fila de análises diárias
+-- Dossiers do sistema de fila: gravados UMA vez (comprimidos), endereçados pelo hash do conteúdo
+CREATE TABLE IF NOT EXISTS daily_dossiers (
+    content_hash VARCHAR(40) PRIMARY KEY,
+    fixture_id INTEGER NOT NULL,
+    analysis_type VARCHAR(50) NOT NULL,
+    dossier_zlib BYTEA NOT NULL,
+    tamanho_bytes INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_daily_dossiers_created_at ON daily_dossiers(created_at);
+
+-- Nova tabela para sistema de fila de análises diárias (referência fina por usuário -> daily_dossiers)
 CREATE TABLE IF NOT EXISTS daily_analyses (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     fixture_id INTEGER NOT NULL,
     analysis_type VARCHAR(50) NOT NULL,
-    dossier_json TEXT NOT NULL,
+    dossier_hash VARCHAR(40) REFERENCES daily_dossiers(content_hash),
+    dossier_json TEXT,
     user_id BIGINT NOT NULL,
+    data_ref DATE NOT NULL DEFAULT CURRENT_DATE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    CONSTRAINT daily_analyses_unique UNIQUE (fixture_id, analysis_type, user_id)
-);
+    PRIMARY KEY (id, data_ref),
+    UNIQUE (fixture_id, analysis_type, user_id, data_ref)
+) PARTITION BY RANGE (data_ref);
+
+CREATE TABLE IF NOT EXISTS daily_analyses_default PARTITION OF daily_analyses DEFAULT;
 
 -- Índices para performance na tabela daily_analyses
-CREATE INDEX IF NOT EXISTS idx_daily_analyses_user_type ON daily_analyses(user_id, analysis_type);
+-- Paginação por keyset: índice casa exatamente com o ORDER BY (created_at DESC, id DESC)
+CREATE INDEX IF NOT EXISTS idx_daily_analyses_keyset ON daily_analyses(user_id, analysis_type, created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_daily_analyses_created_at ON daily_analyses(created_at);
 CREATE INDEX IF NOT EXISTS idx_daily_analyses_fixture_id ON daily_analyses(fixture_id);
+CREATE INDEX IF NOT EXISTS idx_daily_analyses_dossier_hash ON daily_analyses(dossier_hash);
+
+-- Cache L2 compartilhado entre processos (cache_manager)
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value JSONB NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    gen JSONB
+);
+
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at ON cache_entries(expires_at);
 
 -- Comentários para documentação
 COMMENT ON TABLE analises_jogos IS 'Cache de análises completas de jogos processados';
+COMMENT ON COLUMN analises_jogos.versao_modelo IS 'Versão do modelo que gerou o snapshot (linhas de outra versão são ignoradas)';
 COMMENT ON TABLE daily_analyses IS 'Análises processadas em batch pelo sistema de fila assíncrona';
 COMMENT ON COLUMN daily_analyses.analysis_type IS 'Tipo: full, goals_only, corners_only, btts_only, result_only, simple_bet, multiple_bet, bingo';
-COMMENT ON COLUMN daily_analyses.dossier_json IS 'JSON completo do dossier de análise gerado pelo master_analyzer';
+COMMENT ON COLUMN daily_analyses.dossier_json IS 'LEGADO: JSON completo por usuário (novas linhas usam dossier_hash)';
+COMMENT ON COLUMN daily_analyses.data_ref IS 'Dia (Brasília) da análise - chave das partições diárias';
+COMMENT ON COLUMN daily_analyses.dossier_hash IS 'Hash do dossier em daily_dossiers (compartilhado entre usuários)';
+COMMENT ON TABLE daily_dossiers IS 'Dossiers do master_analyzer, comprimidos com zlib e gravados uma única vez por conteúdo';
+COMMENT ON TABLE cache_entries IS 'Cache L2 compartilhado: respostas da API e análises derivadas, com expiração';
+COMMENT ON COLUMN cache_entries.gen IS 'Geração de cada namespace/escopo da entrada no momento do set() ({namespace: geração})';
@@ -0,0 +1,61 @@
+# standings_index.py
+"""
+Classificação da liga indexada.
+
+ClassificacaoIndexada continua sendo a lista de /standings (mesmas linhas, serializa igual
+em cache/snapshot e aceita len()/iteração), mas monta uma vez os índices por id e por nome
+do time: posição, pontos e saldo saem em O(1), sem varrer a tabela a cada consulta.
+A busca é por id primeiro (nomes podem divergir entre endpoints) e por nome como reserva.
+"""
+
+from typing import Dict, Optional
+
+
+class ClassificacaoIndexada(list):
+    """Linhas da classificação (somente leitura) + índices por id e por nome"""
+
+    def __init__(self, linhas=None):
+        super().__init__(linhas or [])
+        self.por_id: Dict[int, Dict] = {}
+        self.por_nome: Dict[str, Dict] = {}
+        for linha in self:
+            team = linha.get('team', {})
+            if team.get('id') is not None:
+                self.por_id.setdefault(team['id'], linha)
+            if team.get('name'):
+                self.por_nome.setdefault(team['name'], linha)
+
+    @property
+    def total_times(self) -> int:
+        return len(self)
+
+    def linha(self, team_id: Optional[int] = None, team_name: Optional[str] = None) -> Optional[Dict]:
+        """Linha do time na tabela (por id; pelo nome se o id não estiver nela)"""
+        if team_id is not None and team_id in self.por_id:
+            return self.por_id[team_id]
+        return self.por_nome.get(team_name) if team_name else None
+
+    def posicao(self, team_id: Optional[int] = None, team_name: Optional[str] = None, padrao="N/A"):
+        linha = self.linha(team_id, team_name)
+        return linha.get('rank', padrao) if linha else padrao
+
+    def pontos(self, team_id: Optional[int] = None, team_name: Optional[str] = None) -> Optional[int]:
+        linha = self.linha(team_id, team_name)
+        return linha.get('points') if linha else None
+
+    def saldo_gols(self, team_id: Optional[int] = None, team_name: Optional[str] = None) -> Optional[int]:
+        linha = self.linha(team_id, team_name)
+        return linha.get('goalsDiff') if linha else None
+
+    def forma(self, team_id: Optional[int] = None, team_name: Optional[str] = None, padrao="N/A"):
+        linha = self.linha(team_id, team_name)
+        return linha.get('form', padrao) if linha else padrao
+
+
+def indexar_classificacao(classificacao) -> Optional[ClassificacaoIndexada]:
+    """Lista da API/snapshot → ClassificacaoIndexada (já indexada passa direto; vazia vira None)"""
+    if not classificacao:
+        return None
+    if isinstance(classificacao, ClassificacaoIndexada):
+        return classificacao
+    return ClassificacaoIndexada(classificacao)
@@ -0,0 +1,320 @@
+# team_features.py
+"""
+Feature store por time: uma linha compacta (array) por jogo FINALIZADO e agregados
+rolantes (últimos JANELA_ROLANTE jogos, total/casa/fora) mantidos incrementalmente.
+
+Alimentado quando as estatísticas de um jogo finalizado chegam (buscar_estatisticas_jogo).
+O master_analyzer e o fallback de buscar_estatisticas_gerais_time leem daqui em vez de
+reagregar os payloads da API a cada análise. Persistido localmente em ARQUIVO_FEATURES.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+ARQUIVO_FEATURES = "team_features.npz"
+CAPACIDADE_POR_TIME = 20  # Linhas guardadas por time (as mais recentes)
+JANELA_ROLANTE = 5        # Jogos cobertos pelos agregados rolantes
+
+CAMPOS = (
+    'gols_pro', 'gols_contra',
+    'cantos_pro', 'cantos_contra',
+    'finalizacoes_pro', 'finalizacoes_contra',
+    'no_gol_pro', 'no_gol_contra',
+    'amarelos_pro', 'amarelos_contra',
+    'vermelhos_pro', 'vermelhos_contra',
+    'vitorias'
+)
+IDX = {campo: i for i, campo in enumerate(CAMPOS)}
+
+# Nome da estatística em /fixtures/statistics → (campo "pro", campo "contra")
+_ESTATISTICAS_API = {
+    'Corner Kicks': ('cantos_pro', 'cantos_contra'),
+    'Total Shots': ('finalizacoes_pro', 'finalizacoes_contra'),
+    'Shots on Goal': ('no_gol_pro', 'no_gol_contra'),
+    'Yellow Cards': ('amarelos_pro', 'amarelos_contra'),
+    'Red Cards': ('vermelhos_pro', 'vermelhos_contra'),
+}
+
+_MANDOS = ('total', 'casa', 'fora')
+
+
+def _numero(valor) -> float:
+    try:
+        return float(int(valor or 0))
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def linhas_do_jogo(jogo: Dict, stats: Dict) -> Dict[int, np.ndarray]:
+    """
+    Converte um jogo finalizado (formato de buscar_ultimos_jogos_time) + estatísticas
+    (formato de buscar_estatisticas_jogo) em uma linha por time: {team_id: array(CAMPOS)}
+    """
+    teams = jogo.get('teams', {})
+    gols = {'home': _numero(jogo.get('home_goals')), 'away': _numero(jogo.get('away_goals'))}
+    linhas = {}
+    for lado, oponente in (('home', 'away'), ('away', 'home')):
+        team_id = teams.get(lado, {}).get('id')
+        if team_id is None:
+            continue
+        linha = np.zeros(len(CAMPOS))
+        linha[IDX['gols_pro']] = gols[lado]
+        linha[IDX['gols_contra']] = gols[oponente]
+        for nome_api, (campo_pro, campo_contra) in _ESTATISTICAS_API.items():
+            linha[IDX[campo_pro]] = _numero(stats.get(lado, {}).get(nome_api))
+            linha[IDX[campo_contra]] = _numero(stats.get(oponente, {}).get(nome_api))
+        linha[IDX['vitorias']] = float(gols[lado] > gols[oponente])
+        linhas[team_id] = linha
+    return linhas
+
+
+class FeaturesTime:
+    """Linhas de um time (ordem cronológica) + somas rolantes da janela por mando"""
+
+    __slots__ = ('fixture_ids', 'datas', 'em_casa', 'valores', 'somas', 'jogos')
+
+    def __init__(self):
+        self.fixture_ids: List[int] = []
+        self.datas: List[str] = []
+        self.em_casa: List[bool] = []
+        self.valores = np.zeros((0, len(CAMPOS)))
+        self.somas = {mando: np.zeros(len(CAMPOS)) for mando in _MANDOS}
+        self.jogos = {mando: 0 for mando in _MANDOS}
+
+    def _acumular(self, i: int, sinal: int):
+        for mando in ('total', 'casa' if self.em_casa[i] else 'fora'):
+            self.somas[mando] += sinal * self.valores[i]
+            self.jogos[mando] += sinal
+
+    def recalcular_janela(self):
+        for mando in _MANDOS:
+            self.somas[mando][:] = 0.0
+            self.jogos[mando] = 0
+        for i in range(max(0, len(self.fixture_ids) - JANELA_ROLANTE), len(self.fixture_ids)):
+            self._acumular(i, +1)
+
+    def adicionar(self, fixture_id: int, data: str, em_casa: bool, linha: np.ndarray) -> bool:
+        """Insere uma linha; retorna False se o jogo já estava registrado"""
+        if fixture_id in self.fixture_ids:
+            return False
+
+        if not self.datas or data >= self.datas[-1]:
+            # Caso comum (jogo mais recente): atualização incremental da janela
+            self.fixture_ids.append(fixture_id)
+            self.datas.append(data)
+            self.em_casa.append(em_casa)
+            self.valores = np.vstack([self.valores, linha])
+            self._acumular(len(self.fixture_ids) - 1, +1)
+            if len(self.fixture_ids) > JANELA_ROLANTE:
+                self._acumular(len(self.fixture_ids) - 1 - JANELA_ROLANTE, -1)
+        else:
+            # Jogo antigo chegando atrasado: inserir na posição e recalcular a janela
+            pos = next(i for i, d in enumerate(self.datas) if d > data)
+            self.fixture_ids.insert(pos, fixture_id)
+            self.datas.insert(pos, data)
+            self.em_casa.insert(pos, em_casa)
+            self.valores = np.insert(self.valores, pos, linha, axis=0)
+            self.recalcular_janela()
+
+        excesso = len(self.fixture_ids) - CAPACIDADE_POR_TIME
+        if excesso > 0:  # As mais antigas já estão fora da janela
+            del self.fixture_ids[:excesso], self.datas[:excesso], self.em_casa[:excesso]
+            self.valores = self.valores[excesso:]
+        return True
+
+    def indices(self, fixture_ids: Iterable[int]) -> List[int]:
+        posicao = {fid: i for i, fid in enumerate(self.fixture_ids)}
+        return [posicao[fid] for fid in fixture_ids if fid in posicao]
+
+    def janela(self) -> List[int]:
+        return self.fixture_ids[-JANELA_ROLANTE:]
+
+
+class TeamFeatureStore:
+    """Feature store de todos os times, persistida em disco"""
+
+    def __init__(self, arquivo: str = ARQUIVO_FEATURES):
+        self.arquivo = arquivo
+        self._times: Dict[int, FeaturesTime] = {}
+        self._lock = threading.Lock()
+        self._sujo = False
+
+    # ---------- Escrita ----------
+
+    def registrar_jogo(self, jogo: Dict, stats: Dict) -> int:
+        """Registra um jogo finalizado para os dois times. Retorna quantas linhas eram novas."""
+        fixture_id = jogo.get('fixture_id')
+        if not fixture_id or not stats:
+            return 0
+        home_id = jogo.get('teams', {}).get('home', {}).get('id')
+        data = str(jogo.get('date') or '')
+        novas = 0
+        with self._lock:
+            for team_id, linha in linhas_do_jogo(jogo, stats).items():
+                features = self._times.setdefault(team_id, FeaturesTime())
+                novas += features.adicionar(fixture_id, data, team_id == home_id, linha)
+            self._sujo = self._sujo or novas > 0
+        return novas
+
+    # ---------- Leitura ----------
+
+    def vazia(self) -> bool:
+        return not self._times
+
+    def tem_jogo(self, team_id: int, fixture_id: int) -> bool:
+        features = self._times.get(team_id)
+        return features is not None and fixture_id in features.fixture_ids
+
+    def linha(self, team_id: int, fixture_id: int) -> Optional[Dict[str, float]]:
+        """Estatísticas do time em um jogo: {campo: valor} ou None"""
+        features = self._times.get(team_id)
+        if features is None:
+            return None
+        indices = features.indices([fixture_id])
+        if not indices:
+            return None
+        return dict(zip(CAMPOS, features.valores[indices[0]].tolist()))
+
+    def _somas(self, features: FeaturesTime, fixture_ids: Optional[Sequence[int]]):
+        """Somas por mando: agregado rolante se a seleção é a própria janela, senão soma das linhas"""
+        if fixture_ids is None or set(fixture_ids) == set(features.janela()):
+            return features.somas, features.jogos
+        indices = features.indices(fixture_ids)
+        casa = [i for i in indices if features.em_casa[i]]
+        fora = [i for i in indices if not features.em_casa[i]]
+        somas = {
+            'total': features.valores[indices].sum(axis=0),
+            'casa': features.valores[casa].sum(axis=0),
+            'fora': features.valores[fora].sum(axis=0),
+        }
+        return somas, {'total': len(indices), 'casa': len(casa), 'fora': len(fora)}
+
+    def medias_por_mando(self, team_id: int, fixture_ids: Optional[Sequence[int]] = None) -> Optional[Dict]:
+        """
+        Médias por jogo em casa e fora (janela rolante ou jogos informados).
+
+        Returns:
+            dict: {'casa': {campo: média}, 'fora': {...}, 'jogos_casa', 'jogos_fora',
+                   'vitorias_casa', 'vitorias_fora'} ou None se o time não tem linhas
+        """
+        features = self._times.get(team_id)
+        if features is None or not features.fixture_ids:
+            return None
+        somas, jogos = self._somas(features, fixture_ids)
+        resultado = {}
+        for mando in ('casa', 'fora'):
+            n = jogos[mando]
+            medias = somas[mando] / n if n else np.zeros(len(CAMPOS))
+            resultado[mando] = dict(zip(CAMPOS, medias.tolist()))
+            resultado[f'jogos_{mando}'] = n
+            resultado[f'vitorias_{mando}'] = int(round(somas[mando][IDX['vitorias']]))
+        return resultado
+
+    def media_ponderada(self, team_id: int, fixture_ids: Sequence[int], pesos: Sequence[float]) -> Optional[Dict[str, float]]:
+        """
+        Métricas ponderadas (ex: peso = QSC do adversário / 50) sobre os jogos informados.
+        Mesmo formato de _calculate_weighted_metrics; cartões = amarelos + 3 × vermelhos.
+        """
+        features = self._times.get(team_id)
+        if features is None:
+            return None
+        posicao = {fid: i for i, fid in enumerate(features.fixture_ids)}
+        pares = [(posicao[fid], peso) for fid, peso in zip(fixture_ids, pesos) if fid in posicao]
+        if not pares:
+            return None
+        indices, w = zip(*pares)
+        w = np.asarray(w, dtype=float)
+        if w.sum() == 0:
+            return None
+        media = (w @ features.valores[list(indices)]) / w.sum()
+        return {
+            'weighted_corners_for': float(media[IDX['cantos_pro']]),
+            'weighted_corners_against': float(media[IDX['cantos_contra']]),
+            'weighted_shots_for': float(media[IDX['no_gol_pro']]),
+            'weighted_shots_against': float(media[IDX['no_gol_contra']]),
+            'weighted_cards_for': float(media[IDX['amarelos_pro']] + 3 * media[IDX['vermelhos_pro']]),
+            'weighted_cards_against': float(media[IDX['amarelos_contra']] + 3 * media[IDX['vermelhos_contra']])
+        }
+
+    # ---------- Persistência ----------
+
+    def salvar_em_disco(self, forcar: bool = False):
+        """Grava todas as linhas em um .npz colunar (escrita atômica)"""
+        with self._lock:
+            if not (self._sujo or forcar):
+                return
+            team_ids, fixture_ids, datas, em_casa, valores = [], [], [], [], []
+            for team_id, features in self._times.items():
+                n = len(features.fixture_ids)
+                team_ids.extend([team_id] * n)
+                fixture_ids.extend(features.fixture_ids)
+                datas.extend(features.datas)
+                em_casa.extend(features.em_casa)
+                valores.append(features.valores)
+            self._sujo = False
+
+        temporario = f"{self.arquivo}.tmp.npz"
+        try:
+            np.savez_compressed(
+                temporario,
+                team_id=np.asarray(team_ids, dtype=np.int64),
+                fixture_id=np.asarray(fixture_ids, dtype=np.int64),
+                data=np.asarray(datas, dtype=str),
+                em_casa=np.asarray(em_casa, dtype=bool),
+                valores=np.vstack(valores) if valores else np.zeros((0, len(CAMPOS))),
+                campos=np.asarray(CAMPOS)
+            )
+            os.replace(temporario, self.arquivo)
+            print(f"💾 FEATURE STORE: {len(fixture_ids)} linhas de {len(self._times)} times salvas")
+        except Exception as e:
+            self._sujo = True
+            print(f"❌ ERRO ao salvar feature store: {e}")
+
+    def carregar_do_disco(self):
+        """Reconstrói as linhas e as janelas rolantes a partir do .npz"""
+        if not os.path.exists(self.arquivo):
+            return
+        try:
+            with np.load(self.arquivo, allow_pickle=False) as dados:
+                if tuple(dados['campos'].tolist()) != CAMPOS:
+                    print("⚠️ FEATURE STORE: formato antigo em disco, ignorando")
+                    return
+                team_ids = dados['team_id']
+                fixture_ids = dados['fixture_id']
+                datas = dados['data']
+                em_casa = dados['em_casa']
+                valores = dados['valores']
+        except Exception as e:
+            print(f"❌ ERRO ao carregar feature store: {e}")
+            return
+
+        times: Dict[int, FeaturesTime] = {}
+        for team_id in np.unique(team_ids):
+            linhas = np.flatnonzero(team_ids == team_id)
+            linhas = linhas[np.argsort(datas[linhas], kind='stable')][-CAPACIDADE_POR_TIME:]
+            features = FeaturesTime()
+            features.fixture_ids = fixture_ids[linhas].tolist()
+            features.datas = datas[linhas].tolist()
+            features.em_casa = em_casa[linhas].tolist()
+            features.valores = valores[linhas].astype(float)
+            features.recalcular_janela()
+            times[int(team_id)] = features
+
+        with self._lock:
+            self._times = times
+            self._sujo = False
+        print(f"✅ FEATURE STORE: {len(fixture_ids)} linhas de {len(times)} times carregadas")
+
+
+store = TeamFeatureStore()
+
+
+async def periodic_saver(interval_minutes=5):
+    """Salva a feature store periodicamente (só grava se houve jogo novo)"""
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        await asyncio.to_thread(store.salvar_em_disco)
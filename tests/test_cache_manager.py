@@ -0,0 +1,114 @@
+"""
+Testes unitários do cache L1/L2 com gerações (cache_manager.py).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import cache_manager
+
+
+class _L2EmMemoria:
+    """cache_entries em memória: grava e devolve só as colunas que o DatabaseManager persiste"""
+
+    COLUNAS = ("value", "expires_at", "created_at", "gen")
+
+    def __init__(self):
+        self.linhas = {}
+
+    def cache_l2_salvar_lote(self, entries):
+        for key, data in entries.items():
+            self.linhas[key] = json.loads(json.dumps({c: data.get(c) for c in self.COLUNAS}))
+        return len(entries)
+
+    def cache_l2_buscar(self, keys):
+        return {k: dict(self.linhas[k]) for k in keys if k in self.linhas}
+
+    def cache_l2_carregar_validos(self):
+        return {k: dict(v) for k, v in self.linhas.items()}
+
+    def publicar_invalidacao_cache(self, canal, payload):
+        pass
+
+
+class TestGeracoesNoL2(unittest.TestCase):
+    """bump_generation precisa alcançar as entradas que já estão no L2"""
+
+    def setUp(self):
+        self._estado = (cache_manager._cache, cache_manager._generations, cache_manager._l2_backend)
+        cache_manager._cache = {}
+        cache_manager._generations = {}
+        cache_manager._l2_pending.clear()
+        cache_manager._l2_backend = self.l2 = _L2EmMemoria()
+
+    def tearDown(self):
+        cache_manager._l2_pending.clear()
+        cache_manager._cache, cache_manager._generations, cache_manager._l2_backend = self._estado
+
+    def _gravar_e_esquecer_l1(self, key, value, scopes=None):
+        cache_manager.set(key, value, scopes=scopes)
+        cache_manager.flush_l2()
+        cache_manager.evict_local([key])
+
+    def test_entrada_da_geracao_atual_volta_do_l2(self):
+        cache_manager.bump_generation(cache_manager.NAMESPACE_RENDER)
+        self._gravar_e_esquecer_l1('analise_jogo_10', {'ok': 1})
+        self.assertEqual(cache_manager.get('analise_jogo_10'), {'ok': 1})
+
+    def test_bump_do_namespace_invalida_o_l2(self):
+        self._gravar_e_esquecer_l1('analise_jogo_10', {'ok': 1})
+        cache_manager.bump_generation(cache_manager.NAMESPACE_RENDER)
+        self.assertIsNone(cache_manager.get('analise_jogo_10'))
+        self.assertEqual(cache_manager.preload_from_l2(), 0)
+
+    def test_bump_do_escopo_invalida_o_l2(self):
+        escopo = cache_manager.fixture_scope(10)
+        self._gravar_e_esquecer_l1('analise_jogo_10', {'ok': 1}, scopes=[escopo])
+        self._gravar_e_esquecer_l1('analise_jogo_11', {'ok': 2}, scopes=[cache_manager.fixture_scope(11)])
+        cache_manager.bump_generation(escopo)
+        self.assertEqual(cache_manager.get_many(['analise_jogo_10', 'analise_jogo_11']), {'analise_jogo_11': {'ok': 2}})
+
+    def test_aget_busca_o_miss_no_l2(self):
+        self._gravar_e_esquecer_l1('stats_1_71', {'gols': 2})
+        self._gravar_e_esquecer_l1('stats_2_71', {'gols': 1})
+        self.assertEqual(asyncio.run(cache_manager.aget('stats_1_71')), {'gols': 2})
+        self.assertEqual(
+            asyncio.run(cache_manager.aget_many(['stats_1_71', 'stats_2_71', 'stats_3_71'])),
+            {'stats_1_71': {'gols': 2}, 'stats_2_71': {'gols': 1}}
+        )
+
+
+class TestTTLAdaptativo(unittest.TestCase):
+    """Só respostas reais da API (record_fetch) alimentam a taxa de refetch inalterado"""
+
+    def setUp(self):
+        self._estado = (cache_manager._cache, cache_manager._payload_hashes, cache_manager._family_stats)
+        cache_manager._cache = {}
+        cache_manager._payload_hashes = {}
+        cache_manager._family_stats = {}
+
+    def tearDown(self):
+        cache_manager._cache, cache_manager._payload_hashes, cache_manager._family_stats = self._estado
+
+    def test_visao_derivada_reconstruida_nao_conta_refetch(self):
+        for _ in range(3):
+            cache_manager.set('stats_1_71', {'gols': 2})
+        self.assertEqual(cache_manager._family_stats_for(cache_manager.get_family_for_key('stats_1_71'))['refetches'], 0)
+
+    def test_refetch_da_api_conta(self):
+        chave = 'raw_teams/statistics?league=71&team=1'
+        for _ in range(3):
+            cache_manager.record_fetch(chave, [{'gols': 2}])
+            cache_manager.set(chave, [{'gols': 2}])
+        stats = cache_manager._family_stats_for(cache_manager.get_family_for_key(chave))
+        self.assertEqual((stats['refetches'], stats['inalterados']), (2, 2))
+        self.assertEqual(cache_manager._cache[chave]['hash'], cache_manager._payload_hashes[chave])
+
+
+if __name__ == '__main__':
+    unittest.main()
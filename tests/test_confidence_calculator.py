@@ -0,0 +1,107 @@
+"""
+Testes unitários do motor de probabilidades do confidence_calculator.
+Garante que a API vetorizada bate com o cálculo Poisson escalar original.
+"""
+
+import math
+import unittest
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from analysts.confidence_calculator import (
+    poisson_over_probabilities,
+    poisson_over_under_grid,
+    poisson_over_table,
+    calculate_statistical_probability_goals_over,
+    calculate_statistical_probability_corners_over,
+    calculate_statistical_probability_cards_over,
+    calculate_final_confidence,
+    calculate_confidence_batch,
+    avaliar_candidatos,
+    id_bet_type,
+    id_script
+)
+
+
+def _poisson_over_loop(media, linha):
+    """Implementação original (loop com math.factorial) usada como referência"""
+    prob_under = 0.0
+    for k in range(int(linha) + 1):
+        prob_under += (math.exp(-media) * (media ** k)) / math.factorial(k)
+    return min(max((1 - prob_under) * 100, 0), 100)
+
+
+class TestPoissonVetorizado(unittest.TestCase):
+    """Testes para a API em lote de probabilidades Poisson"""
+
+    MEDIAS = [0.0, 0.8, 1.35, 2.6, 4.1, 9.7, 12.3]
+    LINHAS = [0.5, 1.5, 2.5, 3.5, 4.5, 8.5, 10.5]
+
+    def test_grade_bate_com_loop_escalar(self):
+        """Grade média × linha igual ao loop original"""
+        over, under = poisson_over_under_grid(self.MEDIAS, self.LINHAS)
+        self.assertEqual(over.shape, (len(self.MEDIAS), len(self.LINHAS)))
+        for i, media in enumerate(self.MEDIAS):
+            for j, linha in enumerate(self.LINHAS):
+                self.assertAlmostEqual(over[i, j], _poisson_over_loop(media, linha), places=9)
+                self.assertAlmostEqual(over[i, j] + under[i, j], 100.0, places=9)
+
+    def test_pares_mesmo_formato(self):
+        """Arrays do mesmo formato são avaliados par a par"""
+        probs = poisson_over_probabilities([1.2, 2.8, 10.0], [2.5, 2.5, 9.5])
+        esperado = [_poisson_over_loop(1.2, 2.5), _poisson_over_loop(2.8, 2.5), _poisson_over_loop(10.0, 9.5)]
+        np.testing.assert_allclose(probs, esperado, atol=1e-9)
+
+    def test_tabela_por_nome_e_linha(self):
+        """poisson_over_table devolve floats indexados pela linha original"""
+        tabela = poisson_over_table({'ft': 10.2, 'ht': 4.9}, [4.5, 9.5])
+        self.assertEqual(set(tabela), {'ft', 'ht'})
+        self.assertIsInstance(tabela['ft'][9.5], float)
+        self.assertAlmostEqual(tabela['ht'][4.5], _poisson_over_loop(4.9, 4.5), places=9)
+
+    def test_funcoes_escalares_mantem_resultado(self):
+        """Funções escalares continuam com o mesmo resultado (agora via motor vetorizado)"""
+        self.assertAlmostEqual(calculate_statistical_probability_goals_over(2.7, 2.5), _poisson_over_loop(2.7, 2.5), places=9)
+        self.assertAlmostEqual(calculate_statistical_probability_corners_over(9.8, 9.5), _poisson_over_loop(9.8, 9.5), places=9)
+        self.assertAlmostEqual(calculate_statistical_probability_cards_over(4.2, 3.5), _poisson_over_loop(4.2, 3.5), places=9)
+        self.assertEqual(calculate_statistical_probability_goals_over(2.7, 2.5, historical_frequency=61.0), 61.0)
+
+
+class TestConfiancaCompilada(unittest.TestCase):
+    """Tabelas compiladas devem reproduzir o cálculo escalar exatamente"""
+
+    PROBS = [0.0, 12.0, 34.999, 35.0, 44.9, 45.0, 55.0, 64.2, 65.0, 75.0, 84.99, 85.0, 97.3, 100.0]
+    BET_TYPES = ["Over 2.5", "Under 2.5 HT", "Over 1.5", "BTTS Sim", "BTTS Não", "Over 9.5 Cantos",
+                 "Casa Under 4.5", "Handicap Asiático -1.5 (Casa)", "Vitória Casa"]
+    SCRIPTS = [None, "SCRIPT_DOMINIO_CASA", "SCRIPT_CAGEY_TACTICAL_AFFAIR", "SCRIPT_TIME_EM_CHAMAS_FORA",
+               "SCRIPT_NAO_CATALOGADO_LOW_SCORING"]
+
+    def test_lote_igual_ao_escalar(self):
+        casos = [(p, b, s) for p in self.PROBS for b in self.BET_TYPES for s in self.SCRIPTS]
+        final, base, mod = calculate_confidence_batch(
+            [c[0] for c in casos], [id_bet_type(c[1]) for c in casos], [id_script(c[2]) for c in casos]
+        )
+        for i, (prob, bet_type, script) in enumerate(casos):
+            confianca, breakdown = calculate_final_confidence(prob, bet_type, script)
+            self.assertEqual(final[i], confianca)
+            self.assertEqual(base[i], breakdown['confianca_base'])
+            self.assertEqual(mod[i], breakdown['modificador_script'])
+
+    def test_candidatos_filtrados_pela_confianca_minima(self):
+        script = "SCRIPT_DOMINIO_CASA"
+        candidatos = [({"tipo": "Sim", "odd": 1.8}, 72.0, "BTTS Sim", 0.0),
+                      ({"tipo": "Não", "odd": 2.0}, 28.0, "BTTS Não", 10.1)]
+        confiancas, aprovados = avaliar_candidatos(candidatos, script)
+        self.assertEqual(list(confiancas), [calculate_final_confidence(72.0, "BTTS Sim", script)[0],
+                                            calculate_final_confidence(28.0, "BTTS Não", script)[0]])
+        self.assertEqual(aprovados, [{"tipo": "Sim", "odd": 1.8, "confianca": confiancas[0],
+                                      "bet_type": "BTTS Sim", "probabilidade_estatistica": 72.0}])
+        self.assertEqual(avaliar_candidatos([], script)[1], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Testes unitários do registro de mercados e do avaliador em lote (analysts/market_registry.py).
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from analysts.market_registry import REGISTRO_MERCADOS, avaliar_linhas
+from analysts.confidence_calculator import calculate_final_confidence, confidence_breakdown
+from analysts.corners_analyzer import apply_script_modifier_to_probability_corners
+
+
+PROB_OVER = {'cantos_ft': {9.5: 62.0, 10.5: 48.0}, 'cantos_casa': {5.5: 40.0}, 'cartoes_total': {4.5: 60.0}}
+
+
+def _fonte(fonte, linhas):
+    return [PROB_OVER[fonte][linha] for linha in linhas]
+
+
+class TestRegistroMercados(unittest.TestCase):
+    """Declarações únicas e avaliação em lote"""
+
+    def test_chaves_de_odd_unicas(self):
+        chaves = [c for linhas in REGISTRO_MERCADOS.values() for l in linhas for c in l.chaves_odd]
+        self.assertEqual(len(chaves), len(set(chaves)))
+
+    def test_so_avalia_linhas_com_odd(self):
+        odds = {'cantos_ft_over_9.5': 1.8, 'cantos_ft_under_10.5': 1.9}
+        palpites = avaliar_linhas(REGISTRO_MERCADOS["Cantos"], odds, _fonte)
+        self.assertEqual([p['tipo'] for p in palpites], ["Over 9.5 Cantos", "Under 10.5 Cantos"])
+        self.assertEqual(palpites[1]['probabilidade_estatistica'], 52.0)
+        self.assertEqual(palpites[0]['odd'], 1.8)
+
+    def test_bate_com_caminho_escalar(self):
+        """Modificador de script + confiança iguais ao cálculo linha a linha"""
+        script = "SCRIPT_DOMINIO_CASA"
+        odds = {'cantos_ft_over_9.5': 1.8, 'cantos_casa_over_5.5': 2.1}
+        palpites = avaliar_linhas(REGISTRO_MERCADOS["Cantos"], odds, _fonte, script,
+                                  apply_script_modifier_to_probability_corners)
+        for palpite, prob_base in zip(palpites, (62.0, 40.0)):
+            prob = apply_script_modifier_to_probability_corners(prob_base, palpite['tipo'], script)
+            confianca, breakdown = calculate_final_confidence(prob, palpite['tipo'], script)
+            self.assertEqual(palpite['probabilidade_estatistica'], prob)
+            self.assertEqual(palpite['confianca'], confianca)
+            self.assertEqual(confidence_breakdown(palpite['probabilidade_estatistica'], palpite['bet_type'], script), breakdown)
+
+    def test_alias_legado_e_threshold(self):
+        palpites = avaliar_linhas(REGISTRO_MERCADOS["Cartões"], {'cartoes_over_4.5': 1.9, 'cartoes_total_under_4.5': 2.0}, _fonte)
+        self.assertEqual([p['tipo'] for p in palpites], ["Over 4.5"])  # Under 40% fica abaixo do threshold
+
+
+if __name__ == '__main__':
+    unittest.main()
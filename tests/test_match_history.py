@@ -0,0 +1,120 @@
+"""
+Testes unitários do histórico colunar de jogos (match_history.py).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import match_history
+from match_history import HistoricoPartidas
+from team_features import TeamFeatureStore
+
+
+def _jogo(fixture_id, dia, casa_id, fora_id, cantos_casa=5, cantos_fora=3):
+    jogo = {
+        'fixture_id': fixture_id,
+        'date': f"2026-09-{dia:02d}T16:00:00+00:00",
+        'teams': {'home': {'id': casa_id}, 'away': {'id': fora_id}},
+        'home_goals': 2,
+        'away_goals': 1,
+    }
+    stats = {
+        'home': {'Corner Kicks': cantos_casa, 'Total Shots': 12, 'Shots on Goal': 5, 'Yellow Cards': 2, 'Red Cards': None},
+        'away': {'Corner Kicks': cantos_fora, 'Total Shots': '9', 'Shots on Goal': 3, 'Yellow Cards': 3, 'Red Cards': 1},
+    }
+    return jogo, stats
+
+
+class TestHistoricoPartidas(unittest.TestCase):
+    """Colunas memory-mapped, append em lote e fatias por time/data"""
+
+    def setUp(self):
+        self.diretorio = tempfile.mkdtemp()
+        self.historico = HistoricoPartidas(self.diretorio)
+        self.historico.abrir()
+
+    def test_append_em_lote_e_reabertura(self):
+        for i in range(10):
+            self.historico.registrar(*_jogo(100 + i, 1 + i, 1 if i % 2 else 2, 3, cantos_casa=i))
+        self.assertEqual(self.historico.linhas, 0)  # Ainda pendentes
+        self.assertEqual(self.historico.estatisticas(104)['home']['Corner Kicks'], 4)
+        self.assertEqual(self.historico.flush(), 10)
+
+        reaberto = HistoricoPartidas(self.diretorio)
+        reaberto.abrir()
+        col = reaberto.colunas()
+        self.assertIsInstance(col['fixture_id'], np.memmap)
+        np.testing.assert_array_equal(col['cantos_casa'], np.arange(10))
+        self.assertEqual(col['amarelos_fora'].dtype, np.int16)
+        self.assertEqual(reaberto.estatisticas(101)['away'],
+                         {'Corner Kicks': 3, 'Total Shots': 9, 'Shots on Goal': 3, 'Yellow Cards': 3, 'Red Cards': 1})
+
+    def test_arquivos_ilegiveis_vao_para_quarentena(self):
+        self.historico.registrar(*_jogo(100, 1, 1, 2))
+        self.historico.flush()
+        with open(os.path.join(self.diretorio, match_history.ARQUIVO_META), 'w') as f:
+            f.write("{corrompido")
+
+        reaberto = HistoricoPartidas(self.diretorio)
+        reaberto.abrir()
+        self.assertEqual(reaberto.linhas, 0)
+        quarentena = [d for d in os.listdir(os.path.dirname(self.diretorio))
+                      if d.startswith(os.path.basename(self.diretorio) + ".corrompido-")]
+        self.assertEqual(len(quarentena), 1)
+        preservado = np.load(os.path.join(os.path.dirname(self.diretorio), quarentena[0], "fixture_id.npy"))
+        self.assertEqual(preservado[0], 100)
+
+    def test_duplicados_ignorados(self):
+        self.historico.registrar(*_jogo(100, 1, 1, 2))
+        self.historico.flush()
+        self.assertFalse(self.historico.registrar(*_jogo(100, 1, 1, 2)) and self.historico.flush())
+        self.assertEqual(self.historico.linhas, 1)
+
+    def test_crescimento_da_capacidade(self):
+        capacidade_original = match_history.CAPACIDADE_INICIAL
+        match_history.CAPACIDADE_INICIAL = 4
+        try:
+            historico = HistoricoPartidas(tempfile.mkdtemp())
+            historico.abrir()
+            for lote in range(3):
+                for i in range(3):
+                    historico.registrar(*_jogo(10 * lote + i + 1, 1 + lote, 1, 2))
+                historico.flush()
+            self.assertEqual(historico.linhas, 9)
+            self.assertGreaterEqual(historico.capacidade, 9)
+            self.assertEqual(sorted(historico.colunas()['fixture_id'].tolist()), [1, 2, 3, 11, 12, 13, 21, 22, 23])
+        finally:
+            match_history.CAPACIDADE_INICIAL = capacidade_original
+
+    def test_fatias_por_time_e_data(self):
+        for i in range(6):
+            self.historico.registrar(*_jogo(200 + i, 1 + i, 7 if i < 3 else 8, 9))
+        self.historico.flush()
+        self.assertEqual(self.historico.jogos_do_time(7)['fixture_id'].tolist(), [200, 201, 202])
+        self.assertEqual(len(self.historico.jogos_do_time(9)['fixture_id']), 6)
+        recorte = self.historico.entre_datas(datetime(2026, 9, 2, tzinfo=timezone.utc), datetime(2026, 9, 4, 23, tzinfo=timezone.utc))
+        self.assertEqual(recorte['fixture_id'].tolist(), [201, 202, 203])
+
+    def test_importar_do_cache_e_alimentar_store(self):
+        jogos = [_jogo(300 + i, 1 + i, 1, 2) for i in range(4)]
+        ultimos = {'ultimos_jogos_finalizados_1_5': [j for j, _ in jogos], 'ultimos_jogos_finalizados_2_5': [j for j, _ in jogos]}
+        stats = {f"stats_jogo_{j['fixture_id']}": s for j, s in jogos[:3]}
+        importadas = self.historico.importar_do_cache(ultimos, stats)
+        self.assertEqual(sorted(importadas), sorted(stats))
+        self.assertEqual(self.historico.linhas, 3)
+
+        store = TeamFeatureStore(arquivo=os.path.join(self.diretorio, 'features.npz'))
+        self.assertEqual(self.historico.alimentar_feature_store(store, por_time=2), 2)
+        self.assertEqual(store.linha(1, 302)['cantos_pro'], 5.0)
+        self.assertFalse(store.tem_jogo(1, 300))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Testes unitários do simulador Monte Carlo (analysts/match_simulator.py).
+"""
+
+import unittest
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from analysts.match_simulator import simular_jogo, simular_slate, taxas_do_jogo, simulacao_do_pacote
+
+
+TAXAS = {
+    'cantos_casa': 5.6, 'cantos_fora': 4.3,
+    'cartoes_casa': 2.1, 'cartoes_fora': 2.4,
+    'finalizacoes_casa': 13.0, 'finalizacoes_fora': 10.0,
+    'no_gol_casa': 4.6, 'no_gol_fora': 3.5
+}
+
+
+class TestSimuladorJogo(unittest.TestCase):
+    """Amostras conjuntas de cantos, cartões e finalizações"""
+
+    def test_semente_por_fixture_reprodutivel(self):
+        a = simular_jogo(TAXAS, fixture_id=1234)
+        b = simular_jogo(TAXAS, fixture_id=1234)
+        c = simular_jogo(TAXAS, fixture_id=4321)
+        np.testing.assert_array_equal(a.amostras['cantos_ft'], b.amostras['cantos_ft'])
+        self.assertFalse(np.array_equal(a.amostras['cantos_ft'], c.amostras['cantos_ft']))
+
+    def test_slate_nao_depende_da_composicao(self):
+        sozinho = simular_slate({7: TAXAS})[7]
+        no_slate = simular_slate({3: TAXAS, 7: TAXAS, 9: TAXAS})[7]
+        np.testing.assert_array_equal(sozinho.amostras['cartoes_total'], no_slate.amostras['cartoes_total'])
+
+    def test_medias_batem_com_taxas(self):
+        sim = simular_jogo(TAXAS, fixture_id=1, n_amostras=40_000)
+        for chave in ('cantos_casa', 'cantos_fora', 'cartoes_casa', 'finalizacoes_fora', 'no_gol_casa'):
+            self.assertAlmostEqual(sim.media(chave), TAXAS[chave], delta=TAXAS[chave] * 0.03)
+        self.assertAlmostEqual(sim.media('cantos_ht'), (5.6 + 4.3) * 0.48, delta=0.1)
+
+    def test_amostras_coerentes(self):
+        sim = simular_jogo(TAXAS, fixture_id=99)
+        a = sim.amostras
+        self.assertTrue((a['cantos_ht'] <= a['cantos_ft']).all())
+        self.assertTrue((a['no_gol_casa'] <= a['finalizacoes_casa']).all())
+        np.testing.assert_array_equal(a['cantos_ft'], a['cantos_casa'] + a['cantos_fora'])
+        # Ritmo compartilhado: mercados positivamente correlacionados
+        self.assertGreater(np.corrcoef(a['cantos_ft'], a['finalizacoes_total'])[0, 1], 0)
+
+    def test_over_under_todas_as_linhas(self):
+        sim = simular_jogo(TAXAS, fixture_id=5)
+        linhas = [8.5, 9.5, 10.5]
+        over, under = sim.prob_over_under('cantos_ft', linhas)
+        np.testing.assert_allclose(over + under, 100.0)
+        self.assertTrue((np.diff(over) < 0).all())
+        esperado = (sim.amostras['cantos_ft'] > 9.5).mean() * 100
+        self.assertAlmostEqual(sim.tabela_over('cantos_ft', linhas)[9.5], esperado, places=9)
+
+    def test_pacote_compartilha_simulacao(self):
+        stats_casa = {'casa': {'cantos_feitos': 6.0, 'cantos_sofridos': 4.0, 'cartoes_amarelos': 2.0,
+                               'finalizacoes': 12.0, 'finalizacoes_no_gol': 4.0}}
+        stats_fora = {'fora': {'cantos_feitos': 4.0, 'cantos_sofridos': 5.0, 'cartoes_amarelos': 2.5,
+                               'finalizacoes': 9.0, 'finalizacoes_no_gol': 3.0}}
+        pacote = {'fixture_id': 10, 'analysis_summary': {},
+                  'raw_data': {'home_stats': stats_casa, 'away_stats': stats_fora}}
+        self.assertIs(simulacao_do_pacote(pacote), simulacao_do_pacote(pacote, stats_casa, stats_fora))
+        # Stats avulsas diferentes não tiram finalizações da simulação de cantos/cartões
+        outras_casa = {'casa': dict(stats_casa['casa'], finalizacoes=20.0)}
+        self.assertIs(simulacao_do_pacote(pacote), simulacao_do_pacote(pacote, outras_casa, stats_fora))
+        self.assertEqual(taxas_do_jogo(stats_casa, stats_fora)['cantos_casa'], 5.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Testes unitários da matriz de placares (analysts/score_matrix.py).
+Confere as reduções de array contra as fórmulas fechadas do Poisson independente.
+"""
+
+import math
+import unittest
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from analysts.score_matrix import ScoreMatrix, estimar_gols_esperados, obter_matriz_placar, precificar_handicaps
+from analysts.confidence_calculator import poisson_over_probabilities
+
+
+class TestScoreMatrix(unittest.TestCase):
+    """Mercados derivados da matriz de placares"""
+
+    def setUp(self):
+        self.matriz = ScoreMatrix(1.6, 1.1)
+
+    def test_matriz_soma_um(self):
+        self.assertAlmostEqual(self.matriz.matriz.sum(), 1.0, places=12)
+        self.assertAlmostEqual(self.matriz.dist_total.sum(), 1.0, places=12)
+        self.assertAlmostEqual(self.matriz.dist_diferenca.sum(), 1.0, places=12)
+
+    def test_total_bate_com_poisson_da_soma(self):
+        """Soma de Poissons independentes é Poisson(λ1 + λ2)"""
+        linhas = [0.5, 1.5, 2.5, 3.5, 4.5]
+        over, under = self.matriz.over_under_total(linhas)
+        np.testing.assert_allclose(over, poisson_over_probabilities(2.7, linhas), atol=1e-6)
+        np.testing.assert_allclose(over + under, 100.0)
+
+    def test_gols_por_time(self):
+        over, _ = self.matriz.over_under_time('fora', [0.5])
+        self.assertAlmostEqual(over[0], (1 - math.exp(-1.1)) * 100, places=9)
+
+    def test_btts_forma_fechada(self):
+        sim, nao = self.matriz.btts()
+        esperado = (1 - math.exp(-1.6)) * (1 - math.exp(-1.1)) * 100
+        self.assertAlmostEqual(sim, esperado, places=6)
+        self.assertAlmostEqual(sim + nao, 100.0, places=9)
+
+    def test_resultado_e_dupla_chance(self):
+        r = self.matriz.resultado_1x2()
+        self.assertAlmostEqual(sum(r.values()), 100.0, places=9)
+        self.assertGreater(r['home_win_prob'], r['away_win_prob'])
+        dupla = self.matriz.dupla_chance()
+        self.assertAlmostEqual(dupla['1x'], r['home_win_prob'] + r['draw_prob'], places=9)
+
+    def test_handicap_coerente_com_1x2(self):
+        r = self.matriz.resultado_1x2()
+        casa_menos_meio, casa_mais_meio = self.matriz.handicap([-0.5, 0.5], 'casa')
+        self.assertAlmostEqual(casa_menos_meio, r['home_win_prob'], places=9)
+        self.assertAlmostEqual(casa_mais_meio, r['home_win_prob'] + r['draw_prob'], places=9)
+        fora_menos_meio = self.matriz.handicap([-0.5], 'fora')[0]
+        self.assertAlmostEqual(fora_menos_meio, r['away_win_prob'], places=9)
+
+    def test_matriz_memoizada_e_ht(self):
+        self.assertIs(obter_matriz_placar(1.6, 1.1), obter_matriz_placar(1.6, 1.1))
+        ht = obter_matriz_placar(1.6, 1.1, 'ht')
+        self.assertLess(ht.lambda_casa, 1.6)
+
+    def test_estimativa_sem_dados_usa_padrao(self):
+        lambda_casa, lambda_fora = estimar_gols_esperados({}, {})
+        self.assertGreater(lambda_casa, lambda_fora)
+        stats_casa = {'casa': {'gols_marcados': 2.0, 'gols_sofridos': 0.8}}
+        stats_fora = {'fora': {'gols_marcados': 1.0, 'gols_sofridos': 1.6}}
+        self.assertEqual(estimar_gols_esperados(stats_casa, stats_fora), (1.8, 0.9))
+
+
+class TestPrecificarHandicaps(unittest.TestCase):
+    """Handicaps via Skellam com devolução"""
+
+    LAMBDA_CASA = 1.8
+    LAMBDA_FORA = 0.9
+
+    def setUp(self):
+        self.matriz = ScoreMatrix(self.LAMBDA_CASA, self.LAMBDA_FORA, max_gols=25)
+        self.r = self.matriz.resultado_1x2()
+
+    def _precos(self, linhas, lados, asiatico):
+        return precificar_handicaps(self.LAMBDA_CASA, self.LAMBDA_FORA, linhas, lados, asiatico)
+
+    def test_meia_linha_bate_com_matriz(self):
+        precos = self._precos([-0.5, -1.5, 1.5], ['casa', 'casa', 'fora'], [True] * 3)
+        esperado = np.concatenate([self.matriz.handicap([-0.5, -1.5], 'casa'), self.matriz.handicap([1.5], 'fora')])
+        np.testing.assert_allclose(precos['vitoria'], esperado, atol=1e-6)
+        np.testing.assert_allclose(precos['devolucao'], 0.0)
+
+    def test_linha_zero_devolve_no_empate(self):
+        precos = self._precos([0.0], ['casa'], [True])
+        self.assertAlmostEqual(precos['devolucao'][0], self.r['draw_prob'], places=6)
+        esperado = self.r['home_win_prob'] / (self.r['home_win_prob'] + self.r['away_win_prob']) * 100
+        self.assertAlmostEqual(precos['probabilidade'][0], esperado, places=6)
+
+    def test_europeu_sem_devolucao(self):
+        precos = self._precos([0.0], ['casa'], [False])
+        self.assertEqual(precos['devolucao'][0], 0.0)
+        self.assertAlmostEqual(precos['probabilidade'][0], self.r['home_win_prob'], places=6)
+
+    def test_quarter_e_media_das_metades(self):
+        precos = self._precos([-0.75, -0.5, -1.0], ['casa'] * 3, [True] * 3)
+        for chave in ('vitoria', 'devolucao', 'derrota'):
+            self.assertAlmostEqual(precos[chave][0], (precos[chave][1] + precos[chave][2]) / 2, places=9)
+        np.testing.assert_allclose(precos['vitoria'] + precos['devolucao'] + precos['derrota'], 100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
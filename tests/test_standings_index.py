@@ -0,0 +1,55 @@
+"""
+Testes unitários da classificação indexada (standings_index.py).
+"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from standings_index import ClassificacaoIndexada, indexar_classificacao
+from analysts.team_scoring import scores_do_time
+
+
+LINHAS = [
+    {'rank': 1, 'team': {'id': 10, 'name': "Flamengo"}, 'points': 70, 'goalsDiff': 35, 'form': "WWWDW"},
+    {'rank': 2, 'team': {'id': 20, 'name': "Palmeiras"}, 'points': 68, 'goalsDiff': 30, 'form': "WDWWL"},
+    {'rank': 3, 'team': {'id': 30, 'name': "Atlético-MG"}, 'points': 50, 'goalsDiff': 2, 'form': "LDWLD"},
+]
+
+
+class TestClassificacaoIndexada(unittest.TestCase):
+    """Consultas O(1) por id/nome sem mudar o formato de lista"""
+
+    def setUp(self):
+        self.classificacao = ClassificacaoIndexada(LINHAS)
+
+    def test_consultas_por_id_e_nome(self):
+        self.assertEqual(self.classificacao.total_times, 3)
+        self.assertEqual(self.classificacao.posicao(20), 2)
+        self.assertEqual(self.classificacao.pontos(team_name="Flamengo"), 70)
+        self.assertEqual(self.classificacao.saldo_gols(30), 2)
+        self.assertEqual(self.classificacao.posicao(999), "N/A")
+
+    def test_id_vence_nome_divergente(self):
+        # Nome diferente entre endpoints ("Atletico Mineiro" x "Atlético-MG"): o id resolve
+        self.assertEqual(self.classificacao.posicao(30, "Atletico Mineiro"), 3)
+        self.assertEqual(self.classificacao.posicao(None, "Palmeiras"), 2)
+
+    def test_continua_lista(self):
+        self.assertEqual(json.loads(json.dumps(self.classificacao)), LINHAS)
+        self.assertIs(indexar_classificacao(self.classificacao), self.classificacao)
+        self.assertIsNone(indexar_classificacao([]))
+
+    def test_qsc_por_id(self):
+        stats = {'form': "WWWDW", 'goals': {}}
+        self.assertEqual(
+            scores_do_time(stats, 30, 71, self.classificacao, "Atletico Mineiro", 10)['qsc'],
+            scores_do_time(stats, 30, 71, LINHAS, "Atlético-MG", 10)['qsc']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Testes unitários da feature store por time (team_features.py).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from team_features import TeamFeatureStore, JANELA_ROLANTE
+
+
+def _jogo(fixture_id, dia, casa_id, fora_id, gols_casa, gols_fora, cantos_casa, cantos_fora):
+    jogo = {
+        'fixture_id': fixture_id,
+        'date': f"2026-09-{dia:02d}T16:00:00+00:00",
+        'teams': {'home': {'id': casa_id, 'name': f"T{casa_id}"}, 'away': {'id': fora_id, 'name': f"T{fora_id}"}},
+        'home_goals': gols_casa,
+        'away_goals': gols_fora,
+    }
+    stats = {
+        'home': {'Corner Kicks': cantos_casa, 'Total Shots': 12, 'Shots on Goal': 5, 'Yellow Cards': 2, 'Red Cards': None},
+        'away': {'Corner Kicks': cantos_fora, 'Total Shots': '9', 'Shots on Goal': 3, 'Yellow Cards': 3, 'Red Cards': 1},
+    }
+    return jogo, stats
+
+
+class TestTeamFeatureStore(unittest.TestCase):
+    """Linhas por jogo e agregados rolantes incrementais"""
+
+    def setUp(self):
+        self.store = TeamFeatureStore(arquivo=os.path.join(tempfile.mkdtemp(), 'features.npz'))
+        # Time 1 alterna casa/fora em 8 jogos; o jogo do dia 3 chega atrasado
+        self.jogos = []
+        for i, dia in enumerate([1, 2, 4, 5, 6, 7, 8, 3]):
+            if i % 2 == 0:
+                self.jogos.append(_jogo(100 + dia, dia, 1, 50 + i, 2, i % 3, 4 + i, 3))
+            else:
+                self.jogos.append(_jogo(100 + dia, dia, 50 + i, 1, 1, 1, 6, 2 + i))
+        for jogo, stats in self.jogos:
+            self.store.registrar_jogo(jogo, stats)
+
+    def test_janela_incremental_igual_a_recalculo(self):
+        features = self.store._times[1]
+        self.assertEqual(features.datas, sorted(features.datas))
+        somas = {m: s.copy() for m, s in features.somas.items()}
+        features.recalcular_janela()
+        for mando in somas:
+            np.testing.assert_array_equal(somas[mando], features.somas[mando])
+        self.assertEqual(features.jogos['total'], JANELA_ROLANTE)
+
+    def test_medias_por_mando(self):
+        janela = self.store._times[1].janela()
+        rapido = self.store.medias_por_mando(1)
+        por_ids = self.store.medias_por_mando(1, list(reversed(janela)) + [999])
+        self.assertEqual(rapido, self.store.medias_por_mando(1, janela))
+        self.assertEqual(por_ids['jogos_casa'] + por_ids['jogos_fora'], JANELA_ROLANTE)
+        self.assertAlmostEqual(rapido['fora']['amarelos_pro'], 3.0)
+
+    def test_media_ponderada(self):
+        ids = [108, 107]
+        pesos = [1.5, 0.5]
+        metricas = self.store.media_ponderada(1, ids, pesos)
+        cantos = [self.store.linha(1, fid)['cantos_pro'] for fid in ids]
+        self.assertAlmostEqual(metricas['weighted_corners_for'], (cantos[0] * 1.5 + cantos[1] * 0.5) / 2.0)
+        # Fora de casa: 3 amarelos + 1 vermelho (= 3 amarelos)
+        self.assertAlmostEqual(self.store.media_ponderada(1, [107], [1.0])['weighted_cards_for'], 6.0)
+        self.assertIsNone(self.store.media_ponderada(1, [999], [1.0]))
+
+    def test_jogo_repetido_ignorado(self):
+        jogo, stats = self.jogos[0]
+        self.assertEqual(self.store.registrar_jogo(jogo, stats), 0)
+
+    def test_persistencia(self):
+        self.store.salvar_em_disco()
+        novo = TeamFeatureStore(arquivo=self.store.arquivo)
+        novo.carregar_do_disco()
+        self.assertEqual(novo.medias_por_mando(1), self.store.medias_por_mando(1))
+        self.assertEqual(novo.linha(1, 103), self.store.linha(1, 103))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Testes unitários da pontuação em lote do slate (analysts/team_scoring.py).
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from analysts.team_scoring import entradas_do_time, position_qs_da_tabela, scores_do_time, tabela
+from config import QUALITY_SCORES, LEAGUE_WEIGHTING_FACTOR
+
+
+def _stats_aleatorias(rng):
+    jogos = rng.randint(0, 38)
+    return {
+        'form': ''.join(rng.choice('WDL') for _ in range(rng.randint(0, 8))),
+        'fixtures': {'played': {'total': jogos}, 'wins': {'total': rng.randint(0, jogos)}},
+        'goals': {
+            'for': {'total': {'total': rng.randint(0, 80)}, 'average': {'total': str(round(rng.uniform(0, 3.5), 1))}},
+            'against': {'total': {'total': rng.randint(0, 80)}, 'average': {'total': rng.choice([None, '0.9', '1.3', '2.1'])}},
+        }
+    }
+
+
+STATS_LIDER = {
+    'form': "DLWWLWW",  # Últimos 5: WWLWW → 4 vitórias
+    'fixtures': {'played': {'total': 10}, 'wins': {'total': 6}},
+    'goals': {
+        'for': {'total': {'total': 20}, 'average': {'total': "2.0"}},
+        'against': {'total': {'total': 8}, 'average': {'total': None}},
+    }
+}
+TABELA_20 = [{'rank': i + 1, 'team': {'id': 999_000 + i, 'name': f"Time {i}"}} for i in range(20)]
+
+
+class TestTabelaScores(unittest.TestCase):
+    """Regras de Power, Momento, QSC e Perfil, e consultas à tabela do slate"""
+
+    def test_regras_dos_scores(self):
+        # Fora de QUALITY_SCORES (reputação 70) e sem liga (peso 0.70)
+        scores = scores_do_time(STATS_LIDER, 999_000, None, TABELA_20, "Time 0", rodada=10)
+        self.assertEqual(scores['power'], 80)      # 50 + 60% × 25 + saldo +12 (+15)
+        self.assertEqual(scores['moment'], 95)     # 4 vitórias nos últimos 5
+        self.assertEqual(scores['qsc'], 59)        # (70×.25 + 100×.30 + 80×.25 + 85×.20) × 0.70
+        self.assertEqual(scores['qsc_sem_tabela'], 49)
+        self.assertEqual(scores_do_time(STATS_LIDER, 999_000, None, TABELA_20, "Time 0", rodada=3)['qsc'], 56)
+        self.assertEqual(scores['profile'], {
+            'corners_for_avg': 6.5, 'corners_against_avg': 3.0,
+            'shots_for_avg': 15.0, 'shots_against_avg': 8.0,
+            'offensive_style': 'ofensivo', 'volume_intensity': 'alto'
+        })
+
+    def test_lote_igual_a_linha_avulsa(self):
+        rng = random.Random(7)
+        team_ids = list(QUALITY_SCORES)[:10] + [999_001, 999_002]
+        league_ids = list(LEAGUE_WEIGHTING_FACTOR)[:3] + [None]
+        classificacao = [{'rank': i + 1, 'team': {'name': f"Time {i}"}} for i in range(20)]
+        times = []
+        for i in range(300):
+            times.append((team_ids[i % len(team_ids)] + 10_000_000 * (i // len(team_ids)), rng.choice(league_ids),
+                          _stats_aleatorias(rng), f"Time {rng.randint(0, 25)}", rng.randint(0, 12),
+                          rng.choice([classificacao, None])))
+
+        tabela.construir([])
+        avulsos = [scores_do_time(stats, team_id, league_id, tabela_liga, nome, rodada)
+                   for team_id, league_id, stats, nome, rodada, tabela_liga in times]
+
+        tabela.construir(times)
+        for (team_id, league_id, stats, nome, rodada, tabela_liga), esperado in zip(times, avulsos):
+            pos_qs = position_qs_da_tabela(tabela_liga, team_id, nome)
+            self.assertEqual(tabela.obter(team_id, league_id, entradas_do_time(stats), pos_qs, rodada), esperado)
+
+    def test_consulta_com_outras_entradas_nao_usa_a_tabela(self):
+        stats = _stats_aleatorias(random.Random(3))
+        tabela.construir([(999_000, 71, stats, "Time 0", 3, None)])
+        self.assertEqual(len(tabela), 1)
+
+        # Stats atualizadas, outra rodada ou com classificação: pontuadas de novo, nunca a linha antiga
+        self.assertEqual(scores_do_time(STATS_LIDER, 999_000, 71, None, "Time 0", 3)['power'], 80)
+        self.assertGreater(scores_do_time(STATS_LIDER, 999_000, 71, TABELA_20, "Time 0", 10)['qsc'],
+                           scores_do_time(STATS_LIDER, 999_000, 71, None, "Time 0", 10)['qsc'])
+        self.assertNotEqual(scores_do_time(stats, 999_000, 71, TABELA_20, "Time 0", 3),
+                            scores_do_time(stats, 999_000, 71, None, "Time 0", 3))
+
+
+if __name__ == '__main__':
+    unittest.main()